@@ -6,8 +6,10 @@ setup(
     packages=find_packages(),
     install_requires=[
         'flask',
+        'joblib',
         'numpy',
         'pandas',
-        'scikit-learn'
+        'scikit-learn',
+        'scipy'
     ],
 ) 
\ No newline at end of file
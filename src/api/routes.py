@@ -1,11 +1,22 @@
 from flask import Blueprint, request, jsonify
 from models.predictor import MatchPredictor
+from models.ratings import RatingsPredictor
 from utils.data_processor import DataProcessor
 
 api_bp = Blueprint('api', __name__)
 predictor = MatchPredictor()
+if not predictor.load():
+    # No saved models yet: train once and persist them for the next start
+    if predictor.train():
+        predictor.save()
+ratings_predictor = RatingsPredictor(predictor.db, store=predictor.ratings)
 data_processor = DataProcessor()
 
+@api_bp.teardown_app_request
+def release_db_connections(exception=None):
+    """Close the request thread's read connection; the server starts a thread per request"""
+    predictor.db.pool.release()
+
 @api_bp.route('/predict/match', methods=['POST'])
 def predict_match():
     """Predict match outcome"""
@@ -27,6 +38,47 @@ def predict_match():
             'error': str(e)
         }), 400
 
+@api_bp.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Predict outcomes for many matches at once"""
+    try:
+        data = request.get_json()
+        pairs = [(match.get('home_team'), match.get('away_team')) for match in data.get('matches', [])]
+        
+        # Get predictions for the whole batch in one call
+        predictions = predictor.predict_matches(pairs)
+        
+        return jsonify({
+            'success': True,
+            'predictions': predictions
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
+@api_bp.route('/predict/ratings', methods=['POST'])
+def predict_ratings():
+    """Predict match outcome from the current Elo ratings alone"""
+    try:
+        data = request.get_json()
+        home_team = data.get('home_team')
+        away_team = data.get('away_team')
+        
+        # Get ratings prediction
+        prediction = ratings_predictor.predict_match(home_team, away_team)
+        
+        return jsonify({
+            'success': True,
+            'prediction': prediction
+        })
+    except Exception as e:
+        return jsonify({
+            'success': False,
+            'error': str(e)
+        }), 400
+
 @api_bp.route('/predict/score', methods=['POST'])
 def predict_score():
     """Predict match score"""
@@ -3,22 +3,63 @@
 import requests
 import logging
 import json
-from datetime import datetime
-from time import sleep
+import os
+import queue
+import socket
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
+from requests.adapters import HTTPAdapter
 from .config import API_BASE_URL, API_HEADERS, COMPETITIONS
 from .database import Database
-import time
+from .ratelimit import RateLimiter
+from .response_cache import ResponseCache
+from .jobs import JobQueue, TEAMS, FIXTURES, STATISTICS
+from .scheduler import StatisticsScheduler
+
+# Most fixtures API-Football returns for one ``fixtures?ids=`` request
+FIXTURES_PER_REQUEST = 20
+
+# How far before the high-water mark incremental runs look again, to pick
+# up late results and score corrections
+INCREMENTAL_OVERLAP = timedelta(days=3)
+
+# How long to wait before asking again for statistics the API has not published
+STATISTICS_RETRY_DELAY = 6 * 3600
 
 class APIFootballCollector:
-    def __init__(self):
-        """Initialize the collector with necessary configurations"""
-        self.db = Database()
+    def __init__(self, rate_limiter=None, max_workers=4, cache=None, offline=False,
+                 api_base_url=API_BASE_URL, db_path='data.db'):
+        """Initialize the collector with necessary configurations
+        
+        Responses are cached on disk by ``cache`` (a ``ResponseCache`` in
+        ``api_cache`` by default; pass False to disable). ``offline`` serves
+        requests from the cache only. ``api_base_url`` and ``db_path`` point
+        the collector elsewhere, e.g. at the local stand-in in ``fake_api``.
+        """
+        self.api_base_url = api_base_url.rstrip('/')
+        self.db = Database(db_path)
         self.setup_logging()
-        self.requests_remaining = 1000  # Start with higher limit
+        self.rate_limiter = rate_limiter or RateLimiter()
+        self.cache = ResponseCache(offline=offline) if cache is None else cache
+        if offline and self.cache:
+            self.cache.offline = True
+        self.jobs = JobQueue(self.db.pool)
+        self.max_workers = max_workers
         self.requests_made = 0
+        self._requests_lock = threading.Lock()
+        
+        # One keep-alive session shared by every worker thread
+        self.session = requests.Session()
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=max_workers))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=max_workers))
+        self.session.headers.update({
+            'x-rapidapi-host': API_HEADERS.get('x-rapidapi-host'),
+            'x-rapidapi-key': API_HEADERS.get('x-rapidapi-key')
+        })
         
         # Log API configuration (without the actual key)
-        self.logger.info(f"API Base URL: {API_BASE_URL}")
+        self.logger.info(f"API Base URL: {self.api_base_url}")
         self.logger.info(f"API Host: {API_HEADERS.get('x-rapidapi-host')}")
         self.logger.info("Checking API key length: " + str(len(API_HEADERS.get('x-rapidapi-key', ''))))
         
@@ -26,14 +67,18 @@ class APIFootballCollector:
         status = self.fetch_data('status')
         if status:
             self.logger.info(f"Full API Status Response: {json.dumps(status, indent=2)}")
-            if status.get('response', {}).get('requests'):
-                self.requests_remaining = status['response']['requests']['limit_day']
+            if self.rate_limiter.seed_from_status(status):
                 self.logger.info(f"API Status: {self.requests_remaining} requests remaining today")
             else:
                 self.logger.error(f"Unexpected API response structure: {status}")
         else:
             self.logger.error("Failed to get API status")
     
+    @property
+    def requests_remaining(self):
+        """Requests left in today's API budget."""
+        return self.rate_limiter.daily_remaining
+    
     def setup_logging(self):
         """Set up logging configuration"""
         logging.basicConfig(
@@ -47,117 +92,197 @@ class APIFootballCollector:
         self.logger = logging.getLogger(__name__)
     
     def fetch_data(self, endpoint, params=None):
-        """Fetch data from the API with rate limiting."""
-        if self.requests_remaining <= 0:
-            self.logger.warning("No requests remaining")
-            return None
+        """Fetch data from the API, paced by the rate limiter.
+        
+        Cached responses are returned without spending a request. Throttled
+        (429, or a ``rateLimit`` error in the body) and server error
+        responses are retried with backoff; other failures return None.
+        """
+        if self.cache:
+            cached = self.cache.get(endpoint, params)
+            if cached is not None:
+                return cached
+            if self.cache.offline:
+                self.logger.warning(f"Offline: no cached response for {endpoint} {params or ''}")
+                return None
             
-        url = f"{API_BASE_URL}/{endpoint}"
-        headers = {
-            'x-rapidapi-host': API_HEADERS.get('x-rapidapi-host'),
-            'x-rapidapi-key': API_HEADERS.get('x-rapidapi-key')
-        }
+        url = f"{self.api_base_url}/{endpoint}"
         
-        try:
-            response = requests.get(url, headers=headers, params=params)
-            self.requests_made += 1
-            self.requests_remaining = int(response.headers.get('x-ratelimit-requests-remaining', 0))
+        for attempt in range(self.rate_limiter.max_retries + 1):
+            if not self.rate_limiter.acquire():
+                self.logger.warning("No requests remaining")
+                return None
+                
+            try:
+                response = self.session.get(url, params=params)
+            except requests.RequestException as e:
+                self.rate_limiter.refund()
+                delay = self.rate_limiter.backoff_delay(attempt)
+                self.logger.warning(f"Error making API request: {str(e)}; retrying in {delay:.1f}s")
+                self.rate_limiter.wait(delay)
+                continue
+                
+            with self._requests_lock:
+                self.requests_made += 1
+                request_number = self.requests_made
+            self.rate_limiter.update_from_headers(response.headers)
             
             self.logger.info(f"Response Status Code: {response.status_code}")
-            self.logger.info(f"Request {self.requests_made}: {self.requests_remaining} requests remaining")
+            self.logger.info(f"Request {request_number}: {self.requests_remaining} requests remaining")
             
+            throttled = response.status_code == 429 or response.status_code >= 500
+            data = None
             if response.status_code == 200:
-                data = response.json()
-                # Add a delay to respect rate limit (10 requests per minute)
-                time.sleep(6)  # Wait 6 seconds between requests
+                try:
+                    data = response.json()
+                except ValueError as e:
+                    self.logger.error(f"Invalid JSON from API: {str(e)}")
+                    return None
+                # API-Football reports per-minute throttling in the body of a 200
+                errors = data.get('errors')
+                throttled = isinstance(errors, dict) and 'rateLimit' in errors
+                
+            if not throttled:
+                if data is None:
+                    self.logger.error(f"API request failed with status code {response.status_code}")
+                elif self.cache:
+                    try:
+                        self.cache.put(endpoint, params, data)
+                    except OSError as e:
+                        self.logger.warning(f"Could not cache response for {endpoint}: {str(e)}")
                 return data
-            else:
-                self.logger.error(f"API request failed with status code {response.status_code}")
-                return None
                 
-        except Exception as e:
-            self.logger.error(f"Error making API request: {str(e)}")
-            return None
+            delay = self.rate_limiter.backoff_delay(attempt, response.headers.get('Retry-After'))
+            self.logger.warning(f"API request throttled ({response.status_code}); retrying in {delay:.1f}s")
+            self.rate_limiter.wait(delay)
+            
+        self.logger.error(f"Giving up on {endpoint} after {self.rate_limiter.max_retries + 1} attempts")
+        return None
 
     def collect_team_data(self, league_id, season):
-        """Collect team data for a league and season"""
+        """Collect team data for a league and season; return whether it was stored"""
         teams_data = self.fetch_data('teams', {
             'league': league_id,
             'season': season
         })
         
         if not teams_data or not teams_data.get('response'):
-            return
+            return False
         
+        rows = []
         for team in teams_data['response']:
-            try:
-                team_info = team['team']
-                venue_info = team['venue']
-                
-                team_id = self.db.insert_team(
-                    name=team_info['name'],
-                    league=str(league_id),  # We'll update this with league name later
-                    country=venue_info.get('country', 'Unknown')
-                )
-                
-                self.logger.info(f"Stored team: {team_info['name']}")
-                
-            except Exception as e:
-                self.logger.error(f"Error storing team {team_info['name']}: {str(e)}")
+            team_info = team['team']
+            venue_info = team['venue']
+            rows.append({
+                'name': team_info['name'],
+                'league': str(league_id),  # We'll update this with league name later
+                'country': venue_info.get('country', 'Unknown'),
+                'api_team_id': team_info['id']
+            })
+        
+        try:
+            # Store all teams in a single transaction
+            self.db.insert_teams_bulk(rows)
+            self.logger.info(f"Stored {len(rows)} teams for league {league_id} season {season}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error storing teams for league {league_id}: {str(e)}")
+            return False
     
-    def collect_match_data(self, league_id, season):
-        """Collect match data for a league and season"""
-        matches_data = self.fetch_data('fixtures', {
+    def collect_match_data(self, league_id, season, incremental=False):
+        """Collect match data for a league and season; return whether it succeeded
+        
+        In incremental mode only the fixtures since the stored high-water
+        mark are requested, through the API's ``from``/``to`` window, and
+        only new or changed matches are written.
+        """
+        params = {
             'league': league_id,
             'season': season,
             'status': 'FT'  # Only finished matches
-        })
+        }
+        mark = self.db.get_collection_mark(league_id, season) if incremental else None
+        if mark is not None:
+            since = datetime.fromtimestamp(mark, timezone.utc) - INCREMENTAL_OVERLAP
+            params['from'] = since.strftime('%Y-%m-%d')
+            params['to'] = datetime.now(timezone.utc).strftime('%Y-%m-%d')
+            
+        matches_data = self.fetch_data('fixtures', params)
         
         if not matches_data or not matches_data.get('response'):
-            return
+            if mark is not None and matches_data is not None:
+                self.logger.info(f"No new matches for league {league_id} season {season}")
+                return True
+            return False
         
         total_matches = len(matches_data['response'])
         self.logger.info(f"Found {total_matches} matches for league {league_id} season {season}")
         
+        # Resolve every team in the fixture list with one bulk insert
+        team_rows = []
+        for match in matches_data['response']:
+            league = match['league']
+            for side in ('home', 'away'):
+                team_rows.append({
+                    'name': match['teams'][side]['name'],
+                    'league': league['name'],
+                    'country': league['country'],
+                    'api_team_id': match['teams'][side]['id']
+                })
+        
+        try:
+            team_ids = dict(zip(
+                (row['api_team_id'] for row in team_rows),
+                self.db.insert_teams_bulk(team_rows)
+            ))
+        except Exception as e:
+            self.logger.error(f"Error storing teams for league {league_id}: {str(e)}")
+            return False
+        
+        match_rows = []
         for match in matches_data['response']:
             try:
                 fixture = match['fixture']
                 teams = match['teams']
                 goals = match['goals']
-                score = match['score']
                 league = match['league']
                 
-                # Get or create team IDs
-                home_team_id = self.db.insert_team(
-                    name=teams['home']['name'],
-                    league=league['name'],
-                    country=league['country']
-                )
-                away_team_id = self.db.insert_team(
-                    name=teams['away']['name'],
-                    league=league['name'],
-                    country=league['country']
-                )
-                
                 # Parse match date
                 match_date = datetime.fromtimestamp(fixture['timestamp'])
                 
-                # Store match
-                match_id = self.db.insert_match(
-                    home_team_id=home_team_id,
-                    away_team_id=away_team_id,
-                    home_score=goals['home'],
-                    away_score=goals['away'],
-                    date=match_date,
-                    competition=league['name'],
-                    season=str(season),
-                    api_fixture_id=fixture['id']  # Store API fixture ID for later statistics collection
-                )
-                
-                self.logger.info(f"Stored match: {teams['home']['name']} vs {teams['away']['name']}")
+                match_rows.append({
+                    'home_team_id': team_ids[teams['home']['id']],
+                    'away_team_id': team_ids[teams['away']['id']],
+                    'home_score': goals['home'],
+                    'away_score': goals['away'],
+                    'date': match_date,
+                    'date_ts': fixture['timestamp'],
+                    'competition': league['name'],
+                    'season': str(season),
+                    'api_fixture_id': fixture['id']  # Store API fixture ID for later statistics collection
+                })
                 
             except Exception as e:
-                self.logger.error(f"Error storing match {fixture['id']}: {str(e)}")
+                self.logger.error(f"Error parsing match {match['fixture']['id']}: {str(e)}")
+        
+        try:
+            # Store all matches in a single transaction
+            if incremental:
+                written = self.db.upsert_matches_bulk(match_rows)
+                self.logger.info(f"Stored {written} new or changed of {len(match_rows)} matches "
+                                 f"for league {league_id} season {season}")
+            else:
+                self.db.insert_matches_bulk(match_rows)
+                self.logger.info(f"Stored {len(match_rows)} matches for league {league_id} season {season}")
+                
+            if match_rows:
+                self.db.set_collection_mark(league_id, season, max(row['date_ts'] for row in match_rows))
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error storing matches for league {league_id}: {str(e)}")
+            return False
     
     def collect_match_statistics(self, db_match_id, fixture_id):
         """Collect statistics for a specific match"""
@@ -165,38 +290,170 @@ class APIFootballCollector:
             'fixture': fixture_id
         })
         
-        if not stats_data or not stats_data.get('response'):
+        rows = self.parse_fixture_statistics(db_match_id, stats_data)
+        if not rows:
             return
+        
+        try:
+            # Store both teams' statistics in a single transaction
+            self.db.insert_team_stats_bulk(rows)
+            
+        except Exception as e:
+            self.logger.error(f"Error storing match statistics for match {db_match_id}: {str(e)}")
+    
+    def parse_fixture_statistics(self, db_match_id, stats_data):
+        """Turn a ``fixtures/statistics`` response into ``team_stats`` rows"""
+        if not stats_data or not stats_data.get('response'):
+            return []
             
+        rows = []
         for team_stats in stats_data['response']:
             try:
-                team_id = self.db.get_team_id(team_stats['team']['name'])
+                # Resolve by provider id: names are ambiguous across leagues
+                team_id = self.db.get_team_id_by_api_id(team_stats['team']['id'])
+                if team_id is None:
+                    self.logger.warning(f"Skipping statistics of unknown API team {team_stats['team']['id']} "
+                                        f"in match {db_match_id}")
+                    continue
                 stats = {stat['type']: stat['value'] for stat in team_stats['statistics']}
                 
-                self.db.insert_team_stats(
-                    team_id=team_id,
-                    match_id=db_match_id,
-                    possession=float(stats.get('Ball Possession', '0%').rstrip('%')) / 100,
-                    shots=stats.get('Total Shots', 0),
-                    shots_on_target=stats.get('Shots on Goal', 0),
-                    corners=stats.get('Corner Kicks', 0),
-                    fouls=stats.get('Fouls', 0)
-                )
+                rows.append({
+                    'team_id': team_id,
+                    'match_id': db_match_id,
+                    'possession': float((stats.get('Ball Possession') or '0%').rstrip('%')) / 100,
+                    'shots': stats.get('Total Shots') or 0,
+                    'shots_on_target': stats.get('Shots on Goal') or 0,
+                    'corners': stats.get('Corner Kicks') or 0,
+                    'fouls': stats.get('Fouls') or 0
+                })
                 
             except Exception as e:
-                self.logger.error(f"Error storing match statistics for match {db_match_id}: {str(e)}")
+                self.logger.error(f"Error parsing match statistics for match {db_match_id}: {str(e)}")
+        
+        return rows
+    
+    def parse_fixtures_statistics(self, matches, fixtures_data):
+        """Turn a ``fixtures?ids=`` response into ``team_stats`` rows
+        
+        ``matches`` are the ``(match_id, fixture_id)`` pairs requested;
+        fixtures the response leaves out, or returns without statistics,
+        produce no rows.
+        """
+        if not fixtures_data or not fixtures_data.get('response'):
+            return []
+            
+        match_ids = {fixture_id: match_id for match_id, fixture_id in matches}
+        rows = []
+        for fixture in fixtures_data['response']:
+            match_id = match_ids.get(fixture['fixture']['id'])
+            if match_id is None:
+                continue
+            rows.extend(self.parse_fixture_statistics(match_id, {'response': fixture.get('statistics')}))
+        
+        return rows
     
-    def collect_season_data(self, season=2023, include_stats=False, max_requests=None):
-        """Collect all data for a specific season"""
+    def collect_statistics_concurrently(self, matches, max_requests=None, batch_size=50,
+                                        fixtures_per_request=FIXTURES_PER_REQUEST):
+        """Fetch statistics for ``(match_id, fixture_id)`` pairs on a worker pool.
+        
+        With ``fixtures_per_request`` above 1 the fixtures are requested in
+        groups through ``fixtures?ids=``, whose payloads embed the statistics,
+        so one request covers up to 20 matches; 1 uses one
+        ``fixtures/statistics`` request per match. Workers share the pooled
+        session and the rate limiter, and hand parsed rows to a single writer
+        thread that stores them in batches of about ``batch_size`` rows.
+        Returns the number of matches stored.
+        """
+        rows_queue = queue.Queue()
+        budget_lock = threading.Lock()
+        started = [0]
+        stored = [0]
+        
+        def claim():
+            with budget_lock:
+                if self.requests_remaining <= 0:
+                    return False
+                if max_requests and started[0] >= max_requests:
+                    return False
+                started[0] += 1
+                return True
+        
+        def fetch(group):
+            if not claim():
+                return
+            try:
+                if fixtures_per_request > 1:
+                    fixtures_data = self.fetch_data('fixtures', {
+                        'ids': '-'.join(str(fixture_id) for _, fixture_id in group)
+                    })
+                    rows = self.parse_fixtures_statistics(group, fixtures_data)
+                else:
+                    match_id, fixture_id = group[0]
+                    stats_data = self.fetch_data('fixtures/statistics', {'fixture': fixture_id})
+                    rows = self.parse_fixture_statistics(match_id, stats_data)
+                if rows:
+                    rows_queue.put(rows)
+            finally:
+                # Team lookups open a reader on this short-lived worker thread
+                self.db.pool.release()
+        
+        def write():
+            batch = []
+            matches_in_batch = 0
+            while True:
+                rows = rows_queue.get()
+                if rows is not None:
+                    batch.extend(rows)
+                    matches_in_batch += len({row['match_id'] for row in rows})
+                # Flush full batches, and whatever is pending once the workers go quiet
+                if batch and (rows is None or len(batch) >= batch_size or rows_queue.empty()):
+                    try:
+                        self.db.insert_team_stats_bulk(batch)
+                        stored[0] += matches_in_batch
+                    except Exception as e:
+                        self.logger.error(f"Error storing statistics for {matches_in_batch} matches: {str(e)}")
+                    batch = []
+                    matches_in_batch = 0
+                if rows is None:
+                    return
+        
+        writer = threading.Thread(target=write, name='stats-writer')
+        writer.start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                step = max(1, fixtures_per_request)
+                groups = [matches[i:i + step] for i in range(0, len(matches), step)]
+                for future in [pool.submit(fetch, group) for group in groups]:
+                    try:
+                        future.result()
+                    except Exception as e:
+                        self.logger.error(f"Error collecting match statistics: {str(e)}")
+        finally:
+            rows_queue.put(None)
+            writer.join()
+        
+        if max_requests and started[0] >= max_requests:
+            self.logger.info(f"Stopping after using {max_requests} requests as requested")
+        if self.requests_remaining <= 0:
+            self.logger.warning("Stopping statistics collection due to rate limit")
+        return stored[0]
+    
+    def collect_season_data(self, season=2023, include_stats=False, max_requests=None, incremental=False):
+        """Collect all data for a specific season
+        
+        ``incremental`` only fetches what changed since the last run; see
+        ``collect_match_data``.
+        """
         try:
             for league_code, league_id in COMPETITIONS.items():
                 self.logger.info(f"Collecting {league_code} data for season {season}")
                 
-                # Collect team data
-                self.collect_team_data(league_id, season)
+                # Collect team data; later fixture pulls add any newcomers themselves
+                if not incremental or self.db.get_collection_mark(league_id, season) is None:
+                    self.collect_team_data(league_id, season)
                 
                 # Collect match data
-                self.collect_match_data(league_id, season)
+                self.collect_match_data(league_id, season, incremental)
                 
                 # Only collect statistics if specifically requested
                 if include_stats and self.requests_remaining > 0:
@@ -217,29 +474,186 @@ class APIFootballCollector:
             self.db.close()
             self.logger.info(f"Data collection completed. Made {self.requests_made} requests.")
     
-    def collect_season_statistics(self, league_code, season, max_requests=None):
+    def collect_season_statistics(self, league_code, season, max_requests=None, concurrent=True,
+                                  fixtures_per_request=FIXTURES_PER_REQUEST):
         """Collect statistics for all matches in a season that don't have statistics yet"""
         try:
             # Get matches without statistics
             matches = self.db.get_matches_without_statistics(league_code, season)
             initial_requests = self.requests_made
             
-            for match_id, fixture_id in matches:
-                if self.requests_remaining <= 0:
-                    self.logger.warning("Stopping statistics collection due to rate limit")
-                    break
-                
-                if max_requests and (self.requests_made - initial_requests) >= max_requests:
-                    self.logger.info(f"Stopping after using {max_requests} requests as requested")
-                    break
+            if concurrent:
+                stored = self.collect_statistics_concurrently(
+                    matches, max_requests, fixtures_per_request=fixtures_per_request
+                )
+                self.logger.info(f"Stored statistics for {stored} of {len(matches)} {league_code} matches")
+            else:
+                for match_id, fixture_id in matches:
+                    if self.requests_remaining <= 0:
+                        self.logger.warning("Stopping statistics collection due to rate limit")
+                        break
                     
-                self.collect_match_statistics(match_id, fixture_id)
+                    if max_requests and (self.requests_made - initial_requests) >= max_requests:
+                        self.logger.info(f"Stopping after using {max_requests} requests as requested")
+                        break
+                        
+                    self.collect_match_statistics(match_id, fixture_id)
                 
             self.logger.info(f"After {league_code}: {self.requests_remaining} requests remaining")
                 
         except Exception as e:
             self.logger.error(f"Error collecting season statistics: {str(e)}")
     
+    def fetch_upcoming_team_ids(self, season, league_ids=None, next_fixtures=10):
+        """Return the database IDs of teams in each league's next fixtures (one request per league)"""
+        team_ids = set()
+        for league_id in (league_ids or COMPETITIONS.values()):
+            fixtures_data = self.fetch_data('fixtures', {
+                'league': league_id,
+                'season': season,
+                'next': next_fixtures
+            })
+            for fixture in (fixtures_data or {}).get('response') or []:
+                for side in ('home', 'away'):
+                    team_id = self.db.get_team_id_by_api_id(fixture['teams'][side]['id'])
+                    if team_id is not None:
+                        team_ids.add(team_id)
+        return team_ids
+    
+    def collect_prioritized_statistics(self, season, reserve=1, include_upcoming=True,
+                                       fixtures_per_request=FIXTURES_PER_REQUEST):
+        """Spend today's remaining requests on the statistics that help predictions most
+        
+        The season's matches from every competition are ranked by
+        ``StatisticsScheduler`` and fetched best first, keeping ``reserve``
+        requests unspent. Looking up upcoming fixtures costs one request per
+        league and is skipped when it would take more than a quarter of the
+        budget. Returns the number of matches stored.
+        """
+        upcoming = set()
+        if include_upcoming and len(COMPETITIONS) * 4 <= self.requests_remaining - reserve:
+            upcoming = self.fetch_upcoming_team_ids(season)
+            self.logger.info(f"{len(upcoming)} teams play in upcoming fixtures")
+            
+        budget = self.requests_remaining - reserve
+        plan = StatisticsScheduler(self.db).plan(budget, fixtures_per_request, upcoming, season)
+        if not plan:
+            self.logger.info("No statistics to collect within the request budget")
+            return 0
+            
+        self.logger.info(f"Collecting statistics for the {len(plan)} most valuable matches with {budget} requests")
+        return self.collect_statistics_concurrently(
+            plan, max_requests=budget, fixtures_per_request=fixtures_per_request
+        )
+    
+    def queue_season_jobs(self, season, league_ids=None, refresh=False):
+        """Queue the team and fixture list jobs of every competition for a season
+        
+        Jobs already queued are kept as they are, so this is safe to call on
+        every run; ``refresh`` makes finished ones pending again.
+        """
+        jobs = [
+            {'kind': kind, 'league_id': league_id, 'season': season}
+            for league_id in (league_ids or COMPETITIONS.values())
+            for kind in (TEAMS, FIXTURES)
+        ]
+        return self.jobs.enqueue_many(jobs, requeue_done=refresh)
+    
+    def queue_statistics_jobs(self, competition, season):
+        """Queue a statistics job for every match of a competition season without statistics"""
+        matches = self.db.get_matches_without_statistics(competition, str(season))
+        return self.jobs.enqueue_many(
+            {'kind': STATISTICS, 'match_id': match_id, 'fixture_id': fixture_id}
+            for match_id, fixture_id in matches
+            if fixture_id is not None
+        )
+    
+    def run_jobs(self, owner=None, max_requests=None, lease_seconds=300):
+        """Work through the job queue until it is drained or the request budget is spent
+        
+        Team lists go first, then fixture lists (which queue their matches'
+        statistics), then statistics in groups of up to 20 fixtures per
+        request. Any number of processes can run this at once: each claims
+        its own jobs, and jobs of a crashed worker are reclaimed once their
+        lease expires. Returns the number of jobs completed.
+        """
+        owner = owner or f"{socket.gethostname()}:{os.getpid()}"
+        competitions = {league_id: code for code, league_id in COMPETITIONS.items()}
+        initial_requests = self.requests_made
+        completed = 0
+        
+        for kind in (TEAMS, FIXTURES, STATISTICS):
+            while True:
+                if self.requests_remaining <= 0:
+                    self.logger.warning("Stopping job queue due to rate limit")
+                    return completed
+                if max_requests and (self.requests_made - initial_requests) >= max_requests:
+                    self.logger.info(f"Stopping after using {max_requests} requests as requested")
+                    return completed
+                    
+                claimed = self.jobs.claim(
+                    kind, owner, FIXTURES_PER_REQUEST if kind == STATISTICS else 1, lease_seconds
+                )
+                if not claimed:
+                    break
+                    
+                try:
+                    if kind == STATISTICS:
+                        completed += self._run_statistics_jobs(claimed)
+                    else:
+                        completed += self._run_league_job(claimed[0], competitions)
+                except Exception as e:
+                    self.logger.error(f"Error running {kind} jobs: {str(e)}")
+                    self.jobs.fail([job['id'] for job in claimed], e)
+                    
+        return completed
+    
+    def _run_league_job(self, job, competitions):
+        """Run one team or fixture list job and record its outcome"""
+        league_id, season = job['league_id'], job['season']
+        if job['kind'] == TEAMS:
+            ok = self.collect_team_data(league_id, season)
+        else:
+            ok = self.collect_match_data(league_id, season)
+            
+        if not ok and self.requests_remaining <= 0:
+            self.jobs.release([job['id']])
+            return 0
+        if not ok:
+            self.jobs.fail([job['id']], f"No {job['kind']} stored for league {league_id} season {season}")
+            return 0
+            
+        if job['kind'] == FIXTURES and league_id in competitions:
+            self.queue_statistics_jobs(competitions[league_id], season)
+        self.jobs.complete([job['id']])
+        return 1
+    
+    def _run_statistics_jobs(self, jobs):
+        """Fetch one group of statistics jobs with a single request and record the outcomes"""
+        matches = [(job['match_id'], job['fixture_id']) for job in jobs]
+        fixtures_data = self.fetch_data('fixtures', {
+            'ids': '-'.join(str(fixture_id) for _, fixture_id in matches)
+        })
+        
+        if fixtures_data is None:
+            if self.requests_remaining <= 0:
+                self.jobs.release([job['id'] for job in jobs])
+            else:
+                self.jobs.fail([job['id'] for job in jobs], "Statistics request failed")
+            return 0
+            
+        rows = self.parse_fixtures_statistics(matches, fixtures_data)
+        self.db.insert_team_stats_bulk(rows)
+        
+        stored = {row['match_id'] for row in rows}
+        done = [job['id'] for job in jobs if job['match_id'] in stored]
+        missing = [job['id'] for job in jobs if job['match_id'] not in stored]
+        self.jobs.complete(done)
+        if missing:
+            self.jobs.fail(missing, "No statistics published yet", STATISTICS_RETRY_DELAY)
+        return len(done)
+    
     def close(self):
         """Clean up resources"""
+        self.session.close()
         self.db.close() 
\ No newline at end of file
@@ -3,148 +3,637 @@ import os
 from datetime import datetime
 import logging
 from pathlib import Path
+from .migrations import migrate
+from .dates import to_epoch
+from .pool import ConnectionPool
+from .identity import TeamIdentityMap
+from .queries import (
+    MATCHES_WITHOUT_STATISTICS, PLAYER_APPEARANCES, TEAM_BY_API_ID, TEAM_BY_NAME,
+    TEAM_BY_NAME_AND_LEAGUE, TEAM_MATCHES_BEFORE, TEAM_SQUAD
+)
 
 class Database:
     def __init__(self, db_path='data.db'):
-        """Initialize database connection and create tables if they don't exist."""
+        """Initialize the connection pool and create tables if they don't exist."""
         self.db_path = db_path
-        self.conn = sqlite3.connect(db_path)
-        self.cursor = self.conn.cursor()
+        self.pool = ConnectionPool(db_path)
         self.create_tables()
+        with self.pool.writer() as conn:
+            migrate(conn)
+        self.teams = TeamIdentityMap()
+        self.warm_team_cache()
     
     def create_tables(self):
         """Create necessary database tables if they don't exist."""
-        self.cursor.executescript('''
-            CREATE TABLE IF NOT EXISTS teams (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                name TEXT NOT NULL,
-                league TEXT NOT NULL,
-                country TEXT,
-                UNIQUE(name, league)
-            );
-            
-            CREATE TABLE IF NOT EXISTS matches (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                home_team_id INTEGER,
-                away_team_id INTEGER,
-                home_score INTEGER,
-                away_score INTEGER,
-                date TEXT,
-                competition TEXT,
-                season TEXT,
-                api_fixture_id INTEGER,
-                FOREIGN KEY (home_team_id) REFERENCES teams (id),
-                FOREIGN KEY (away_team_id) REFERENCES teams (id),
-                UNIQUE(home_team_id, away_team_id, date)
-            );
-            
-            CREATE TABLE IF NOT EXISTS team_stats (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                team_id INTEGER,
-                match_id INTEGER,
-                possession REAL,
-                shots INTEGER,
-                shots_on_target INTEGER,
-                corners INTEGER,
-                fouls INTEGER,
-                FOREIGN KEY (team_id) REFERENCES teams (id),
-                FOREIGN KEY (match_id) REFERENCES matches (id),
-                UNIQUE(team_id, match_id)
-            );
-        ''')
-        self.conn.commit()
-    
-    def insert_team(self, name, league, country=None):
+        with self.pool.writer() as conn:
+            conn.executescript('''
+                CREATE TABLE IF NOT EXISTS teams (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    name TEXT NOT NULL,
+                    league TEXT NOT NULL,
+                    country TEXT,
+                    UNIQUE(name, league)
+                );
+                
+                CREATE TABLE IF NOT EXISTS matches (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    home_team_id INTEGER,
+                    away_team_id INTEGER,
+                    home_score INTEGER,
+                    away_score INTEGER,
+                    date TEXT,
+                    competition TEXT,
+                    season TEXT,
+                    api_fixture_id INTEGER,
+                    FOREIGN KEY (home_team_id) REFERENCES teams (id),
+                    FOREIGN KEY (away_team_id) REFERENCES teams (id),
+                    UNIQUE(home_team_id, away_team_id, date)
+                );
+                
+                CREATE TABLE IF NOT EXISTS team_stats (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    team_id INTEGER,
+                    match_id INTEGER,
+                    possession REAL,
+                    shots INTEGER,
+                    shots_on_target INTEGER,
+                    corners INTEGER,
+                    fouls INTEGER,
+                    FOREIGN KEY (team_id) REFERENCES teams (id),
+                    FOREIGN KEY (match_id) REFERENCES matches (id),
+                    UNIQUE(team_id, match_id)
+                );
+            ''')
+    
+    def warm_team_cache(self):
+        """Load the most recently added teams into the identity map."""
+        rows = self.pool.reader().execute(
+            'SELECT id, name, league, api_team_id FROM teams ORDER BY id DESC LIMIT ?',
+            (self.teams.maxsize,)
+        ).fetchall()
+        self.teams.warm(reversed(rows))
+    
+    def insert_team(self, name, league, country=None, api_team_id=None):
         """Insert a team and return its ID."""
+        return self.insert_teams_bulk([{
+            'name': name,
+            'league': league,
+            'country': country,
+            'api_team_id': api_team_id
+        }])[0]
+    
+    def insert_match(self, home_team_id, away_team_id, home_score, away_score, date, competition, season, api_fixture_id=None):
+        """Insert a match and return its ID."""
+        return self.insert_matches_bulk([{
+            'home_team_id': home_team_id,
+            'away_team_id': away_team_id,
+            'home_score': home_score,
+            'away_score': away_score,
+            'date': date,
+            'competition': competition,
+            'season': season,
+            'api_fixture_id': api_fixture_id
+        }])[0]
+    
+    def insert_team_stats(self, team_id, match_id, possession, shots, shots_on_target, corners, fouls):
+        """Insert team statistics for a match."""
+        self.insert_team_stats_bulk([{
+            'team_id': team_id,
+            'match_id': match_id,
+            'possession': possession,
+            'shots': shots,
+            'shots_on_target': shots_on_target,
+            'corners': corners,
+            'fouls': fouls
+        }])
+    
+    def insert_teams_bulk(self, rows):
+        """Insert teams in one transaction and return their IDs in row order.
+        
+        Each row is a dict with ``name``, ``league`` and optionally ``country``
+        and ``api_team_id``. Rows with an ``api_team_id`` resolve by that id,
+        so a provider team maps to one row whatever name or league label it
+        arrives with. Teams already in the identity map never reach the
+        database.
+        """
+        rows = [{'country': None, 'api_team_id': None, **row} for row in rows]
+        ids = [self._cached_team_id(row) for row in rows]
+        missing = [row for row, team_id in zip(rows, ids) if team_id is None]
+        
+        if missing:
+            try:
+                with self.pool.writer() as conn:
+                    by_api_id = self._resolve_ids(
+                        conn, 'teams', ('api_team_id',),
+                        [(row['api_team_id'],) for row in missing if row['api_team_id'] is not None]
+                    )
+                    
+                    # One insert per provider id and name, so neither unique key conflicts
+                    new = {}
+                    seen_api_ids = set()
+                    for row in missing:
+                        if row['api_team_id'] is not None:
+                            if (row['api_team_id'],) in by_api_id or row['api_team_id'] in seen_api_ids:
+                                continue
+                            seen_api_ids.add(row['api_team_id'])
+                        new.setdefault((row['name'], row['league']), row)
+                        
+                    # Teams stored by name before their provider id was known get it now
+                    conn.executemany('''
+                        INSERT INTO teams (name, league, country, api_team_id)
+                        VALUES (:name, :league, :country, :api_team_id)
+                        ON CONFLICT (name, league) DO UPDATE SET api_team_id = excluded.api_team_id
+                        WHERE teams.api_team_id IS NULL AND excluded.api_team_id IS NOT NULL
+                    ''', list(new.values()))
+                    
+                    # Get the team IDs (whether they were just inserted or already existed)
+                    by_api_id.update(self._resolve_ids(
+                        conn, 'teams', ('api_team_id',),
+                        [(row['api_team_id'],) for row in missing if row['api_team_id'] is not None]
+                    ))
+                    by_name = self._resolve_ids(
+                        conn, 'teams', ('name', 'league'),
+                        [(row['name'], row['league']) for row in missing]
+                    )
+                    
+            except sqlite3.Error as e:
+                logging.error(f"Database error inserting {len(missing)} teams: {str(e)}")
+                raise
+                
+            ids = [
+                team_id if team_id is not None
+                else by_api_id.get((row['api_team_id'],), by_name.get((row['name'], row['league'])))
+                for row, team_id in zip(rows, ids)
+            ]
+            
+        for row, team_id in zip(rows, ids):
+            self.teams.add(team_id, row['name'], row['league'], row['api_team_id'])
+            
+        return ids
+    
+    def _cached_team_id(self, row):
+        """Resolve a team row from the identity map.
+        
+        Rows with a provider id only resolve by it, so a team first cached
+        by name still gets its ``api_team_id`` stored.
+        """
+        if row['api_team_id'] is not None:
+            return self.teams.get_by_api_id(row['api_team_id'])
+        return self.teams.get(row['name'], row['league'])
+    
+    def insert_matches_bulk(self, rows):
+        """Insert matches in one transaction and return their IDs in row order.
+        
+        Each row is a dict keyed like the ``insert_match`` arguments;
+        ``api_fixture_id`` may be omitted. ``date_ts`` (epoch seconds) is
+        derived from ``date`` unless the row provides it.
+        """
+        rows = self._normalize_match_rows(rows)
+        if not rows:
+            return []
+            
         try:
-            self.cursor.execute('''
-                INSERT OR IGNORE INTO teams (name, league, country)
-                VALUES (?, ?, ?)
-            ''', (name, league, country))
-            self.conn.commit()
+            with self.pool.writer() as conn:
+                conn.executemany('''
+                    INSERT OR IGNORE INTO matches (
+                        home_team_id, away_team_id, home_score, away_score,
+                        date, date_ts, competition, season, api_fixture_id
+                    )
+                    VALUES (
+                        :home_team_id, :away_team_id, :home_score, :away_score,
+                        :date, :date_ts, :competition, :season, :api_fixture_id
+                    )
+                ''', rows)
+                
+                # Get the match IDs (whether they were just inserted or already
+                # existed), by fixture id where known
+                by_fixture_id = self._resolve_ids(
+                    conn, 'matches', ('api_fixture_id',),
+                    [(row['api_fixture_id'],) for row in rows if row['api_fixture_id'] is not None]
+                )
+                keys = [(row['home_team_id'], row['away_team_id'], row['date']) for row in rows]
+                by_key = self._resolve_ids(
+                    conn, 'matches', ('home_team_id', 'away_team_id', 'date'),
+                    [key for row, key in zip(rows, keys) if (row['api_fixture_id'],) not in by_fixture_id]
+                )
+                
+            return [
+                by_fixture_id[(row['api_fixture_id'],)] if (row['api_fixture_id'],) in by_fixture_id
+                else by_key[key]
+                for row, key in zip(rows, keys)
+            ]
             
-            # Get the team ID (whether it was just inserted or already existed)
-            self.cursor.execute('SELECT id FROM teams WHERE name = ? AND league = ?', (name, league))
-            return self.cursor.fetchone()[0]
+        except sqlite3.Error as e:
+            logging.error(f"Database error inserting {len(rows)} matches: {str(e)}")
+            raise
+    
+    def upsert_matches_bulk(self, rows):
+        """Insert new matches and update changed ones in one transaction.
+        
+        Rows are keyed like ``insert_matches_bulk`` rows and match existing
+        ones by fixture ID, or by teams and date. Existing matches are only
+        rewritten when something differs (a rescheduled fixture moves to its
+        new date), so unchanged rows cost no write and bump no team
+        version. Returns the number of rows inserted or updated.
+        """
+        rows = self._normalize_match_rows(rows)
+        if not rows:
+            return 0
             
+        try:
+            with self.pool.writer() as conn:
+                cursor = conn.executemany('''
+                    INSERT INTO matches (
+                        home_team_id, away_team_id, home_score, away_score,
+                        date, date_ts, competition, season, api_fixture_id
+                    )
+                    VALUES (
+                        :home_team_id, :away_team_id, :home_score, :away_score,
+                        :date, :date_ts, :competition, :season, :api_fixture_id
+                    )
+                    ON CONFLICT (api_fixture_id) DO UPDATE SET
+                        home_team_id = excluded.home_team_id,
+                        away_team_id = excluded.away_team_id,
+                        home_score = excluded.home_score,
+                        away_score = excluded.away_score,
+                        date = excluded.date,
+                        date_ts = excluded.date_ts
+                    WHERE matches.home_team_id IS NOT excluded.home_team_id
+                    OR matches.away_team_id IS NOT excluded.away_team_id
+                    OR matches.home_score IS NOT excluded.home_score
+                    OR matches.away_score IS NOT excluded.away_score
+                    OR matches.date IS NOT excluded.date
+                    OR matches.date_ts IS NOT excluded.date_ts
+                    ON CONFLICT (home_team_id, away_team_id, date) DO UPDATE SET
+                        home_score = excluded.home_score,
+                        away_score = excluded.away_score,
+                        date_ts = excluded.date_ts,
+                        api_fixture_id = COALESCE(excluded.api_fixture_id, matches.api_fixture_id)
+                    WHERE matches.home_score IS NOT excluded.home_score
+                    OR matches.away_score IS NOT excluded.away_score
+                    OR matches.date_ts IS NOT excluded.date_ts
+                    OR matches.api_fixture_id IS NOT COALESCE(excluded.api_fixture_id, matches.api_fixture_id)
+                ''', rows)
+                # rowcount leaves out the team_versions trigger writes
+                return cursor.rowcount
+                
         except sqlite3.Error as e:
-            logging.error(f"Database error inserting team {name}: {str(e)}")
+            logging.error(f"Database error upserting {len(rows)} matches: {str(e)}")
             raise
     
-    def insert_match(self, home_team_id, away_team_id, home_score, away_score, date, competition, season, api_fixture_id):
-        """Insert a match and return its ID."""
+    def insert_team_stats_bulk(self, rows):
+        """Insert team statistics for many matches in one transaction.
+        
+        Each row is a dict keyed like the ``insert_team_stats`` arguments.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+            
         try:
-            self.cursor.execute('''
-                INSERT OR IGNORE INTO matches (
-                    home_team_id, away_team_id, home_score, away_score,
-                    date, competition, season, api_fixture_id
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                home_team_id, away_team_id, home_score, away_score,
-                date, competition, season, api_fixture_id
-            ))
-            self.conn.commit()
+            with self.pool.writer() as conn:
+                conn.executemany('''
+                    INSERT OR REPLACE INTO team_stats (
+                        team_id, match_id, possession, shots,
+                        shots_on_target, corners, fouls
+                    )
+                    VALUES (
+                        :team_id, :match_id, :possession, :shots,
+                        :shots_on_target, :corners, :fouls
+                    )
+                ''', rows)
+                
+        except sqlite3.Error as e:
+            logging.error(f"Database error inserting {len(rows)} team stats: {str(e)}")
+            raise
+    
+    def insert_player(self, name, team_id, position=None, nationality=None):
+        """Insert a player, or fill in the known details of an existing one, and return its ID."""
+        return self.insert_players_bulk([{
+            'name': name,
+            'team_id': team_id,
+            'position': position,
+            'nationality': nationality
+        }])[0]
+    
+    def insert_player_stats(self, player_id, match_id, minutes, goals, assists,
+                            shots, shots_on_target, passes, pass_accuracy):
+        """Insert a player's statistics for a match."""
+        self.insert_player_stats_bulk([{
+            'player_id': player_id,
+            'match_id': match_id,
+            'minutes': minutes,
+            'goals': goals,
+            'assists': assists,
+            'shots': shots,
+            'shots_on_target': shots_on_target,
+            'passes': passes,
+            'pass_accuracy': pass_accuracy
+        }])
+    
+    def insert_players_bulk(self, rows):
+        """Insert players in one transaction and return their IDs in row order.
+        
+        Each row is a dict with ``name``, ``team_id`` and optionally
+        ``position`` and ``nationality``. A player is identified by name
+        within a team; known details are never overwritten with None.
+        """
+        rows = [{'position': None, 'nationality': None, **row} for row in rows]
+        if not rows:
+            return []
             
-            # Get the match ID (whether it was just inserted or already existed)
-            self.cursor.execute('''
-                SELECT id FROM matches 
-                WHERE home_team_id = ? AND away_team_id = ? AND date = ?
-            ''', (home_team_id, away_team_id, date))
-            return self.cursor.fetchone()[0]
+        try:
+            with self.pool.writer() as conn:
+                ids = self._upsert_players(conn, rows)
+            return [ids[(row['team_id'], row['name'])] for row in rows]
             
         except sqlite3.Error as e:
-            logging.error(f"Database error inserting match: {str(e)}")
+            logging.error(f"Database error inserting {len(rows)} players: {str(e)}")
             raise
     
-    def insert_team_stats(self, team_id, match_id, possession, shots, shots_on_target, corners, fouls):
-        """Insert team statistics for a match."""
+    def insert_player_stats_bulk(self, rows):
+        """Insert player statistics in one transaction, replacing earlier rows for the same match.
+        
+        Each row is a dict keyed like the ``insert_player_stats`` arguments.
+        """
+        rows = list(rows)
+        if not rows:
+            return
+            
         try:
-            self.cursor.execute('''
-                INSERT OR REPLACE INTO team_stats (
-                    team_id, match_id, possession, shots,
-                    shots_on_target, corners, fouls
-                )
-                VALUES (?, ?, ?, ?, ?, ?, ?)
-            ''', (
-                team_id, match_id, possession, shots,
-                shots_on_target, corners, fouls
-            ))
-            self.conn.commit()
+            with self.pool.writer() as conn:
+                self._insert_player_stats(conn, rows)
+                
+        except sqlite3.Error as e:
+            logging.error(f"Database error inserting {len(rows)} player stats: {str(e)}")
+            raise
+    
+    def insert_match_players(self, match_id, rows):
+        """Store a match's players and their statistics in one transaction.
+        
+        Each row is a dict with the player's ``name``, ``team_id`` and
+        optionally ``position`` and ``nationality``, plus the player stat
+        fields of ``insert_player_stats``. Returns the player IDs in row order.
+        """
+        rows = [{'position': None, 'nationality': None, **row, 'match_id': match_id} for row in rows]
+        if not rows:
+            return []
+            
+        try:
+            with self.pool.writer() as conn:
+                ids = self._upsert_players(conn, rows)
+                player_ids = [ids[(row['team_id'], row['name'])] for row in rows]
+                self._insert_player_stats(conn, [
+                    {**row, 'player_id': player_id} for row, player_id in zip(rows, player_ids)
+                ])
+            return player_ids
             
         except sqlite3.Error as e:
-            logging.error(f"Database error inserting team stats: {str(e)}")
+            logging.error(f"Database error storing {len(rows)} players for match {match_id}: {str(e)}")
             raise
     
-    def get_team_id(self, name):
-        """Get team ID by name."""
+    def _upsert_players(self, conn, rows):
+        """Upsert players and return ``{(team_id, name): id}``."""
+        conn.executemany('''
+            INSERT INTO players (team_id, name, position, nationality)
+            VALUES (:team_id, :name, :position, :nationality)
+            ON CONFLICT (team_id, name) DO UPDATE SET
+                position = COALESCE(excluded.position, players.position),
+                nationality = COALESCE(excluded.nationality, players.nationality)
+            WHERE excluded.position IS NOT players.position
+                OR excluded.nationality IS NOT players.nationality
+        ''', rows)
+        return self._resolve_ids(conn, 'players', ('team_id', 'name'), [
+            (row['team_id'], row['name']) for row in rows
+        ])
+    
+    def _insert_player_stats(self, conn, rows):
+        """Insert player stat rows, taking the team from the player and the date from the match."""
+        conn.executemany('''
+            INSERT INTO player_stats (
+                player_id, match_id, team_id, date_ts, minutes, goals,
+                assists, shots, shots_on_target, passes, pass_accuracy
+            )
+            SELECT
+                p.id, m.id, p.team_id, m.date_ts, :minutes, :goals,
+                :assists, :shots, :shots_on_target, :passes, :pass_accuracy
+            FROM players p, matches m
+            WHERE p.id = :player_id AND m.id = :match_id
+            ON CONFLICT (player_id, match_id) DO UPDATE SET
+                minutes = excluded.minutes,
+                goals = excluded.goals,
+                assists = excluded.assists,
+                shots = excluded.shots,
+                shots_on_target = excluded.shots_on_target,
+                passes = excluded.passes,
+                pass_accuracy = excluded.pass_accuracy
+        ''', rows)
+    
+    def _normalize_match_rows(self, rows):
+        """Fill optional match columns and store dates in one text format."""
+        return [
+            {
+                'api_fixture_id': None,
+                'date_ts': to_epoch(row['date']),
+                **row,
+                'date': self._format_date(row['date'])
+            }
+            for row in rows
+        ]
+    
+    @staticmethod
+    def _format_date(value):
+        """Store datetimes as text the way sqlite3's default adapter did."""
+        if isinstance(value, datetime):
+            return value.isoformat(' ')
+        return value
+    
+    def _resolve_ids(self, conn, table, key_columns, keys):
+        """Map natural keys to row IDs, joining a chunk of keys per query."""
+        keys = list(dict.fromkeys(keys))
+        width = len(key_columns)
+        chunk_size = 999 // width  # SQLite's default bound parameter limit
+        columns = ', '.join(f'k{i}' for i in range(width))
+        on = ' AND '.join(f't.{column} = keys.k{i}' for i, column in enumerate(key_columns))
+        placeholder = '(' + ', '.join('?' * width) + ')'
+        
+        ids = {}
+        for start in range(0, len(keys), chunk_size):
+            chunk = keys[start:start + chunk_size]
+            rows = conn.execute(f'''
+                WITH keys({columns}) AS (VALUES {', '.join([placeholder] * len(chunk))})
+                SELECT {columns}, t.id
+                FROM keys
+                JOIN {table} t ON {on}
+            ''', [value for key in chunk for value in key]).fetchall()
+            for row in rows:
+                ids[tuple(row[:width])] = row[width]
+                
+        return ids
+    
+    def get_team_id(self, name, league=None):
+        """Get team ID by name, optionally within a league."""
+        if league is not None:
+            team_id = self.teams.get(name, league)
+            if team_id is not None:
+                return team_id
+                
         try:
-            self.cursor.execute('SELECT id FROM teams WHERE name = ?', (name,))
-            result = self.cursor.fetchone()
-            return result[0] if result else None
+            if league is None:
+                cursor = self.pool.reader().execute(TEAM_BY_NAME, (name,))
+            else:
+                cursor = self.pool.reader().execute(TEAM_BY_NAME_AND_LEAGUE, (name, league))
+            result = cursor.fetchone()
             
         except sqlite3.Error as e:
             logging.error(f"Database error getting team ID for {name}: {str(e)}")
             raise
+            
+        if result and league is not None:
+            self.teams.add(result[0], name, league)
+        return result[0] if result else None
+    
+    def get_team_id_by_api_id(self, api_team_id):
+        """Get team ID by API-Football team id."""
+        team_id = self.teams.get_by_api_id(api_team_id)
+        if team_id is not None:
+            return team_id
+            
+        try:
+            result = self.pool.reader().execute(TEAM_BY_API_ID, (api_team_id,)).fetchone()
+            
+        except sqlite3.Error as e:
+            logging.error(f"Database error getting team ID for API team {api_team_id}: {str(e)}")
+            raise
+            
+        if result:
+            self.teams.add(result[0], result[1], result[2], api_team_id)
+        return result[0] if result else None
+    
+    def get_team_name(self, team_id):
+        """Get a team's name by ID, or None if it doesn't exist."""
+        try:
+            result = self.pool.reader().execute('SELECT name FROM teams WHERE id = ?', (team_id,)).fetchone()
+            
+        except sqlite3.Error as e:
+            logging.error(f"Database error getting name of team {team_id}: {str(e)}")
+            raise
+            
+        return result[0] if result else None
+    
+    def get_match_data(self, match_id):
+        """Get a match as a dict of its columns, or None if it doesn't exist."""
+        try:
+            cursor = self.pool.reader().execute('''
+                SELECT id, home_team_id, away_team_id, home_score, away_score,
+                    date, date_ts, competition, season, api_fixture_id
+                FROM matches
+                WHERE id = ?
+            ''', (match_id,))
+            row = cursor.fetchone()
+            
+        except sqlite3.Error as e:
+            logging.error(f"Database error getting match {match_id}: {str(e)}")
+            raise
+            
+        if row is None:
+            return None
+        return dict(zip([column[0] for column in cursor.description], row))
+    
+    def get_player_id(self, name, team_id):
+        """Get player ID by name within a team."""
+        try:
+            result = self.pool.reader().execute(
+                'SELECT id FROM players WHERE team_id = ? AND name = ?', (team_id, name)
+            ).fetchone()
+            return result[0] if result else None
+            
+        except sqlite3.Error as e:
+            logging.error(f"Database error getting player ID for {name}: {str(e)}")
+            raise
+    
+    def get_squad(self, team_id):
+        """Get a team's players as ``(id, name, position, nationality)`` rows, by name."""
+        try:
+            return self.pool.reader().execute(TEAM_SQUAD, (team_id,)).fetchall()
+            
+        except sqlite3.Error as e:
+            logging.error(f"Database error getting squad for team {team_id}: {str(e)}")
+            raise
+    
+    def get_player_appearances(self, player_id, limit=5, before_ts=None):
+        """Get a player's last ``limit`` appearances, optionally strictly before epoch time ``before_ts``.
+        
+        Rows are ``(match_id, date_ts, minutes, goals, assists, shots, shots_on_target)``,
+        newest first, read by a range scan of the player's timeline index.
+        """
+        try:
+            return self.pool.reader().execute(PLAYER_APPEARANCES, {
+                'player_id': player_id,
+                'before_ts': to_epoch(before_ts) if before_ts is not None else 2 ** 62,
+                'limit': limit
+            }).fetchall()
+            
+        except sqlite3.Error as e:
+            logging.error(f"Database error getting appearances for player {player_id}: {str(e)}")
+            raise
+    
+    def get_team_matches_before(self, team_id, before_ts, limit=5):
+        """Get a team's last ``limit`` matches strictly before epoch time ``before_ts``.
+        
+        Rows are ``(id, date_ts, home_team_id, away_team_id, home_score, away_score)``,
+        newest first. Each side is answered by a range scan of its team timeline index.
+        """
+        try:
+            cursor = self.pool.reader().execute(
+                TEAM_MATCHES_BEFORE,
+                {'team_id': team_id, 'before_ts': to_epoch(before_ts), 'limit': limit}
+            )
+            return cursor.fetchall()
+            
+        except sqlite3.Error as e:
+            logging.error(f"Database error getting matches for team {team_id}: {str(e)}")
+            raise
     
     def get_matches_without_statistics(self, competition, season):
         """Get matches that don't have statistics recorded."""
         try:
-            self.cursor.execute('''
-                SELECT m.id, m.api_fixture_id
-                FROM matches m
-                LEFT JOIN team_stats ts ON m.id = ts.match_id
-                WHERE m.competition = ? 
-                AND m.season = ?
-                AND ts.id IS NULL
-            ''', (competition, season))
-            return self.cursor.fetchall()
+            cursor = self.pool.reader().execute(MATCHES_WITHOUT_STATISTICS, (competition, season))
+            return cursor.fetchall()
             
         except sqlite3.Error as e:
             logging.error(f"Database error getting matches without statistics: {str(e)}")
             raise
     
+    def get_collection_mark(self, league_id, season):
+        """Return the timestamp of the newest fixture collected for a league season, or None."""
+        try:
+            row = self.pool.reader().execute('''
+                SELECT last_fixture_ts FROM collection_state
+                WHERE league_id = ? AND season = ?
+            ''', (league_id, str(season))).fetchone()
+            return row[0] if row else None
+            
+        except sqlite3.Error as e:
+            logging.error(f"Database error getting collection mark for league {league_id}: {str(e)}")
+            raise
+    
+    def set_collection_mark(self, league_id, season, last_fixture_ts):
+        """Advance the collection high-water mark of a league season; it never moves back."""
+        try:
+            with self.pool.writer() as conn:
+                conn.execute('''
+                    INSERT INTO collection_state (league_id, season, last_fixture_ts, updated_at)
+                    VALUES (?, ?, ?, strftime('%s', 'now'))
+                    ON CONFLICT (league_id, season) DO UPDATE SET
+                        last_fixture_ts = MAX(last_fixture_ts, excluded.last_fixture_ts),
+                        updated_at = excluded.updated_at
+                ''', (league_id, str(season), int(last_fixture_ts)))
+                
+        except sqlite3.Error as e:
+            logging.error(f"Database error setting collection mark for league {league_id}: {str(e)}")
+            raise
+    
     def close(self):
-        """Close the database connection."""
-        if self.conn:
-            self.conn.close() 
\ No newline at end of file
+        """Close all pooled database connections."""
+        self.pool.close() 
\ No newline at end of file
@@ -0,0 +1,22 @@
+"""Normalization of match dates to integer epoch seconds."""
+
+from datetime import date, datetime, time
+
+def to_epoch(value):
+    """Convert a match date to integer seconds since the Unix epoch.
+
+    Accepts epoch numbers, ``datetime``/``date`` objects and ISO-8601 text
+    such as ``2023-08-11 20:00:00``. Naive values are read as local time,
+    matching the ``datetime.fromtimestamp`` values the collector has always
+    stored. Returns None for a missing date and raises ValueError for text
+    that is not a date.
+    """
+    if value is None:
+        return None
+    if isinstance(value, (int, float)):
+        return int(value)
+    if isinstance(value, str):
+        value = datetime.fromisoformat(value.strip())
+    elif not isinstance(value, datetime) and isinstance(value, date):
+        value = datetime.combine(value, time())
+    return int(value.timestamp())
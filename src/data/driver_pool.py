@@ -0,0 +1,134 @@
+"""Bounded pool of long-lived Selenium WebDriver instances."""
+
+import logging
+import threading
+import time
+from contextlib import contextmanager
+from selenium import webdriver
+from selenium.common.exceptions import WebDriverException
+
+def headless_chrome():
+    """Start a headless Chrome suitable for scraping."""
+    options = webdriver.ChromeOptions()
+    options.add_argument('--headless')
+    options.add_argument('--no-sandbox')
+    options.add_argument('--disable-dev-shm-usage')
+    return webdriver.Chrome(options=options)
+
+class DriverPool:
+    """Hand out at most ``size`` browsers, reusing them across pages.
+    
+    Every lease counts as one page. A driver is health-checked before it is
+    handed out, and replaced after ``max_pages`` pages (browsers leak memory
+    over long sessions) or when a lease ends in a WebDriver error, which
+    includes the ``page_timeout`` for loading a page running out.
+    """
+    
+    def __init__(self, size=2, max_pages=50, page_timeout=30, factory=headless_chrome):
+        """Create drivers lazily with ``factory`` as leases need them."""
+        self.size = size
+        self.max_pages = max_pages
+        self.page_timeout = page_timeout
+        self.factory = factory
+        self._idle = []  # Reuse the warmest browser first
+        self._pages = {}
+        self._created = 0
+        self._available = threading.Condition()
+        self._closed = False
+    
+    def _create(self):
+        driver = self.factory()
+        driver.set_page_load_timeout(self.page_timeout)
+        driver.set_script_timeout(self.page_timeout)
+        return driver
+    
+    def _discard(self, driver):
+        with self._available:
+            self._pages.pop(id(driver), None)
+            self._created -= 1
+            self._available.notify()
+        try:
+            driver.quit()
+        except Exception as e:
+            logging.warning(f"Error quitting WebDriver: {str(e)}")
+    
+    @staticmethod
+    def _is_healthy(driver):
+        try:
+            driver.execute_script('return 1')
+            return True
+        except WebDriverException:
+            return False
+    
+    def acquire(self, timeout=None):
+        """Lease a healthy driver, waiting up to ``timeout`` seconds when all are busy."""
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            with self._available:
+                while True:
+                    if self._closed:
+                        raise RuntimeError("Driver pool is closed")
+                    if self._idle or self._created < self.size:
+                        break
+                    remaining = None if deadline is None else deadline - time.monotonic()
+                    if remaining is not None and remaining <= 0:
+                        raise TimeoutError(f"No WebDriver free within {timeout}s")
+                    self._available.wait(remaining)
+                    
+                driver = self._idle.pop() if self._idle else None
+                if driver is None:
+                    self._created += 1
+                    
+            if driver is None:
+                try:
+                    driver = self._create()
+                except Exception:
+                    with self._available:
+                        self._created -= 1
+                        self._available.notify()
+                    raise
+                with self._available:
+                    self._pages[id(driver)] = 0
+                return driver
+                
+            if self._is_healthy(driver):
+                return driver
+            logging.warning("Replacing unresponsive WebDriver")
+            self._discard(driver)
+    
+    def release(self, driver, broken=False):
+        """Return a leased driver, quitting it if broken or worn out."""
+        with self._available:
+            pages = self._pages.get(id(driver), 0) + 1
+            self._pages[id(driver)] = pages
+            retire = broken or self._closed or pages >= self.max_pages
+            if not retire:
+                self._idle.append(driver)
+                self._available.notify()
+                
+        if retire:
+            self._discard(driver)
+    
+    @contextmanager
+    def driver(self, timeout=None):
+        """Lease a driver for one page; WebDriver errors retire it."""
+        driver = self.acquire(timeout)
+        try:
+            yield driver
+        except WebDriverException:
+            self.release(driver, broken=True)
+            raise
+        except BaseException:
+            self.release(driver)
+            raise
+        else:
+            self.release(driver)
+    
+    def close(self):
+        """Quit every idle driver; leased ones are quit when released."""
+        with self._available:
+            self._closed = True
+            idle, self._idle = self._idle, []
+            self._available.notify_all()
+        for driver in idle:
+            self._discard(driver)
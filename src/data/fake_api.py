@@ -0,0 +1,282 @@
+"""Local stand-in for the API-Football endpoints the collector uses.
+
+Serves deterministic synthetic leagues (or recorded responses) over HTTP,
+with API-Football's quota headers, configurable latency and injected
+errors, so collection can be benchmarked and regression-tested offline.
+"""
+
+import json
+import math
+import random
+import threading
+import time
+from collections import deque
+from datetime import datetime, timezone
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qsl, urlparse
+
+# Synthetic season: weekly rounds from early August
+SEASON_START = datetime(2023, 8, 12, 15, 0, tzinfo=timezone.utc)
+ROUND_SECONDS = 7 * 24 * 3600
+
+def _poisson(rng, lam):
+    """Draw a Poisson variate (Knuth's method; fine for football scores)."""
+    limit = math.exp(-lam)
+    k, p = 0, rng.random()
+    while p > limit:
+        k += 1
+        p *= rng.random()
+    return k
+
+class SyntheticLeague:
+    """A double round-robin season with seeded teams, scores and statistics."""
+    
+    def __init__(self, league_id, name, season, teams=20, seed=0, finished_rounds=None):
+        """Generate the season; rounds after ``finished_rounds`` are not played yet."""
+        rng = random.Random(f'{seed}:{league_id}:{season}')
+        self.league = {'id': league_id, 'name': name, 'country': 'Synthetic', 'season': int(season)}
+        self.teams = [
+            {'id': league_id * 1000 + i, 'name': f'{name} Team {i + 1}'}
+            for i in range(teams)
+        ]
+        strength = {team['id']: rng.gauss(0, 0.35) for team in self.teams}
+        
+        # Circle method: every team plays every other team home and away
+        ids = [team['id'] for team in self.teams] + ([None] if teams % 2 else [])
+        rounds = []
+        for _ in range(len(ids) - 1):
+            rounds.append([(ids[i], ids[-1 - i]) for i in range(len(ids) // 2)])
+            ids = [ids[0], ids[-1]] + ids[1:-1]
+        rounds += [[(away, home) for home, away in pairs] for pairs in rounds]
+        if finished_rounds is None:
+            finished_rounds = len(rounds)
+            
+        names = {team['id']: team['name'] for team in self.teams}
+        self.fixtures = []
+        for round_index, pairs in enumerate(rounds):
+            for home, away in pairs:
+                if home is None or away is None:
+                    continue
+                fixture_id = league_id * 100000 + len(self.fixtures) + 1
+                timestamp = int(SEASON_START.timestamp()) + round_index * ROUND_SECONDS
+                finished = round_index < finished_rounds
+                home_goals = _poisson(rng, math.exp(0.35 + strength[home] - strength[away]))
+                away_goals = _poisson(rng, math.exp(0.1 + strength[away] - strength[home]))
+                self.fixtures.append({
+                    'fixture': {
+                        'id': fixture_id,
+                        'date': datetime.fromtimestamp(timestamp, timezone.utc).isoformat(),
+                        'timestamp': timestamp,
+                        'status': {'short': 'FT' if finished else 'NS'}
+                    },
+                    'league': {**self.league, 'round': f'Regular Season - {round_index + 1}'},
+                    'teams': {
+                        'home': {'id': home, 'name': names[home]},
+                        'away': {'id': away, 'name': names[away]}
+                    },
+                    'goals': {
+                        'home': home_goals if finished else None,
+                        'away': away_goals if finished else None
+                    },
+                    'statistics': [
+                        self._team_statistics(rng, home, names[home], strength[home] - strength[away]),
+                        self._team_statistics(rng, away, names[away], strength[away] - strength[home])
+                    ] if finished else []
+                })
+    
+    @staticmethod
+    def _team_statistics(rng, team_id, name, edge):
+        possession = max(25, min(75, round(50 + 20 * edge + rng.gauss(0, 6))))
+        shots = _poisson(rng, 12 * math.exp(edge))
+        return {
+            'team': {'id': team_id, 'name': name},
+            'statistics': [
+                {'type': 'Ball Possession', 'value': f'{possession}%'},
+                {'type': 'Total Shots', 'value': shots},
+                {'type': 'Shots on Goal', 'value': min(shots, _poisson(rng, 4 * math.exp(edge)))},
+                {'type': 'Corner Kicks', 'value': _poisson(rng, 5)},
+                {'type': 'Fouls', 'value': _poisson(rng, 11)}
+            ]
+        }
+
+class FakeAPIFootball:
+    """Threaded HTTP server answering ``status``, ``teams``, ``fixtures`` and ``fixtures/statistics``.
+    
+    ``leagues`` maps league names to IDs, like ``config.COMPETITIONS``.
+    Each request sleeps ``latency`` seconds (plus up to ``jitter``). A
+    share ``error_rate`` of requests fails with a 500, and ``throttle_rate``
+    answers with 429 and a ``Retry-After``. Requests beyond ``per_minute``
+    in any 60 seconds are throttled too, and ones beyond ``daily_limit``
+    get an API-Football style ``requests`` error. Responses found in
+    ``recorded`` (a ``ResponseCache``) are served instead of synthetic ones.
+    """
+    
+    def __init__(self, leagues, season=2023, teams=20, seed=0, finished_rounds=None,
+                 latency=0.0, jitter=0.0, error_rate=0.0, throttle_rate=0.0,
+                 per_minute=300, daily_limit=7500, recorded=None, host='127.0.0.1', port=0):
+        self.leagues = {
+            league_id: SyntheticLeague(league_id, name, season, teams, seed, finished_rounds)
+            for name, league_id in leagues.items()
+        }
+        self.fixtures = {
+            fixture['fixture']['id']: fixture
+            for league in self.leagues.values()
+            for fixture in league.fixtures
+        }
+        self.latency = latency
+        self.jitter = jitter
+        self.error_rate = error_rate
+        self.throttle_rate = throttle_rate
+        self.per_minute = per_minute
+        self.daily_limit = daily_limit
+        self.recorded = recorded
+        self.requests = 0
+        self.endpoint_counts = {}
+        self._recent = deque()
+        self._lock = threading.Lock()
+        self._rng = random.Random(seed)
+        
+        server = self
+        class Handler(BaseHTTPRequestHandler):
+            def do_GET(self):
+                server._handle(self)
+            
+            def log_message(self, format, *args):
+                pass
+                
+        self._server = ThreadingHTTPServer((host, port), Handler)
+        self._server.daemon_threads = True
+        self._thread = None
+    
+    @property
+    def base_url(self):
+        host, port = self._server.server_address[:2]
+        return f'http://{host}:{port}'
+    
+    def start(self):
+        """Serve in a background thread and return the base URL."""
+        self._thread = threading.Thread(target=self._server.serve_forever, name='fake-api-football', daemon=True)
+        self._thread.start()
+        return self.base_url
+    
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+        if self._thread:
+            self._thread.join()
+    
+    def __enter__(self):
+        self.start()
+        return self
+    
+    def __exit__(self, *exc_info):
+        self.stop()
+    
+    def _handle(self, request):
+        url = urlparse(request.path)
+        endpoint = url.path.strip('/')
+        params = dict(parse_qsl(url.query))
+        
+        delay = self.latency + (self._rng.uniform(0, self.jitter) if self.jitter else 0)
+        if delay:
+            time.sleep(delay)
+            
+        now = time.monotonic()
+        with self._lock:
+            while self._recent and self._recent[0] <= now - 60:
+                self._recent.popleft()
+            minute_exceeded = len(self._recent) >= self.per_minute
+            roll = self._rng.random()
+            if not minute_exceeded:
+                self._recent.append(now)
+                self.requests += 1
+                self.endpoint_counts[endpoint] = self.endpoint_counts.get(endpoint, 0) + 1
+            used = self.requests
+            minute_remaining = max(0, self.per_minute - len(self._recent))
+            
+        headers = {
+            'x-ratelimit-requests-limit': self.daily_limit,
+            'x-ratelimit-requests-remaining': max(0, self.daily_limit - used),
+            'X-RateLimit-Limit': self.per_minute,
+            'X-RateLimit-Remaining': minute_remaining
+        }
+        
+        if minute_exceeded or roll < self.throttle_rate:
+            self._send(request, 429, {'message': 'Too many requests'}, {**headers, 'Retry-After': 1})
+        elif roll < self.throttle_rate + self.error_rate:
+            self._send(request, 500, {'message': 'Internal server error'}, headers)
+        elif used > self.daily_limit:
+            self._send(request, 200, self._envelope(endpoint, params, [], {
+                'requests': 'You have reached the request limit for the day'
+            }), headers)
+        else:
+            self._send(request, 200, self._respond(endpoint, params, used), headers)
+    
+    def _send(self, request, status, body, headers):
+        payload = json.dumps(body).encode('utf-8')
+        request.send_response(status)
+        request.send_header('Content-Type', 'application/json')
+        request.send_header('Content-Length', str(len(payload)))
+        for name, value in headers.items():
+            request.send_header(name, str(value))
+        request.end_headers()
+        request.wfile.write(payload)
+    
+    @staticmethod
+    def _envelope(endpoint, params, response, errors=None):
+        return {
+            'get': endpoint,
+            'parameters': params,
+            'errors': errors or [],
+            'results': len(response),
+            'paging': {'current': 1, 'total': 1},
+            'response': response
+        }
+    
+    def _respond(self, endpoint, params, used):
+        if self.recorded is not None:
+            recorded = self.recorded.get(endpoint, params)
+            if recorded is not None:
+                return recorded
+                
+        if endpoint == 'status':
+            return self._envelope(endpoint, params, {
+                'requests': {'current': used, 'limit_day': self.daily_limit}
+            })
+            
+        if endpoint == 'teams':
+            league = self.leagues.get(int(params.get('league', 0)))
+            teams = [{'team': team, 'venue': {'country': 'Synthetic'}} for team in league.teams] if league else []
+            return self._envelope(endpoint, params, teams)
+            
+        if endpoint == 'fixtures/statistics':
+            fixture = self.fixtures.get(int(params.get('fixture', 0)))
+            return self._envelope(endpoint, params, fixture['statistics'] if fixture else [])
+            
+        if endpoint == 'fixtures':
+            return self._envelope(endpoint, params, self._fixtures(params))
+            
+        return self._envelope(endpoint, params, [], {'endpoint': f'Unknown endpoint {endpoint}'})
+    
+    def _fixtures(self, params):
+        """Filter fixtures like API-Football; only ``ids`` lookups embed statistics."""
+        if 'ids' in params or 'id' in params:
+            ids = [int(fixture_id) for fixture_id in (params.get('ids') or params['id']).split('-')][:20]
+            return [self.fixtures[fixture_id] for fixture_id in ids if fixture_id in self.fixtures]
+            
+        league = self.leagues.get(int(params.get('league', 0)))
+        fixtures = league.fixtures if league else []
+        if params.get('status'):
+            statuses = set(params['status'].split('-'))
+            fixtures = [fixture for fixture in fixtures if fixture['fixture']['status']['short'] in statuses]
+        if params.get('from'):
+            start = datetime.fromisoformat(params['from']).replace(tzinfo=timezone.utc).timestamp()
+            fixtures = [fixture for fixture in fixtures if fixture['fixture']['timestamp'] >= start]
+        if params.get('to'):
+            end = datetime.fromisoformat(params['to']).replace(tzinfo=timezone.utc).timestamp() + 86400
+            fixtures = [fixture for fixture in fixtures if fixture['fixture']['timestamp'] < end]
+        if params.get('next'):
+            fixtures = [fixture for fixture in fixtures if fixture['fixture']['status']['short'] == 'NS']
+            fixtures = fixtures[:int(params['next'])]
+            
+        return [{key: value for key, value in fixture.items() if key != 'statistics'} for fixture in fixtures]
@@ -0,0 +1,95 @@
+"""LRU cache of per-team features, invalidated by the team data versions."""
+
+import threading
+from collections import OrderedDict
+
+class FeatureCache:
+    """Cache of feature values keyed by ``(team_id, window, as_of)``.
+    
+    Every write touching a team bumps its row in ``team_versions`` (see
+    migration 3). Before serving entries the cache asks SQLite for
+    ``PRAGMA data_version``, which changes only when another connection or
+    process has committed. Only then does it re-read the team versions and
+    drop entries of teams whose version moved, so repeat lookups without
+    intervening writes never touch the tables. When the pool's reader is
+    its writer (``:memory:``) the team versions are compared on every
+    lookup, as that connection's data_version misses its own commits.
+    """
+    
+    def __init__(self, pool, maxsize=1024):
+        """Cache features read through ``pool``, holding at most ``maxsize`` entries."""
+        self.pool = pool
+        self.maxsize = maxsize
+        self._entries = OrderedDict()
+        self._team_versions = {}
+        self._lock = threading.Lock()
+        self._local = threading.local()
+        self.hits = 0
+        self.misses = 0
+    
+    def _sync(self):
+        """Drop entries of teams written to since the last check on this thread."""
+        conn = self.pool.reader()
+        # data_version is per connection, and a released reader gets replaced
+        data_version = (conn, conn.execute('PRAGMA data_version').fetchone()[0])
+        if not self.pool.shared_reader and getattr(self._local, 'data_version', None) == data_version:
+            return
+            
+        versions = dict(conn.execute('SELECT team_id, version FROM team_versions').fetchall())
+        with self._lock:
+            changed = {
+                team_id for team_id in set(versions) | set(self._team_versions)
+                if versions.get(team_id) != self._team_versions.get(team_id)
+            }
+            if changed:
+                for key in [key for key in self._entries if key[0] in changed]:
+                    del self._entries[key]
+            self._team_versions = versions
+        self._local.data_version = data_version
+    
+    def get_many(self, team_ids, window, as_of, load):
+        """Return ``{team_id: value}`` for ``team_ids``, loading misses in one call.
+        
+        ``load(missing_team_ids)`` must return a dict of values for those
+        teams; teams it leaves out are cached as None.
+        """
+        self._sync()
+        
+        values = {}
+        missing = []
+        with self._lock:
+            for team_id in dict.fromkeys(team_ids):
+                key = (team_id, window, as_of)
+                if key in self._entries:
+                    self._entries.move_to_end(key)
+                    values[team_id] = self._entries[key]
+                    self.hits += 1
+                else:
+                    missing.append(team_id)
+                    self.misses += 1
+            loaded_versions = {team_id: self._team_versions.get(team_id) for team_id in missing}
+            
+        if missing:
+            loaded = load(missing)
+            with self._lock:
+                for team_id in missing:
+                    values[team_id] = loaded.get(team_id)
+                    # Skip values another thread saw invalidated while we loaded them
+                    if self._team_versions.get(team_id) == loaded_versions[team_id]:
+                        self._entries[(team_id, window, as_of)] = values[team_id]
+                while len(self._entries) > self.maxsize:
+                    self._entries.popitem(last=False)
+                    
+        return values
+    
+    def get(self, team_id, window, as_of, load):
+        """Return the value for one team, loading it with ``load(team_id)`` on a miss."""
+        return self.get_many(
+            [team_id], window, as_of,
+            lambda missing: {missing[0]: load(missing[0])}
+        )[team_id]
+    
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._entries.clear()
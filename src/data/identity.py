@@ -0,0 +1,56 @@
+"""In-process identity map for resolving teams without a database round-trip."""
+
+import threading
+from collections import OrderedDict
+
+class TeamIdentityMap:
+    """Bounded LRU map from ``(name, league)`` and API-Football team ids to team IDs."""
+    
+    def __init__(self, maxsize=4096):
+        """Create an empty map holding at most ``maxsize`` entries per key type."""
+        self.maxsize = maxsize
+        self._by_name = OrderedDict()
+        self._by_api_id = OrderedDict()
+        self._lock = threading.Lock()
+    
+    def _get(self, entries, key):
+        with self._lock:
+            team_id = entries.get(key)
+            if team_id is not None:
+                entries.move_to_end(key)
+            return team_id
+    
+    def _put(self, entries, key, team_id):
+        entries[key] = team_id
+        entries.move_to_end(key)
+        if len(entries) > self.maxsize:
+            entries.popitem(last=False)
+    
+    def get(self, name, league):
+        """Return the cached ID for a team name in a league, or None."""
+        return self._get(self._by_name, (name, league))
+    
+    def get_by_api_id(self, api_team_id):
+        """Return the cached ID for an API-Football team id, or None."""
+        return self._get(self._by_api_id, api_team_id)
+    
+    def add(self, team_id, name, league, api_team_id=None):
+        """Record a team's ID under its name and, if known, its API id."""
+        with self._lock:
+            self._put(self._by_name, (name, league), team_id)
+            if api_team_id is not None:
+                self._put(self._by_api_id, api_team_id, team_id)
+    
+    def warm(self, rows):
+        """Load ``(team_id, name, league[, api_team_id])`` rows, least recently used first."""
+        for team_id, name, league, *api_team_id in rows:
+            self.add(team_id, name, league, *api_team_id)
+    
+    def clear(self):
+        """Drop every cached entry."""
+        with self._lock:
+            self._by_name.clear()
+            self._by_api_id.clear()
+    
+    def __len__(self):
+        return len(self._by_name)
@@ -0,0 +1,171 @@
+"""Durable queue of collection jobs shared by any number of worker processes."""
+
+import logging
+import sqlite3
+import time
+import uuid
+from .queries import CLAIM_JOBS, CLAIMED_JOBS
+
+# Job kinds, one API request each (statistics jobs are fetched in groups)
+TEAMS = 'teams'
+FIXTURES = 'fixtures'
+STATISTICS = 'statistics'
+
+PENDING = 'pending'
+RUNNING = 'running'
+DONE = 'done'
+FAILED = 'failed'
+
+def job_key(kind, league_id=None, season=None, fixture_id=None):
+    """Return the identity of a fetch unit, so it is only ever queued once."""
+    if kind == STATISTICS:
+        return f'{kind}:{fixture_id}'
+    return f'{kind}:{league_id}:{season}'
+
+class JobQueue:
+    """Fetch units in the ``collection_jobs`` table (see migration 5).
+    
+    Workers claim jobs under a lease. A claimed job is invisible to other
+    workers until it is completed, failed or released, or until the lease
+    expires because its worker died. Failed jobs are retried with
+    exponential backoff until ``max_attempts`` is reached.
+    """
+    
+    def __init__(self, pool, max_attempts=5, base_retry_delay=300, clock=time.time):
+        """Keep jobs in the database behind ``pool``."""
+        self.pool = pool
+        self.max_attempts = max_attempts
+        self.base_retry_delay = base_retry_delay
+        self.clock = clock
+    
+    def enqueue_many(self, jobs, requeue_done=False):
+        """Queue jobs given as dicts with ``kind`` and their identifying columns.
+        
+        Jobs already queued are left alone; with ``requeue_done`` finished
+        ones are made pending again (used to refresh fixture lists).
+        Returns the number of jobs queued or requeued.
+        """
+        now = int(self.clock())
+        rows = [
+            {
+                'league_id': None,
+                'season': None,
+                'match_id': None,
+                'fixture_id': None,
+                'priority': 0,
+                **job,
+                'season': None if job.get('season') is None else str(job['season']),
+                'job_key': job_key(job['kind'], job.get('league_id'), job.get('season'), job.get('fixture_id')),
+                'updated_at': now
+            }
+            for job in jobs
+        ]
+        if not rows:
+            return 0
+            
+        conflict = '''
+            ON CONFLICT (job_key) DO UPDATE SET
+                state = 'pending', attempts = 0, retry_after = 0, priority = excluded.priority,
+                last_error = NULL, updated_at = excluded.updated_at
+            WHERE collection_jobs.state = 'done'
+        ''' if requeue_done else 'ON CONFLICT (job_key) DO NOTHING'
+        
+        try:
+            with self.pool.writer() as conn:
+                cursor = conn.executemany(f'''
+                    INSERT INTO collection_jobs (
+                        job_key, kind, league_id, season, match_id, fixture_id, priority, updated_at
+                    )
+                    VALUES (
+                        :job_key, :kind, :league_id, :season, :match_id, :fixture_id, :priority, :updated_at
+                    )
+                    {conflict}
+                ''', rows)
+                return cursor.rowcount
+                
+        except sqlite3.Error as e:
+            logging.error(f"Database error queueing {len(rows)} jobs: {str(e)}")
+            raise
+    
+    def claim(self, kind, owner, limit=1, lease_seconds=300):
+        """Lease up to ``limit`` due jobs of one kind to ``owner``, highest priority first.
+        
+        Jobs whose lease ran out are reclaimed first. Returns the claimed
+        jobs as dicts.
+        """
+        now = int(self.clock())
+        token = uuid.uuid4().hex
+        try:
+            with self.pool.writer() as conn:
+                conn.execute('''
+                    UPDATE collection_jobs
+                    SET state = 'pending', lease_owner = NULL, lease_token = NULL, lease_expires = NULL
+                    WHERE kind = ? AND state = 'running' AND lease_expires <= ?
+                ''', (kind, now))
+                
+                conn.execute(CLAIM_JOBS, (owner, token, now + lease_seconds, now, kind, now, limit))
+                
+                cursor = conn.execute(CLAIMED_JOBS, (token,))
+                columns = [column[0] for column in cursor.description]
+                return [dict(zip(columns, row)) for row in cursor.fetchall()]
+                
+        except sqlite3.Error as e:
+            logging.error(f"Database error claiming {kind} jobs: {str(e)}")
+            raise
+    
+    def complete(self, job_ids):
+        """Mark claimed jobs as done."""
+        self._finish(job_ids, '''
+            UPDATE collection_jobs
+            SET state = 'done', lease_owner = NULL, lease_token = NULL, lease_expires = NULL,
+                last_error = NULL, updated_at = :now
+            WHERE id = :id
+        ''')
+    
+    def fail(self, job_ids, error, retry_delay=None):
+        """Record a failed attempt and schedule a retry, or give up after ``max_attempts``.
+        
+        ``retry_delay`` overrides the exponential backoff, e.g. for data the
+        API has not published yet.
+        """
+        self._finish(job_ids, '''
+            UPDATE collection_jobs
+            SET state = CASE WHEN attempts >= :max_attempts THEN 'failed' ELSE 'pending' END,
+                retry_after = :now + COALESCE(:retry_delay, :base_delay * (1 << MIN(attempts - 1, 10))),
+                lease_owner = NULL, lease_token = NULL, lease_expires = NULL,
+                last_error = :error, updated_at = :now
+            WHERE id = :id
+        ''', error=str(error), retry_delay=retry_delay,
+            max_attempts=self.max_attempts, base_delay=self.base_retry_delay)
+    
+    def release(self, job_ids):
+        """Hand claimed jobs back untried, e.g. when the daily quota ran out."""
+        self._finish(job_ids, '''
+            UPDATE collection_jobs
+            SET state = 'pending', attempts = MAX(attempts - 1, 0),
+                lease_owner = NULL, lease_token = NULL, lease_expires = NULL, updated_at = :now
+            WHERE id = :id
+        ''')
+    
+    def _finish(self, job_ids, sql, **params):
+        """Run a per-job state update for every ID in one transaction."""
+        now = int(self.clock())
+        try:
+            with self.pool.writer() as conn:
+                conn.executemany(sql, [{'id': job_id, 'now': now, **params} for job_id in job_ids])
+                
+        except sqlite3.Error as e:
+            logging.error(f"Database error updating {len(job_ids)} jobs: {str(e)}")
+            raise
+    
+    def counts(self):
+        """Return ``{(kind, state): count}`` over the whole queue."""
+        try:
+            cursor = self.pool.reader().execute('''
+                SELECT kind, state, COUNT(*) FROM collection_jobs GROUP BY kind, state
+            ''')
+            return {(kind, state): count for kind, state, count in cursor.fetchall()}
+            
+        except sqlite3.Error as e:
+            logging.error(f"Database error counting jobs: {str(e)}")
+            raise
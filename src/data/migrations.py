@@ -0,0 +1,391 @@
+"""Versioned schema migrations for the match database."""
+
+import logging
+from .dates import to_epoch
+
+def add_match_timestamps(conn):
+    """Add matches.date_ts, backfill it from the text dates and index team timelines on it."""
+    conn.execute('ALTER TABLE matches ADD COLUMN date_ts INTEGER')
+    
+    updates = []
+    for match_id, match_date in conn.execute('SELECT id, date FROM matches'):
+        try:
+            updates.append((to_epoch(match_date), match_id))
+        except ValueError:
+            logging.warning(f"Leaving date_ts empty for match {match_id} with unparseable date {match_date!r}")
+    conn.executemany('UPDATE matches SET date_ts = ? WHERE id = ?', updates)
+    
+    for statement in (
+        'DROP INDEX IF EXISTS idx_matches_home_team_date',
+        'DROP INDEX IF EXISTS idx_matches_away_team_date',
+        # Team timelines: WHERE home_team_id = ? AND date_ts < ? ORDER BY date_ts DESC
+        '''CREATE INDEX idx_matches_home_team_ts
+            ON matches (home_team_id, date_ts, away_team_id, home_score, away_score)''',
+        '''CREATE INDEX idx_matches_away_team_ts
+            ON matches (away_team_id, date_ts, home_team_id, home_score, away_score)''',
+        # Whole-history walks in date order
+        'CREATE INDEX idx_matches_date_ts ON matches (date_ts)'
+    ):
+        conn.execute(statement)
+
+def add_team_versions(conn):
+    """Add team_versions and triggers bumping a team's version on every write touching it.
+    
+    Triggers catch writes from any process or connection, so caches can
+    detect stale entries by comparing versions.
+    """
+    conn.execute('''
+        CREATE TABLE team_versions (
+            team_id INTEGER PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    ''')
+    
+    triggers = {
+        'matches': {
+            'INSERT': ('NEW.home_team_id', 'NEW.away_team_id'),
+            'UPDATE': ('OLD.home_team_id', 'OLD.away_team_id', 'NEW.home_team_id', 'NEW.away_team_id'),
+            'DELETE': ('OLD.home_team_id', 'OLD.away_team_id')
+        },
+        'team_stats': {
+            'INSERT': ('NEW.team_id',),
+            'UPDATE': ('OLD.team_id', 'NEW.team_id'),
+            'DELETE': ('OLD.team_id',)
+        }
+    }
+    for table, events in triggers.items():
+        for event, columns in events.items():
+            touched = ' UNION SELECT '.join([f'{columns[0]} AS team_id', *columns[1:]])
+            conn.execute(f'''
+                CREATE TRIGGER {table}_version_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    INSERT INTO team_versions (team_id, version)
+                    SELECT team_id, 1 FROM (SELECT {touched})
+                    WHERE team_id IS NOT NULL
+                    ON CONFLICT (team_id) DO UPDATE SET version = version + 1;
+                END
+            ''')
+
+def add_provider_ids(conn):
+    """Store API-Football team ids and make fixture ids unique, merging duplicate fixtures.
+    
+    Of several matches sharing a fixture id the one with statistics (else
+    the oldest) is kept; statistics of the others move to it where that
+    team has none yet.
+    """
+    conn.execute('ALTER TABLE teams ADD COLUMN api_team_id INTEGER')
+    
+    duplicates = conn.execute('''
+        SELECT m.api_fixture_id, m.id, EXISTS (SELECT 1 FROM team_stats ts WHERE ts.match_id = m.id) as has_stats
+        FROM matches m
+        WHERE m.api_fixture_id IN (
+            SELECT api_fixture_id FROM matches
+            WHERE api_fixture_id IS NOT NULL
+            GROUP BY api_fixture_id
+            HAVING COUNT(*) > 1
+        )
+        ORDER BY m.api_fixture_id, has_stats DESC, m.id
+    ''').fetchall()
+    
+    merges = []
+    keep = {}
+    for fixture_id, match_id, _ in duplicates:
+        if fixture_id in keep:
+            merges.append({'keep': keep[fixture_id], 'duplicate': match_id})
+        else:
+            keep[fixture_id] = match_id
+    if merges:
+        logging.warning(f"Merging {len(merges)} duplicate matches sharing an API fixture id")
+        conn.executemany('UPDATE OR IGNORE team_stats SET match_id = :keep WHERE match_id = :duplicate', merges)
+        conn.executemany('DELETE FROM team_stats WHERE match_id = :duplicate', merges)
+        conn.executemany('DELETE FROM matches WHERE id = :duplicate', merges)
+        
+    for statement in (
+        # Provider keys: WHERE api_team_id = ? / WHERE api_fixture_id = ?
+        'CREATE UNIQUE INDEX idx_teams_api_team_id ON teams (api_team_id)',
+        'CREATE UNIQUE INDEX idx_matches_api_fixture_id ON matches (api_fixture_id)'
+    ):
+        conn.execute(statement)
+
+def add_ratings_rewinds(conn):
+    """Record what each rating was computed from and flag rated matches that change.
+    
+    Rewinding to a date needs every rated match's teams and date. A
+    trigger moves ``ratings_state.dirty_ts`` back to the earliest date
+    whose ratings an update or delete made stale, so the next sync
+    replays from there. Stored ratings lack the new columns and are
+    dropped to be rebuilt on the next sync.
+    """
+    for statement in (
+        'ALTER TABLE match_ratings ADD COLUMN home_team_id INTEGER',
+        'ALTER TABLE match_ratings ADD COLUMN away_team_id INTEGER',
+        'ALTER TABLE match_ratings ADD COLUMN date_ts INTEGER',
+        'ALTER TABLE ratings_state ADD COLUMN dirty_ts INTEGER',
+        'ALTER TABLE ratings_state ADD COLUMN revision INTEGER NOT NULL DEFAULT 0',
+        'DELETE FROM match_ratings',
+        'DELETE FROM team_ratings',
+        'DELETE FROM ratings_state',
+        # Rewinds: WHERE date_ts >= ? ORDER BY date_ts DESC, match_id DESC
+        'CREATE INDEX idx_match_ratings_date_ts ON match_ratings (date_ts, match_id)'
+    ):
+        conn.execute(statement)
+        
+    changed = ' OR '.join(
+        f'OLD.{column} IS NOT NEW.{column}'
+        for column in ('home_team_id', 'away_team_id', 'home_score', 'away_score', 'date_ts')
+    )
+    triggers = {
+        'UPDATE OF home_team_id, away_team_id, home_score, away_score, date_ts': (
+            'MIN(COALESCE(OLD.date_ts, NEW.date_ts), COALESCE(NEW.date_ts, OLD.date_ts))', f'AND ({changed})'
+        ),
+        'DELETE': ('OLD.date_ts', '')
+    }
+    for event, (changed_ts, condition) in triggers.items():
+        conn.execute(f'''
+            CREATE TRIGGER matches_ratings_{event.split()[0].lower()} AFTER {event} ON matches
+            WHEN {changed_ts} IS NOT NULL {condition}
+            BEGIN
+                UPDATE ratings_state
+                SET dirty_ts = MIN(COALESCE(dirty_ts, {changed_ts}), {changed_ts})
+                WHERE id = 1 AND OLD.id <= last_match_id;
+            END
+        ''')
+
+def add_table_versions(conn):
+    """Add table_versions and triggers bumping a table's version on every write to it.
+    
+    Caches built from a whole table (such as the scorer rates built from
+    player_stats and players) compare one version instead of scanning the
+    table, and catch edits that leave its aggregates unchanged.
+    """
+    conn.execute('''
+        CREATE TABLE table_versions (
+            name TEXT PRIMARY KEY,
+            version INTEGER NOT NULL
+        )
+    ''')
+    for table in ('player_stats', 'players'):
+        for event in ('INSERT', 'UPDATE', 'DELETE'):
+            conn.execute(f'''
+                CREATE TRIGGER {table}_table_version_{event.lower()} AFTER {event} ON {table}
+                BEGIN
+                    INSERT INTO table_versions (name, version) VALUES ('{table}', 1)
+                    ON CONFLICT (name) DO UPDATE SET version = version + 1;
+                END
+            ''')
+
+def merge_league_id_teams(conn):
+    """Merge clubs stored once under a league id and once under a league name.
+    
+    Before provider ids were stored, the teams endpoint saved each club
+    with its league id as the league ('39'), fixtures saved it again with
+    the league name, and statistics went to whichever row a lookup by name
+    found first. Where a name has exactly these two rows, the league-id
+    row (the one the teams endpoint resolves to) is kept and takes over
+    the other's matches, statistics, players and provider id. Ratings are
+    dropped to be rebuilt on the next sync.
+    """
+    merges = [
+        {'keep': keep, 'duplicate': duplicate, 'api_team_id': api_team_id}
+        for keep, duplicate, api_team_id in conn.execute('''
+            SELECT k.id, d.id, d.api_team_id
+            FROM teams k
+            JOIN teams d ON d.name = k.name
+            WHERE k.league != '' AND k.league NOT GLOB '*[^0-9]*'
+            AND d.league GLOB '*[^0-9]*'
+            AND (k.api_team_id IS NULL OR d.api_team_id IS NULL OR k.api_team_id = d.api_team_id)
+            AND (SELECT COUNT(*) FROM teams t WHERE t.name = k.name) = 2
+        ''')
+    ]
+    if not merges:
+        return
+        
+    logging.warning(f"Merging {len(merges)} teams stored under both a league id and a league name")
+    for statement in (
+        'UPDATE matches SET home_team_id = :keep WHERE home_team_id = :duplicate',
+        'UPDATE matches SET away_team_id = :keep WHERE away_team_id = :duplicate',
+        'UPDATE OR IGNORE team_stats SET team_id = :keep WHERE team_id = :duplicate',
+        'DELETE FROM team_stats WHERE team_id = :duplicate',
+        # A player listed under both rows keeps the kept row's entry and either's appearances
+        '''UPDATE OR IGNORE player_stats SET player_id = (
+                SELECT k.id FROM players k JOIN players d ON d.name = k.name
+                WHERE k.team_id = :keep AND d.id = player_stats.player_id
+            )
+            WHERE player_id IN (
+                SELECT d.id FROM players d JOIN players k ON k.name = d.name
+                WHERE d.team_id = :duplicate AND k.team_id = :keep
+            )''',
+        'UPDATE OR IGNORE players SET team_id = :keep WHERE team_id = :duplicate',
+        'DELETE FROM player_stats WHERE player_id IN (SELECT id FROM players WHERE team_id = :duplicate)',
+        'DELETE FROM players WHERE team_id = :duplicate',
+        'UPDATE player_stats SET team_id = :keep WHERE team_id = :duplicate',
+        'DELETE FROM team_versions WHERE team_id = :duplicate',
+        'DELETE FROM teams WHERE id = :duplicate',
+        'UPDATE teams SET api_team_id = COALESCE(api_team_id, :api_team_id) WHERE id = :keep'
+    ):
+        conn.executemany(statement, merges)
+        
+    for table in ('match_ratings', 'team_ratings', 'ratings_state'):
+        conn.execute(f'DELETE FROM {table}')
+
+# Ordered list of (version, description, step). A step is either an SQL script
+# or a callable taking the connection. The applied version is tracked in
+# PRAGMA user_version, so existing databases are upgraded in place.
+MIGRATIONS = [
+    (1, "Add indexes for team timeline, statistics and competition queries", '''
+        -- Team timelines: WHERE home_team_id = ? OR away_team_id = ? ORDER BY date
+        CREATE INDEX IF NOT EXISTS idx_matches_home_team_date
+            ON matches (home_team_id, date, away_team_id, home_score, away_score);
+        CREATE INDEX IF NOT EXISTS idx_matches_away_team_date
+            ON matches (away_team_id, date, home_team_id, home_score, away_score);
+            
+        -- Competition listings: WHERE competition = ? AND season = ?
+        CREATE INDEX IF NOT EXISTS idx_matches_competition_season
+            ON matches (competition, season, api_fixture_id);
+            
+        -- Team averages: WHERE team_id = ?, answered from the index alone
+        CREATE INDEX IF NOT EXISTS idx_team_stats_team
+            ON team_stats (team_id, match_id, possession, shots, shots_on_target, corners, fouls);
+            
+        -- Missing statistics: LEFT JOIN team_stats ON match_id
+        CREATE INDEX IF NOT EXISTS idx_team_stats_match ON team_stats (match_id);
+    '''),
+    (2, "Store match dates as indexed integer epoch seconds", add_match_timestamps),
+    (3, "Track a per-team data version for feature cache invalidation", add_team_versions),
+    (4, "Record the collection high-water mark per league and season", '''
+        CREATE TABLE collection_state (
+            league_id INTEGER NOT NULL,
+            season TEXT NOT NULL,
+            last_fixture_ts INTEGER NOT NULL,
+            updated_at INTEGER NOT NULL,
+            PRIMARY KEY (league_id, season)
+        );
+    '''),
+    (5, "Add the durable collection job queue", '''
+        CREATE TABLE collection_jobs (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            job_key TEXT NOT NULL UNIQUE,
+            kind TEXT NOT NULL,
+            league_id INTEGER,
+            season TEXT,
+            match_id INTEGER,
+            fixture_id INTEGER,
+            state TEXT NOT NULL DEFAULT 'pending',
+            priority REAL NOT NULL DEFAULT 0,
+            attempts INTEGER NOT NULL DEFAULT 0,
+            retry_after INTEGER NOT NULL DEFAULT 0,
+            lease_owner TEXT,
+            lease_token TEXT,
+            lease_expires INTEGER,
+            last_error TEXT,
+            updated_at INTEGER NOT NULL
+        );
+        
+        -- Claims: WHERE kind = ? AND state = ? ORDER BY priority DESC, id
+        CREATE INDEX idx_collection_jobs_claim ON collection_jobs (kind, state, priority DESC);
+            
+        -- Claimed batches: WHERE lease_token = ?
+        CREATE INDEX idx_collection_jobs_lease ON collection_jobs (lease_token);
+    '''),
+    (6, "Store API-Football team and fixture ids as unique keys", add_provider_ids),
+    (7, "Add players and per-match player statistics", '''
+        CREATE TABLE players (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            team_id INTEGER NOT NULL,
+            name TEXT NOT NULL,
+            position TEXT,
+            nationality TEXT,
+            FOREIGN KEY (team_id) REFERENCES teams (id),
+            -- Also serves squads: WHERE team_id = ?
+            UNIQUE(team_id, name)
+        );
+        
+        -- date_ts is copied from the match so appearances sort without a join
+        CREATE TABLE player_stats (
+            id INTEGER PRIMARY KEY AUTOINCREMENT,
+            player_id INTEGER NOT NULL,
+            match_id INTEGER NOT NULL,
+            team_id INTEGER NOT NULL,
+            date_ts INTEGER,
+            minutes INTEGER,
+            goals INTEGER,
+            assists INTEGER,
+            shots INTEGER,
+            shots_on_target INTEGER,
+            passes INTEGER,
+            pass_accuracy REAL,
+            FOREIGN KEY (player_id) REFERENCES players (id),
+            FOREIGN KEY (match_id) REFERENCES matches (id),
+            FOREIGN KEY (team_id) REFERENCES teams (id),
+            UNIQUE(player_id, match_id)
+        );
+        
+        -- Last appearances: WHERE player_id = ? ORDER BY date_ts DESC LIMIT ?
+        CREATE INDEX idx_player_stats_player_ts
+            ON player_stats (player_id, date_ts, minutes, goals, assists, shots, shots_on_target);
+            
+        -- Match line-ups: WHERE match_id = ?
+        CREATE INDEX idx_player_stats_match ON player_stats (match_id, team_id);
+    '''),
+    (8, "Persist Elo team ratings and each match's pre-match ratings", '''
+        CREATE TABLE team_ratings (
+            team_id INTEGER PRIMARY KEY,
+            rating REAL NOT NULL,
+            matches INTEGER NOT NULL,
+            FOREIGN KEY (team_id) REFERENCES teams (id)
+        );
+        
+        -- Ratings going into each match, for point-in-time features
+        CREATE TABLE match_ratings (
+            match_id INTEGER PRIMARY KEY,
+            home_rating REAL NOT NULL,
+            away_rating REAL NOT NULL,
+            FOREIGN KEY (match_id) REFERENCES matches (id)
+        );
+        
+        -- Newest match applied and the Elo settings the ratings were computed with
+        CREATE TABLE ratings_state (
+            id INTEGER PRIMARY KEY CHECK (id = 1),
+            last_match_id INTEGER NOT NULL,
+            params TEXT NOT NULL,
+            updated_at INTEGER NOT NULL
+        );
+    '''),
+    (9, "Rewind Elo ratings when rated matches change", add_ratings_rewinds),
+    (10, "Track per-table data versions for whole-table caches", add_table_versions),
+    (11, "Merge teams stored under both a league id and a league name", merge_league_id_teams),
+]
+
+SCHEMA_VERSION = MIGRATIONS[-1][0]
+
+def get_schema_version(conn):
+    """Return the schema version recorded in the database."""
+    return conn.execute('PRAGMA user_version').fetchone()[0]
+
+def migrate(conn):
+    """Apply pending migrations in order and refresh planner statistics."""
+    current = get_schema_version(conn)
+    pending = [migration for migration in MIGRATIONS if migration[0] > current]
+    
+    for version, description, step in pending:
+        logging.info(f"Applying database migration {version}: {description}")
+        try:
+            if callable(step):
+                conn.execute('BEGIN')
+                step(conn)
+                conn.execute(f'PRAGMA user_version = {version}')
+                conn.commit()
+            else:
+                conn.executescript(f'BEGIN; {step} PRAGMA user_version = {version}; COMMIT;')
+                
+        except Exception as e:
+            conn.rollback()
+            logging.error(f"Database migration {version} failed: {str(e)}")
+            raise
+            
+    if pending:
+        # Give the query planner row counts for the new indexes
+        conn.execute('ANALYZE')
+        conn.commit()
+        
+    return get_schema_version(conn)
@@ -0,0 +1,233 @@
+"""Browserless parsers for Fotmob league and match pages.
+
+Every function takes page HTML as a string and returns plain rows, so
+parsing can be run against saved pages offline. The server-rendered
+``__NEXT_DATA__`` JSON state is used when the page carries it; otherwise
+the markup is read with BeautifulSoup, using the same class names the
+Selenium scraper waits for.
+"""
+
+import json
+import logging
+import re
+from datetime import datetime
+from bs4 import BeautifulSoup
+
+NEXT_DATA = re.compile(
+    r'<script[^>]*\bid=["\']__NEXT_DATA__["\'][^>]*>(.*?)</script>',
+    re.DOTALL | re.IGNORECASE
+)
+
+# Fotmob stat titles mapped to the names store_team_stats reads
+TEAM_STAT_TITLES = {
+    'Ball possession': 'Possession',
+    'Total shots': 'Shots',
+    'Shots on target': 'Shots on Target',
+    'Corners': 'Corners',
+    'Fouls committed': 'Fouls'
+}
+
+# Fotmob player stat titles mapped to player stat fields
+PLAYER_STAT_TITLES = {
+    'Minutes played': 'minutes',
+    'Goals': 'goals',
+    'Assists': 'assists',
+    'Total shots': 'shots',
+    'Shots on target': 'shots_on_target',
+    'Accurate passes': 'passes'
+}
+
+# Player row classes of the rendered match page mapped to player stat fields
+PLAYER_ROW_CLASSES = {
+    'minutes': 'minutes',
+    'goals': 'goals',
+    'assists': 'assists',
+    'shots': 'shots',
+    'shots-on-target': 'shots_on_target',
+    'passes': 'passes',
+    'pass-accuracy': 'pass_accuracy'
+}
+
+def extract_next_data(html):
+    """Return the page's ``__NEXT_DATA__`` state as a dict, or None if it has none."""
+    match = NEXT_DATA.search(html)
+    if match:
+        payload = match.group(1)
+    else:
+        script = BeautifulSoup(html, 'html.parser').find('script', id='__NEXT_DATA__')
+        if script is None or not script.string:
+            return None
+        payload = script.string
+        
+    try:
+        return json.loads(payload)
+    except ValueError:
+        return None
+
+def _page_props(html):
+    data = extract_next_data(html)
+    if not isinstance(data, dict):
+        return None
+    return data.get('props', {}).get('pageProps')
+
+def _int(value):
+    """Parse counts like ``'12'`` or ``'305 (87%)'``; missing values count as 0."""
+    if isinstance(value, (int, float)):
+        return int(value)
+    match = re.match(r'\s*(\d+)', str(value or ''))
+    return int(match.group(1)) if match else 0
+
+def _ratio(value):
+    """Parse ``'87%'``, ``'305 (87%)'``, ``87`` or ``0.87`` into a fraction."""
+    if isinstance(value, (int, float)):
+        return value / 100 if value > 1 else float(value)
+    match = re.search(r'(\d+(?:\.\d+)?)%', str(value or ''))
+    if match:
+        return float(match.group(1)) / 100
+    try:
+        return _ratio(float(value))
+    except (TypeError, ValueError):
+        return 0.0
+
+def _text(element, class_name):
+    found = element.find(class_=class_name)
+    return found.get_text(strip=True) if found else ''
+
+def _parse_score(score):
+    """Return ``(home, away)`` goals from ``'2 - 1'``, or None for unplayed matches."""
+    match = re.match(r'\s*(\d+)\s*-\s*(\d+)\s*$', score or '')
+    return (int(match.group(1)), int(match.group(2))) if match else None
+
+def _next_data_match(fixture):
+    """Return a match dict for a finished ``__NEXT_DATA__`` fixture, or None for unplayed ones."""
+    status = fixture.get('status', {})
+    score = _parse_score(status.get('scoreStr'))
+    if score is None or not status.get('finished', True):
+        return None
+    # utcTime is UTC; dates are stored as naive local time, like the collector's
+    kickoff = datetime.fromisoformat(status['utcTime'].replace('Z', '+00:00'))
+    return {
+        'home_team': fixture['home']['name'],
+        'away_team': fixture['away']['name'],
+        'home_score': score[0],
+        'away_score': score[1],
+        'date': kickoff.astimezone().replace(tzinfo=None),
+        'url': fixture.get('pageUrl')
+    }
+
+def _markup_match(row):
+    """Return a match dict for a finished ``match-row`` element, or None for unplayed ones."""
+    score = _parse_score(_text(row, 'score'))
+    if score is None:
+        return None
+    link = row if row.get('href') else row.find('a', href=True)
+    return {
+        'home_team': _text(row, 'home-team'),
+        'away_team': _text(row, 'away-team'),
+        'home_score': score[0],
+        'away_score': score[1],
+        'date': datetime.strptime(_text(row, 'date'), "%Y-%m-%d"),
+        'url': link.get('href') if link else None
+    }
+
+def parse_match_list(html):
+    """Return the finished matches on a league matches page.
+    
+    Each match is a dict with ``home_team``, ``away_team``, ``home_score``,
+    ``away_score``, ``date`` (a naive local datetime) and ``url`` as found
+    on the page, which may be relative. Malformed matches are logged and
+    skipped.
+    """
+    props = _page_props(html)
+    if props is not None:
+        rows = props.get('matches', {}).get('allMatches') or props.get('fixtures', {}).get('allMatches') or []
+        parse = _next_data_match
+    else:
+        rows = BeautifulSoup(html, 'html.parser').find_all(class_='match-row')
+        parse = _markup_match
+        
+    matches = []
+    for row in rows:
+        try:
+            match = parse(row)
+        except (KeyError, TypeError, AttributeError, ValueError) as e:
+            logging.error(f"Error parsing match {str(row)[:200]!r}: {str(e)}")
+            continue
+        if match is not None:
+            matches.append(match)
+    return matches
+
+def _next_data_team_stats(content):
+    home_stats, away_stats = {}, {}
+    periods = content.get('stats', {}).get('Periods', {})
+    groups = periods.get('All', {}).get('stats', []) if periods else content.get('stats', {}).get('stats', [])
+    for group in groups:
+        for stat in group.get('stats', []):
+            values = stat.get('stats') or []
+            name = TEAM_STAT_TITLES.get(stat.get('title'), stat.get('title'))
+            if name and len(values) == 2 and name not in home_stats:
+                home_stats[name] = str(values[0])
+                away_stats[name] = str(values[1])
+    return home_stats, away_stats
+
+def _next_data_players(content):
+    players = []
+    for player in (content.get('playerStats') or {}).values():
+        values = {}
+        for group in player.get('stats', []):
+            for title, stat in group.get('stats', {}).items():
+                value = stat.get('stat', {}).get('value') if isinstance(stat, dict) else stat
+                if title in PLAYER_STAT_TITLES:
+                    values[PLAYER_STAT_TITLES[title]] = _int(value)
+                if title == 'Accurate passes':
+                    values['pass_accuracy'] = _ratio(value)
+        players.append({
+            'name': player.get('name'),
+            'team_name': player.get('teamName'),
+            'position': player.get('position') or ('Goalkeeper' if player.get('isGoalkeeper') else None),
+            'minutes': values.get('minutes', 0),
+            'goals': values.get('goals', 0),
+            'assists': values.get('assists', 0),
+            'shots': values.get('shots', 0),
+            'shots_on_target': values.get('shots_on_target', 0),
+            'passes': values.get('passes', 0),
+            'pass_accuracy': values.get('pass_accuracy', 0.0)
+        })
+    return players
+
+def parse_player_rows(soup):
+    """Return player stat dicts from rendered ``player-row`` elements."""
+    players = []
+    for row in soup.find_all(class_='player-row'):
+        player = {
+            'name': _text(row, 'player-name'),
+            'team_name': _text(row, 'team-name'),
+            'position': _text(row, 'position') or None
+        }
+        for class_name, field in PLAYER_ROW_CLASSES.items():
+            value = _text(row, class_name)
+            player[field] = _ratio(value) if field == 'pass_accuracy' else _int(value)
+        players.append(player)
+    return players
+
+def parse_match_details(html):
+    """Return ``(home_stats, away_stats, players)`` from a match page.
+    
+    The stat dicts map the names ``store_team_stats`` reads to raw values;
+    ``players`` holds one dict per player with ``name``, ``team_name``,
+    ``position`` and the player stat fields. Both stat dicts are empty when
+    the page has no statistics without running JavaScript.
+    """
+    props = _page_props(html)
+    if props is not None and props.get('content'):
+        content = props['content']
+        home_stats, away_stats = _next_data_team_stats(content)
+        return home_stats, away_stats, _next_data_players(content)
+        
+    soup = BeautifulSoup(html, 'html.parser')
+    home_stats, away_stats = {}, {}
+    for row in soup.find_all(class_='stat-row'):
+        name = _text(row, 'stat-name')
+        home_stats[name] = _text(row, 'home-value')
+        away_stats[name] = _text(row, 'away-value')
+    return home_stats, away_stats, parse_player_rows(soup)
@@ -0,0 +1,101 @@
+"""Thread-aware SQLite connection pool."""
+
+import sqlite3
+import threading
+from contextlib import contextmanager
+
+class ConnectionPool:
+    """Per-thread read connections and a single serialized writer for one database file.
+    
+    The database runs in WAL mode, so readers never block on the writer and
+    see every committed transaction. A thread's reader stays open until the
+    thread calls ``release()`` or the pool is closed.
+    """
+    
+    PRAGMAS = {
+        'synchronous': 'NORMAL',   # Durable in WAL mode without an fsync per commit
+        'cache_size': -64000,      # 64 MB page cache per connection
+        'mmap_size': 268435456,    # Memory-map up to 256 MB of the file
+        'temp_store': 'MEMORY',
+        'busy_timeout': 30000
+    }
+    
+    def __init__(self, db_path='data.db', row_factory=None):
+        """Open the writer connection and switch the database to WAL mode."""
+        self.db_path = db_path
+        self.row_factory = row_factory
+        self._local = threading.local()
+        self._readers = []
+        self._readers_lock = threading.Lock()
+        self._write_lock = threading.RLock()
+        
+        self._writer = self._connect()
+        self._writer.execute('PRAGMA journal_mode = WAL')
+    
+    def _connect(self):
+        """Open a connection with the pool's pragmas applied."""
+        # Connections stay with one thread (or behind the write lock), but
+        # close() may run on any thread
+        conn = sqlite3.connect(self.db_path, check_same_thread=False)
+        if self.row_factory:
+            conn.row_factory = self.row_factory
+        for name, value in self.PRAGMAS.items():
+            conn.execute(f'PRAGMA {name} = {value}')
+        return conn
+    
+    @property
+    def shared_reader(self):
+        """Whether ``reader()`` hands out the writer itself.
+        
+        ``PRAGMA data_version`` on that connection does not change for its
+        own commits, so it cannot tell a cache that data changed.
+        """
+        return self.db_path == ':memory:'
+    
+    def reader(self):
+        """Return the calling thread's read connection, opening it on first use."""
+        if self.shared_reader:
+            # Every connection to :memory: is a separate database
+            return self._writer
+            
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = self._connect()
+            self._local.conn = conn
+            with self._readers_lock:
+                self._readers.append(conn)
+        return conn
+    
+    def release(self):
+        """Close the calling thread's read connection, if it has one.
+        
+        Short-lived threads, such as web request threads, must call this
+        when done; the next ``reader()`` on the thread opens a new one.
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            return
+            
+        self._local.conn = None
+        with self._readers_lock:
+            self._readers.remove(conn)
+        conn.close()
+    
+    @contextmanager
+    def writer(self):
+        """Hold the single writer connection for one transaction.
+        
+        Commits when the block exits normally and rolls back on error.
+        """
+        with self._write_lock:
+            with self._writer:
+                yield self._writer
+    
+    def close(self):
+        """Close the writer and every reader opened by the pool."""
+        with self._readers_lock:
+            for conn in self._readers:
+                conn.close()
+            self._readers = []
+        self._local = threading.local()
+        self._writer.close()
@@ -0,0 +1,163 @@
+"""SQL of the hot read queries, shared by their call sites and the query plan check."""
+
+# src/models/predictor.py::MatchPredictor._query_teams_features,
+# formatted with one placeholder per team
+TEAM_FEATURES = '''
+    WITH recent AS (
+        SELECT
+            ts.team_id,
+            ts.possession,
+            ts.shots,
+            ts.shots_on_target,
+            ts.corners,
+            ts.fouls,
+            CASE
+                WHEN m.home_team_id = ts.team_id AND m.home_score > m.away_score THEN 1
+                WHEN m.away_team_id = ts.team_id AND m.away_score > m.home_score THEN 1
+                ELSE 0
+            END as won,
+            ROW_NUMBER() OVER (PARTITION BY ts.team_id ORDER BY m.date_ts DESC) as recency
+        FROM team_stats ts
+        JOIN matches m ON ts.match_id = m.id
+        WHERE ts.team_id IN ({placeholders})
+    )
+    SELECT
+        team_id,
+        AVG(possession),
+        AVG(shots),
+        AVG(shots_on_target),
+        AVG(corners),
+        AVG(fouls),
+        AVG(won)
+    FROM recent
+    WHERE recency <= ?
+    GROUP BY team_id
+'''
+
+# src/predictions/model.py::MatchPredictor._query_team_stats
+TEAM_RECENT_RESULTS = '''
+    WITH team_matches AS (
+        SELECT
+            m.id,
+            CASE
+                WHEN m.home_team_id = ? THEN m.home_score
+                ELSE m.away_score
+            END as team_score,
+            CASE
+                WHEN m.home_team_id = ? THEN m.away_score
+                ELSE m.home_score
+            END as opponent_score,
+            CASE
+                WHEN m.home_team_id = ? THEN 1
+                ELSE 0
+            END as is_home
+        FROM matches m
+        WHERE m.home_team_id = ? OR m.away_team_id = ?
+        ORDER BY m.date_ts DESC
+        LIMIT ?
+    )
+    SELECT
+        COUNT(*) as games_played,
+        SUM(CASE WHEN team_score > opponent_score THEN 1 ELSE 0 END) as wins,
+        SUM(CASE WHEN team_score = opponent_score THEN 1 ELSE 0 END) as draws,
+        SUM(CASE WHEN team_score < opponent_score THEN 1 ELSE 0 END) as losses,
+        AVG(CAST(team_score AS FLOAT)) as avg_goals_scored,
+        AVG(CAST(opponent_score AS FLOAT)) as avg_goals_conceded
+    FROM team_matches
+'''
+TEAM_RECENT_METRICS = '''
+    SELECT
+        AVG(CAST(possession AS FLOAT)) as avg_possession,
+        AVG(CAST(shots AS FLOAT)) as avg_shots,
+        AVG(CAST(shots_on_target AS FLOAT)) as avg_shots_on_target,
+        AVG(CAST(corners AS FLOAT)) as avg_corners
+    FROM team_stats ts
+    JOIN matches m ON m.id = ts.match_id
+    WHERE ts.team_id = ?
+    ORDER BY m.date_ts DESC
+    LIMIT ?
+'''
+
+# src/web/app.py::team_stats
+TEAM_AVERAGE_STATS = '''
+    SELECT
+        AVG(possession) as possession,
+        AVG(shots) as shots,
+        AVG(shots_on_target) as shots_on_target,
+        AVG(corners) as corners,
+        AVG(fouls) as fouls
+    FROM team_stats
+    WHERE team_id = ?
+'''
+
+# src/web/app.py::index
+COMPETITION_TEAMS = '''
+    SELECT DISTINCT t.id as team_id, t.name as team_name
+    FROM teams t
+    JOIN team_stats ts ON t.id = ts.team_id
+    JOIN matches m ON ts.match_id = m.id
+    WHERE m.competition = 'Premier League'
+    AND m.season = '2023'
+    ORDER BY t.name
+'''
+
+# src/data/database.py::Database
+MATCHES_WITHOUT_STATISTICS = '''
+    SELECT m.id, m.api_fixture_id
+    FROM matches m
+    LEFT JOIN team_stats ts ON m.id = ts.match_id
+    WHERE m.competition = ?
+    AND m.season = ?
+    AND ts.id IS NULL
+'''
+TEAM_MATCHES_BEFORE = '''
+    SELECT * FROM (
+        SELECT id, date_ts, home_team_id, away_team_id, home_score, away_score
+        FROM matches
+        WHERE home_team_id = :team_id AND date_ts < :before_ts
+        ORDER BY date_ts DESC
+        LIMIT :limit
+    )
+    UNION ALL
+    SELECT * FROM (
+        SELECT id, date_ts, home_team_id, away_team_id, home_score, away_score
+        FROM matches
+        WHERE away_team_id = :team_id AND date_ts < :before_ts
+        ORDER BY date_ts DESC
+        LIMIT :limit
+    )
+    ORDER BY date_ts DESC
+    LIMIT :limit
+'''
+TEAM_BY_NAME = 'SELECT id FROM teams WHERE name = ?'
+TEAM_BY_NAME_AND_LEAGUE = 'SELECT id FROM teams WHERE name = ? AND league = ?'
+TEAM_BY_API_ID = 'SELECT id, name, league FROM teams WHERE api_team_id = ?'
+PLAYER_APPEARANCES = '''
+    SELECT match_id, date_ts, minutes, goals, assists, shots, shots_on_target
+    FROM player_stats
+    WHERE player_id = :player_id AND date_ts < :before_ts
+    ORDER BY date_ts DESC
+    LIMIT :limit
+'''
+TEAM_SQUAD = '''
+    SELECT id, name, position, nationality
+    FROM players
+    WHERE team_id = ?
+    ORDER BY name
+'''
+
+# src/data/jobs.py::JobQueue.claim
+CLAIM_JOBS = '''
+    UPDATE collection_jobs
+    SET state = 'running', attempts = attempts + 1, lease_owner = ?, lease_token = ?,
+        lease_expires = ?, updated_at = ?
+    WHERE id IN (
+        SELECT id FROM collection_jobs
+        WHERE kind = ? AND state = 'pending' AND retry_after <= ?
+        ORDER BY priority DESC, id
+        LIMIT ?
+    )
+'''
+CLAIMED_JOBS = '''
+    SELECT * FROM collection_jobs WHERE lease_token = ? ORDER BY priority DESC, id
+'''
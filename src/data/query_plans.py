@@ -0,0 +1,68 @@
+"""EXPLAIN QUERY PLAN checks for the hot read queries."""
+
+import re
+import sqlite3
+from . import queries
+
+# The queries issued on every prediction, page view or collection run, with
+# sample parameters. The SQL is the call sites' own, from src.data.queries.
+HOT_QUERIES = {
+    'team_features': (queries.TEAM_FEATURES.format(placeholders='?, ?'), (1, 2, 5)),
+    'team_recent_results': (queries.TEAM_RECENT_RESULTS, (1, 1, 1, 1, 1, 5)),
+    'team_recent_metrics': (queries.TEAM_RECENT_METRICS, (1, 5)),
+    'team_average_stats': (queries.TEAM_AVERAGE_STATS, (1,)),
+    'competition_teams': (queries.COMPETITION_TEAMS, ()),
+    'matches_without_statistics': (queries.MATCHES_WITHOUT_STATISTICS, ('Premier League', '2023')),
+    'team_matches_before': (queries.TEAM_MATCHES_BEFORE, {'team_id': 1, 'before_ts': 1700000000, 'limit': 5}),
+    'team_by_name': (queries.TEAM_BY_NAME, ('Arsenal',)),
+    'team_by_name_and_league': (queries.TEAM_BY_NAME_AND_LEAGUE, ('Arsenal', 'Premier League')),
+    'team_by_api_id': (queries.TEAM_BY_API_ID, (42,)),
+    'player_appearances': (queries.PLAYER_APPEARANCES, {'player_id': 1, 'before_ts': 1700000000, 'limit': 5}),
+    'team_squad': (queries.TEAM_SQUAD, (1,)),
+    'claim_jobs': (queries.CLAIM_JOBS, ('worker', 'token', 300, 0, 'statistics', 0, 20)),
+    'claimed_jobs': (queries.CLAIMED_JOBS, ('token',)),
+}
+
+TABLE_ALIAS = re.compile(r'\b(?:FROM|JOIN)\s+(matches|team_stats|teams|collection_jobs|players|player_stats)\b(?:\s+(?:AS\s+)?(?!ON\b|WHERE\b|JOIN\b|LEFT\b|ORDER\b)(\w+))?', re.IGNORECASE)
+
+def explain(conn, sql, params=()):
+    """Return the detail lines of the query plan for a statement."""
+    return [row[-1] for row in conn.execute(f'EXPLAIN QUERY PLAN {sql}', params)]
+
+def copy_schema(conn):
+    """Return an in-memory database with the tables, indexes and triggers of ``conn`` but no rows.
+    
+    The copy has no ``sqlite_stat1`` either, so its plans depend on the
+    indexes alone.
+    """
+    copy = sqlite3.connect(':memory:')
+    for (sql,) in conn.execute(
+        "SELECT sql FROM sqlite_master WHERE sql IS NOT NULL AND name NOT LIKE 'sqlite_%' ORDER BY rowid"
+    ):
+        copy.execute(sql)
+    return copy
+
+def find_table_scans(conn, queries=None):
+    """Return {query name: offending plan lines} for queries that full-scan a table.
+    
+    A plain ``SCAN`` of a base table, or a lookup that needs an automatic
+    index built at query time, means a supporting index is missing. Plans
+    are taken on an empty copy of the schema: the row counts ``ANALYZE``
+    records on a small database make scans the cheaper plan, which says
+    nothing about the indexes.
+    """
+    regressions = {}
+    schema = copy_schema(conn)
+    try:
+        for name, (sql, params) in (queries or HOT_QUERIES).items():
+            aliases = {alias or table for table, alias in TABLE_ALIAS.findall(sql)}
+            offending = []
+            for detail in explain(schema, sql, params):
+                scan = re.match(r'SCAN (\w+)$', detail)
+                if (scan and scan.group(1) in aliases) or 'AUTOMATIC' in detail:
+                    offending.append(detail)
+            if offending:
+                regressions[name] = offending
+    finally:
+        schema.close()
+    return regressions
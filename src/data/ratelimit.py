@@ -0,0 +1,159 @@
+"""Request pacing for API-Football's per-minute and daily quotas."""
+
+import random
+import threading
+import time
+
+class SystemClock:
+    """Real monotonic time and sleeping."""
+    
+    def now(self):
+        return time.monotonic()
+    
+    def sleep(self, seconds):
+        time.sleep(seconds)
+
+class FakeClock:
+    """Clock that only moves when slept on or advanced, for offline checks.
+    
+    Sleeps return immediately and are recorded in ``sleeps``.
+    """
+    
+    def __init__(self, start=0.0):
+        self.time = start
+        self.sleeps = []
+    
+    def now(self):
+        return self.time
+    
+    def sleep(self, seconds):
+        self.sleeps.append(seconds)
+        self.time += seconds
+    
+    def advance(self, seconds):
+        self.time += seconds
+
+class TokenBucket:
+    """Token bucket refilled continuously at ``rate`` tokens per second."""
+    
+    def __init__(self, rate, capacity, clock):
+        self.rate = rate
+        self.capacity = capacity
+        self.clock = clock
+        self.tokens = capacity
+        self.updated = clock.now()
+    
+    def _refill(self):
+        now = self.clock.now()
+        self.tokens = min(self.capacity, self.tokens + (now - self.updated) * self.rate)
+        self.updated = now
+    
+    def reserve(self):
+        """Take one token and return how many seconds to wait before using it."""
+        self._refill()
+        self.tokens -= 1
+        return 0.0 if self.tokens >= 0 else -self.tokens / self.rate
+    
+    def limit(self, available):
+        """Cap the tokens at what the server reports as still available."""
+        self._refill()
+        self.tokens = min(self.tokens, available)
+
+class RateLimiter:
+    """Gate requests on a per-minute token bucket and a daily request budget.
+    
+    The limits start from the plan defaults, are seeded from the ``status``
+    endpoint and then track the ``x-ratelimit-*`` headers of every
+    response. Requests go out as fast as the bucket allows, without fixed
+    sleeps. Pass a ``FakeClock`` to check pacing offline.
+    
+    Headers only ever lower the daily count: it already leaves out the
+    requests still in flight, which the server's count does not, and
+    concurrent responses can arrive out of order. A new day's quota is
+    read from ``status``.
+    """
+    
+    # API-Football free plan
+    DEFAULT_PER_MINUTE = 10
+    DEFAULT_DAILY_LIMIT = 100
+    
+    def __init__(self, per_minute=DEFAULT_PER_MINUTE, daily_limit=DEFAULT_DAILY_LIMIT, clock=None,
+                 max_retries=5, base_backoff=1.0, max_backoff=60.0, rng=None):
+        self.clock = clock or SystemClock()
+        self.minute_bucket = TokenBucket(per_minute / 60.0, per_minute, self.clock)
+        self.daily_limit = daily_limit
+        self.daily_remaining = daily_limit
+        self.max_retries = max_retries
+        self.base_backoff = base_backoff
+        self.max_backoff = max_backoff
+        self.rng = rng or random.Random()
+        self._lock = threading.Lock()
+    
+    def acquire(self):
+        """Wait for a request slot; return False when the daily budget is spent."""
+        with self._lock:
+            if self.daily_remaining <= 0:
+                return False
+            self.daily_remaining -= 1
+            wait = self.minute_bucket.reserve()
+            
+        if wait > 0:
+            self.clock.sleep(wait)
+        return True
+    
+    def seed_from_status(self, status):
+        """Take the daily limit and usage from a ``status`` endpoint response."""
+        requests = (status or {}).get('response', {}).get('requests')
+        if not requests:
+            return False
+            
+        with self._lock:
+            self.daily_limit = int(requests.get('limit_day', self.daily_limit))
+            self.daily_remaining = max(0, self.daily_limit - int(requests.get('current', 0)))
+        return True
+    
+    def update_from_headers(self, headers):
+        """Track the quota headers of a response; absent headers change nothing."""
+        def header(name):
+            value = headers.get(name)
+            try:
+                return int(value) if value is not None else None
+            except ValueError:
+                return None
+                
+        daily_limit = header('x-ratelimit-requests-limit')
+        daily_remaining = header('x-ratelimit-requests-remaining')
+        minute_limit = header('X-RateLimit-Limit')
+        minute_remaining = header('X-RateLimit-Remaining')
+        
+        with self._lock:
+            if daily_limit is not None:
+                self.daily_limit = daily_limit
+            if daily_remaining is not None:
+                self.daily_remaining = min(self.daily_remaining, daily_remaining)
+            if minute_limit is not None and minute_limit != self.minute_bucket.capacity:
+                self.minute_bucket.capacity = minute_limit
+                self.minute_bucket.rate = minute_limit / 60.0
+            if minute_remaining is not None:
+                self.minute_bucket.limit(minute_remaining)
+    
+    def backoff_delay(self, attempt, retry_after=None):
+        """Seconds to wait before retry ``attempt`` (0-based) of a throttled request.
+        
+        Honours a ``Retry-After`` value, otherwise uses exponential backoff
+        with full jitter so parallel workers do not retry in lockstep.
+        """
+        if retry_after is not None:
+            try:
+                return max(0.0, float(retry_after))
+            except ValueError:
+                pass
+        return self.rng.uniform(0, min(self.max_backoff, self.base_backoff * 2 ** attempt))
+    
+    def refund(self):
+        """Return a daily slot taken for a request that never reached the API."""
+        with self._lock:
+            self.daily_remaining = min(self.daily_limit, self.daily_remaining + 1)
+    
+    def wait(self, seconds):
+        self.clock.sleep(seconds)
@@ -0,0 +1,176 @@
+"""Persistent cache of API-Football responses, keyed by request content."""
+
+import gzip
+import hashlib
+import json
+import logging
+import os
+import tempfile
+import threading
+import time
+
+# Fixture status codes that can no longer change
+FINISHED_STATUSES = {'FT', 'AET', 'PEN'}
+
+# Seconds a response stays fresh, per endpoint
+DEFAULT_TTLS = {
+    'status': 60,
+    'teams': 24 * 3600,
+    'fixtures': 3600,
+    'fixtures/statistics': 3600,
+}
+DEFAULT_TTL = 3600
+
+def request_key(endpoint, params=None):
+    """Return the cache key of a request: a SHA-256 of its canonical form."""
+    canonical = json.dumps(
+        {'endpoint': endpoint.strip('/'), 'params': {str(k): str(v) for k, v in (params or {}).items()}},
+        sort_keys=True, separators=(',', ':')
+    )
+    return hashlib.sha256(canonical.encode('utf-8')).hexdigest()
+
+class ResponseCache:
+    """Gzipped JSON responses on disk with per-endpoint expiry.
+    
+    Responses about finished fixtures (single fixtures, ``ids=`` batches
+    and their statistics) never expire once the statistics are in them.
+    Everything else expires after the endpoint's TTL, so statistics the
+    API has not published yet are asked for again. Once the cache outgrows ``max_bytes``, the least
+    recently used entries are evicted. In ``offline`` mode expired entries
+    are served as well, and callers are expected not to hit the network.
+    """
+    
+    def __init__(self, root='api_cache', max_bytes=512 * 1024 * 1024, ttls=None, offline=False, clock=time.time):
+        """Store entries under ``root``, overriding endpoint TTLs with ``ttls``."""
+        self.root = root
+        self.max_bytes = max_bytes
+        self.ttls = {**DEFAULT_TTLS, **(ttls or {})}
+        self.offline = offline
+        self.clock = clock
+        self._lock = threading.Lock()
+        self._size = None
+    
+    def path(self, key):
+        """Return the file of a cache key, fanned out over 256 directories."""
+        return os.path.join(self.root, key[:2], f'{key}.json.gz')
+    
+    def ttl(self, endpoint, params, data):
+        """Return how long a response stays fresh, or None if it never expires."""
+        endpoint = endpoint.strip('/')
+        params = params or {}
+        response = data.get('response')
+        
+        if response:
+            if endpoint == 'fixtures/statistics':
+                return None
+            if endpoint == 'fixtures' and ('id' in params or 'ids' in params) and all(
+                fixture.get('fixture', {}).get('status', {}).get('short') in FINISHED_STATUSES
+                and fixture.get('statistics')
+                for fixture in response
+            ):
+                return None
+                
+        return self.ttls.get(endpoint, DEFAULT_TTL)
+    
+    def get(self, endpoint, params=None):
+        """Return the cached response of a request, or None if absent or expired."""
+        path = self.path(request_key(endpoint, params))
+        try:
+            with gzip.open(path, 'rt', encoding='utf-8') as f:
+                entry = json.load(f)
+        except FileNotFoundError:
+            return None
+        except (OSError, ValueError) as e:
+            logging.warning(f"Dropping unreadable cache entry {path}: {str(e)}")
+            self._remove(path)
+            return None
+            
+        expires_at = entry.get('expires_at')
+        if expires_at is not None and expires_at <= self.clock() and not self.offline:
+            return None
+            
+        try:
+            os.utime(path)  # Recency for eviction
+        except OSError:
+            pass
+        return entry['data']
+    
+    def put(self, endpoint, params, data):
+        """Store a successful response."""
+        if data.get('errors'):
+            return
+            
+        ttl = self.ttl(endpoint, params, data)
+        entry = {
+            'endpoint': endpoint,
+            'params': params or {},
+            'stored_at': self.clock(),
+            'expires_at': None if ttl is None else self.clock() + ttl,
+            'data': data
+        }
+        path = self.path(request_key(endpoint, params))
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as raw, gzip.GzipFile(fileobj=raw, mode='wb') as f:
+                f.write(json.dumps(entry, separators=(',', ':')).encode('utf-8'))
+            with self._lock:
+                old_size = os.path.getsize(path) if os.path.exists(path) else 0
+                os.replace(tmp_path, path)
+                if self._size is not None:
+                    self._size += os.path.getsize(path) - old_size
+        except Exception:
+            self._remove(tmp_path)
+            raise
+            
+        self._evict()
+    
+    def _entries(self):
+        """Yield ``(mtime, size, path)`` for every stored entry."""
+        for dirpath, _, filenames in os.walk(self.root):
+            for name in filenames:
+                if name.endswith('.json.gz'):
+                    path = os.path.join(dirpath, name)
+                    try:
+                        stat = os.stat(path)
+                    except OSError:
+                        continue
+                    yield stat.st_mtime, stat.st_size, path
+    
+    def _evict(self):
+        """Remove least recently used entries until the cache fits ``max_bytes``."""
+        with self._lock:
+            if self._size is None:
+                self._size = sum(size for _, size, _ in self._entries())
+            if self._size <= self.max_bytes:
+                return
+                
+            # Trim to 90% so the directory scan is not repeated on every put
+            target = self.max_bytes * 0.9
+            for _, size, path in sorted(self._entries()):
+                if self._size <= target:
+                    break
+                if self._remove(path):
+                    self._size -= size
+    
+    def size(self):
+        """Return the total size of the stored entries in bytes."""
+        with self._lock:
+            self._size = sum(size for _, size, _ in self._entries())
+            return self._size
+    
+    def clear(self):
+        """Remove every stored entry."""
+        with self._lock:
+            for _, _, path in list(self._entries()):
+                self._remove(path)
+            self._size = 0
+    
+    @staticmethod
+    def _remove(path):
+        try:
+            os.remove(path)
+            return True
+        except OSError:
+            return False
@@ -0,0 +1,115 @@
+"""Value-ranked scheduling of statistics requests under the daily API quota."""
+
+import logging
+import sqlite3
+import time
+
+class StatisticsScheduler:
+    """Rank matches missing statistics by how much fetching them helps predictions.
+    
+    A match's value combines:
+    
+    - recency, halving every ``half_life_days``, since recent form drives
+      current predictions and old matches only add training rows;
+    - for each team, whether the match lies in the team's last ``window``
+      matches (the rows its features and ``data_quality`` are built from),
+      scaled by how much of that window still lacks statistics;
+    - a boost for teams that play in upcoming fixtures.
+    """
+    
+    def __init__(self, db, window=5, half_life_days=30, gap_weight=2.0, upcoming_weight=1.0, clock=time.time):
+        """Rank the matches stored in ``db``."""
+        self.db = db
+        self.window = window
+        self.half_life_days = half_life_days
+        self.gap_weight = gap_weight
+        self.upcoming_weight = upcoming_weight
+        self.clock = clock
+    
+    def _pending_matches(self, conn, season=None):
+        """Return matches with a fixture ID but no statistics, optionally of one season."""
+        query = '''
+            SELECT m.id, m.api_fixture_id, m.home_team_id, m.away_team_id, m.date_ts, m.competition, m.season
+            FROM matches m
+            LEFT JOIN team_stats ts ON m.id = ts.match_id
+            WHERE ts.id IS NULL
+            AND m.api_fixture_id IS NOT NULL
+        '''
+        if season is None:
+            return conn.execute(query).fetchall()
+        return conn.execute(query + 'AND m.season = ?', (str(season),)).fetchall()
+    
+    def _team_windows(self, conn):
+        """Return each team's last ``window`` matches as ``(match_id, team_id, has_stats)``."""
+        return conn.execute('''
+            WITH timeline AS (
+                SELECT id AS match_id, home_team_id AS team_id, date_ts FROM matches
+                WHERE home_team_id IS NOT NULL
+                UNION ALL
+                SELECT id, away_team_id, date_ts FROM matches
+                WHERE away_team_id IS NOT NULL
+            ),
+            ranked AS (
+                SELECT
+                    match_id,
+                    team_id,
+                    ROW_NUMBER() OVER (PARTITION BY team_id ORDER BY date_ts DESC) as recency_rank
+                FROM timeline
+            )
+            SELECT r.match_id, r.team_id, ts.id IS NOT NULL as has_stats
+            FROM ranked r
+            LEFT JOIN team_stats ts ON ts.match_id = r.match_id AND ts.team_id = r.team_id
+            WHERE r.recency_rank <= ?
+        ''', (self.window,)).fetchall()
+    
+    def rank(self, upcoming_team_ids=(), season=None):
+        """Return every match missing statistics as a dict with its ``value``, best first.
+        
+        With ``season``, only that season's matches are ranked; team windows
+        always cover every season.
+        """
+        upcoming_team_ids = set(upcoming_team_ids)
+        try:
+            conn = self.db.pool.reader()
+            pending = self._pending_matches(conn, season)
+            windows = self._team_windows(conn)
+        except sqlite3.Error as e:
+            logging.error(f"Database error ranking matches for statistics: {str(e)}")
+            raise
+            
+        # Share of each team's current feature window that has no statistics
+        covered = {}
+        in_window = set()
+        for match_id, team_id, has_stats in windows:
+            covered[team_id] = covered.get(team_id, 0) + has_stats
+            if not has_stats:
+                in_window.add((match_id, team_id))
+        gaps = {team_id: (self.window - count) / self.window for team_id, count in covered.items()}
+        
+        now = self.clock()
+        ranked = []
+        for match_id, fixture_id, home_team_id, away_team_id, date_ts, competition, season in pending:
+            age_days = max(0.0, (now - date_ts) / 86400) if date_ts is not None else float('inf')
+            value = 0.5 ** (age_days / self.half_life_days)
+            for team_id in (home_team_id, away_team_id):
+                if (match_id, team_id) in in_window:
+                    boost = 1 + self.upcoming_weight * (team_id in upcoming_team_ids)
+                    value += self.gap_weight * gaps[team_id] * boost
+                    
+            ranked.append({
+                'match_id': match_id,
+                'fixture_id': fixture_id,
+                'competition': competition,
+                'season': season,
+                'value': value
+            })
+            
+        ranked.sort(key=lambda match: match['value'], reverse=True)
+        return ranked
+    
+    def plan(self, budget_requests, fixtures_per_request=1, upcoming_team_ids=(), season=None):
+        """Return the ``(match_id, fixture_id)`` pairs worth fetching with the budget, best first."""
+        if budget_requests <= 0:
+            return []
+        ranked = self.rank(upcoming_team_ids, season)[:budget_requests * fixtures_per_request]
+        return [(match['match_id'], match['fixture_id']) for match in ranked]
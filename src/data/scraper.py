@@ -1,22 +1,42 @@
 import requests
-from bs4 import BeautifulSoup
-from selenium import webdriver
+from requests.adapters import HTTPAdapter
+from selenium.common.exceptions import TimeoutException
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
-from datetime import datetime
+from concurrent.futures import ThreadPoolExecutor
+from urllib.parse import urljoin
 import time
 import logging
+from . import page_parsers
 from .database import Database
+from .driver_pool import DriverPool, headless_chrome
 
 class SoccerDataScraper:
-    def __init__(self):
-        """Initialize the scraper with necessary configurations"""
+    def __init__(self, browsers=2, pages_per_browser=50, page_timeout=30, browser_fallback=True):
+        """Initialize the scraper with necessary configurations
+        
+        Pages are fetched over plain HTTP and parsed from their embedded
+        JSON state or markup. Only pages that need JavaScript fall back to
+        a browser (unless ``browser_fallback`` is off): up to ``browsers``
+        long-lived Chrome instances shared by all pages, each replaced after
+        ``pages_per_browser`` pages. A page taking over ``page_timeout``
+        seconds to load fails that page.
+        """
         self.db = Database()
         self.headers = {
             'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'
         }
         self.setup_logging()
+        self.page_timeout = page_timeout
+        self.browser_fallback = browser_fallback
+        
+        # Keep-alive session shared by the match workers
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        self.session.mount('https://', HTTPAdapter(pool_connections=1, pool_maxsize=browsers))
+        self.session.mount('http://', HTTPAdapter(pool_connections=1, pool_maxsize=browsers))
+        self.drivers = DriverPool(browsers, pages_per_browser, page_timeout, factory=self.setup_selenium)
     
     def setup_logging(self):
         """Set up logging configuration"""
@@ -32,173 +52,158 @@ class SoccerDataScraper:
     
     def setup_selenium(self):
         """Set up Selenium WebDriver"""
-        options = webdriver.ChromeOptions()
-        options.add_argument('--headless')
-        options.add_argument('--no-sandbox')
-        options.add_argument('--disable-dev-shm-usage')
-        return webdriver.Chrome(options=options)
+        return headless_chrome()
+    
+    def fetch_page(self, url):
+        """Fetch a page's HTML without a browser, or None if the request fails"""
+        try:
+            response = self.session.get(url, timeout=self.page_timeout)
+            response.raise_for_status()
+            return response.text
+        except requests.RequestException as e:
+            self.logger.warning(f"Error fetching {url}: {str(e)}")
+            return None
     
     def scrape_fotmob_matches(self, league_id, season):
         """Scrape match data from Fotmob"""
         base_url = f"https://www.fotmob.com/leagues/{league_id}/matches"
         
         try:
-            driver = self.setup_selenium()
-            driver.get(base_url)
-            
-            # Wait for matches to load
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "matches"))
-            )
+            html = self.fetch_page(base_url)
+            matches = page_parsers.parse_match_list(html) if html else []
+            if not matches and self.browser_fallback:
+                self.logger.info(f"No match data in the HTML for league {league_id}, using a browser")
+                matches = self.browser_match_list(base_url)
             
-            # Get all match elements
-            match_elements = driver.find_elements(By.CLASS_NAME, "match-row")
+            # Store all teams and matches with one bulk insert each
+            team_names = list(dict.fromkeys(
+                name for match in matches for name in (match['home_team'], match['away_team'])
+            ))
+            team_ids = dict(zip(team_names, self.db.insert_teams_bulk([
+                {'name': name, 'league': league_id} for name in team_names
+            ])))
+            match_ids = self.db.insert_matches_bulk([{
+                'home_team_id': team_ids[match['home_team']],
+                'away_team_id': team_ids[match['away_team']],
+                'home_score': match['home_score'],
+                'away_score': match['away_score'],
+                'date': match['date'],
+                'competition': league_id,
+                'season': season
+            } for match in matches])
+            match_urls = [urljoin(base_url, match['url']) if match['url'] else None for match in matches]
             
-            for match in match_elements:
-                try:
-                    # Extract match data
-                    home_team = match.find_element(By.CLASS_NAME, "home-team").text
-                    away_team = match.find_element(By.CLASS_NAME, "away-team").text
-                    score = match.find_element(By.CLASS_NAME, "score").text
-                    date_str = match.find_element(By.CLASS_NAME, "date").text
-                    
-                    # Process the data
-                    home_score, away_score = map(int, score.split(' - '))
-                    match_date = datetime.strptime(date_str, "%Y-%m-%d")
-                    
-                    # Store in database
-                    home_team_id = self.db.insert_team(home_team, league_id, None)
-                    away_team_id = self.db.insert_team(away_team, league_id, None)
-                    
-                    match_id = self.db.insert_match(
-                        home_team_id, away_team_id, home_score, away_score,
-                        match_date, league_id, season
-                    )
-                    
-                    # Get detailed match statistics
-                    self.scrape_match_details(match_id, match.get_attribute("href"))
-                    
-                except Exception as e:
-                    self.logger.error(f"Error processing match: {str(e)}")
-                    continue
+            # Get detailed match statistics, one match per pooled connection at a time
+            with ThreadPoolExecutor(max_workers=self.drivers.size) as executor:
+                list(executor.map(self.scrape_match_details, match_ids, match_urls))
             
         except Exception as e:
             self.logger.error(f"Error scraping Fotmob: {str(e)}")
-        finally:
-            driver.quit()
     
-    def scrape_match_details(self, match_id, match_url):
-        """Scrape detailed match statistics"""
-        try:
-            driver = self.setup_selenium()
-            driver.get(match_url)
+    def browser_match_list(self, url):
+        """Render a league matches page in a pooled browser and parse it"""
+        with self.drivers.driver() as driver:
+            driver.get(url)
             
-            # Wait for statistics to load
+            # Wait for matches to load
             WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "match-stats"))
+                EC.presence_of_element_located((By.CLASS_NAME, "matches"))
             )
             
-            # Get team statistics
-            stats = driver.find_elements(By.CLASS_NAME, "stat-row")
-            
-            home_stats = {}
-            away_stats = {}
-            
-            for stat in stats:
-                name = stat.find_element(By.CLASS_NAME, "stat-name").text
-                home_value = stat.find_element(By.CLASS_NAME, "home-value").text
-                away_value = stat.find_element(By.CLASS_NAME, "away-value").text
-                
-                home_stats[name] = home_value
-                away_stats[name] = away_value
+            return page_parsers.parse_match_list(driver.page_source)
+    
+    def scrape_match_details(self, match_id, match_url):
+        """Scrape detailed match statistics"""
+        if not match_url:
+            return
+        try:
+            html = self.fetch_page(match_url)
+            home_stats, away_stats, players = page_parsers.parse_match_details(html) if html else ({}, {}, [])
+            if not home_stats and self.browser_fallback:
+                home_stats, away_stats, players = self.browser_match_details(match_url)
             
             # Store team statistics
-            self.store_team_stats(match_id, home_stats, away_stats)
+            if home_stats:
+                self.store_team_stats(match_id, home_stats, away_stats)
             
-            # Get player statistics
-            self.scrape_player_stats(match_id, driver)
+            # Store player statistics
+            self.store_player_stats(match_id, players)
             
         except Exception as e:
             self.logger.error(f"Error scraping match details: {str(e)}")
         finally:
-            driver.quit()
+            # Lookups open a reader on the executor's short-lived thread
+            self.db.pool.release()
+    
+    def browser_match_details(self, url):
+        """Render a match page in a pooled browser and parse it like fetched HTML"""
+        with self.drivers.driver() as driver:
+            driver.get(url)
+            
+            # Wait for statistics to load
+            WebDriverWait(driver, 10).until(
+                EC.presence_of_element_located((By.CLASS_NAME, "match-stats"))
+            )
+            try:
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.CLASS_NAME, "player-stats"))
+                )
+            except TimeoutException:
+                self.logger.warning(f"No player statistics on {url}")
+            
+            # Read the rendered page once instead of element by element
+            return page_parsers.parse_match_details(driver.page_source)
     
     def store_team_stats(self, match_id, home_stats, away_stats):
         """Store team statistics in database"""
         match_data = self.db.get_match_data(match_id)
         
-        # Store home team stats
-        self.db.insert_team_stats(
-            match_data['home_team_id'],
-            match_id,
-            float(home_stats.get('Possession', '0').strip('%')) / 100,
-            int(home_stats.get('Shots', 0)),
-            int(home_stats.get('Shots on Target', 0)),
-            int(home_stats.get('Corners', 0)),
-            int(home_stats.get('Fouls', 0))
-        )
-        
-        # Store away team stats
-        self.db.insert_team_stats(
-            match_data['away_team_id'],
-            match_id,
-            float(away_stats.get('Possession', '0').strip('%')) / 100,
-            int(away_stats.get('Shots', 0)),
-            int(away_stats.get('Shots on Target', 0)),
-            int(away_stats.get('Corners', 0)),
-            int(away_stats.get('Fouls', 0))
-        )
+        # Store both teams' stats in a single transaction
+        self.db.insert_team_stats_bulk([
+            {
+                'team_id': match_data[f'{side}_team_id'],
+                'match_id': match_id,
+                'possession': float(stats.get('Possession', '0').strip('%')) / 100,
+                'shots': int(stats.get('Shots', 0)),
+                'shots_on_target': int(stats.get('Shots on Target', 0)),
+                'corners': int(stats.get('Corners', 0)),
+                'fouls': int(stats.get('Fouls', 0))
+            }
+            for side, stats in (('home', home_stats), ('away', away_stats))
+        ])
     
-    def scrape_player_stats(self, match_id, driver):
-        """Scrape and store player statistics"""
+    def store_player_stats(self, match_id, players):
+        """Store parsed player statistics for a match in one transaction
+        
+        Players are filed under the match's home or away team by team
+        name, so same-named teams in other leagues can't be picked up.
+        """
         try:
-            # Wait for player stats to load
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, "player-stats"))
-            )
-            
-            # Get all player rows
-            player_rows = driver.find_elements(By.CLASS_NAME, "player-row")
+            match_data = self.db.get_match_data(match_id)
+            if match_data is None:
+                self.logger.warning(f"Skipping player stats of unknown match {match_id}")
+                return
+            team_ids = {
+                self.db.get_team_name(match_data[f'{side}_team_id']): match_data[f'{side}_team_id']
+                for side in ('home', 'away')
+            }
             
-            for row in player_rows:
-                name = row.find_element(By.CLASS_NAME, "player-name").text
-                team_name = row.find_element(By.CLASS_NAME, "team-name").text
-                
-                # Get team ID
-                team_id = self.db.get_team_id(team_name)
-                if not team_id:
-                    continue
+            unknown = {player['team_name'] for player in players} - set(team_ids)
+            if unknown:
+                self.logger.warning(f"Skipping player stats of teams {sorted(unknown)} not playing in match {match_id}")
                 
-                # Get or create player
-                player_id = self.db.get_player_id(name, team_id)
-                if not player_id:
-                    player_id = self.db.insert_player(
-                        name, team_id,
-                        row.find_element(By.CLASS_NAME, "position").text,
-                        None  # Nationality not available in this view
-                    )
-                
-                # Get player stats
-                stats = {
-                    'minutes': int(row.find_element(By.CLASS_NAME, "minutes").text),
-                    'goals': int(row.find_element(By.CLASS_NAME, "goals").text),
-                    'assists': int(row.find_element(By.CLASS_NAME, "assists").text),
-                    'shots': int(row.find_element(By.CLASS_NAME, "shots").text),
-                    'shots_on_target': int(row.find_element(By.CLASS_NAME, "shots-on-target").text),
-                    'passes': int(row.find_element(By.CLASS_NAME, "passes").text),
-                    'pass_accuracy': float(row.find_element(By.CLASS_NAME, "pass-accuracy").text.strip('%')) / 100
+            self.db.insert_match_players(match_id, [
+                {
+                    **player,
+                    'team_id': team_ids[player['team_name']],
+                    'nationality': None  # Nationality not available in this view
                 }
-                
-                # Store player stats
-                self.db.insert_player_stats(
-                    player_id, match_id,
-                    stats['minutes'], stats['goals'], stats['assists'],
-                    stats['shots'], stats['shots_on_target'],
-                    stats['passes'], stats['pass_accuracy']
-                )
-                
+                for player in players
+                if player['team_name'] in team_ids
+            ])
+            
         except Exception as e:
-            self.logger.error(f"Error scraping player stats: {str(e)}")
+            self.logger.error(f"Error storing player stats: {str(e)}")
     
     def scrape_league_data(self, league_id, seasons):
         """Scrape data for multiple seasons of a league"""
@@ -209,4 +214,6 @@ class SoccerDataScraper:
     
     def close(self):
         """Clean up resources"""
+        self.drivers.close()
+        self.session.close()
         self.db.close() 
\ No newline at end of file
@@ -0,0 +1,207 @@
+"""Tests of the API-Football collector against the local stand-in in ``fake_api``."""
+
+from datetime import datetime, timedelta, timezone
+import pytest
+from src.data.collector import INCREMENTAL_OVERLAP, APIFootballCollector
+from src.data.config import COMPETITIONS
+from src.data.fake_api import FakeAPIFootball
+from src.data.ratelimit import FakeClock, RateLimiter
+
+SEASON = 2023
+PREMIER_LEAGUE = COMPETITIONS['Premier League']
+
+@pytest.fixture(autouse=True)
+def in_tmp_path(tmp_path, monkeypatch):
+    """Keep the collector's log file and caches out of the working tree."""
+    monkeypatch.chdir(tmp_path)
+
+@pytest.fixture
+def api():
+    # Six teams play 30 matches per league
+    with FakeAPIFootball(COMPETITIONS, season=SEASON, teams=6) as api:
+        yield api
+
+def make_collector(api, tmp_path, **options):
+    """Return a collector pointed at ``api``, pacing on a fake clock."""
+    return APIFootballCollector(
+        rate_limiter=RateLimiter(per_minute=api.per_minute, daily_limit=api.daily_limit, clock=FakeClock()),
+        cache=False,
+        api_base_url=api.base_url,
+        db_path=str(tmp_path / 'data.db'),
+        **options
+    )
+
+def stored_shots(db):
+    """Return ``{(api_fixture_id, api_team_id): shots}`` over every stored statistics row."""
+    return dict(((fixture_id, team_id), shots) for fixture_id, team_id, shots in db.pool.reader().execute('''
+        SELECT m.api_fixture_id, t.api_team_id, ts.shots
+        FROM team_stats ts
+        JOIN matches m ON m.id = ts.match_id
+        JOIN teams t ON t.id = ts.team_id
+    '''))
+
+def published_shots(api, fixture_ids):
+    """Return the stand-in's shots in the same shape as ``stored_shots``."""
+    return {
+        (fixture_id, team['team']['id']): next(
+            stat['value'] for stat in team['statistics'] if stat['type'] == 'Total Shots'
+        )
+        for fixture_id in fixture_ids
+        for team in api.fixtures[fixture_id]['statistics']
+    }
+
+def test_statistics_are_fetched_concurrently_within_the_budget(api, tmp_path):
+    collector = make_collector(api, tmp_path, max_workers=3)
+    assert collector.collect_team_data(PREMIER_LEAGUE, SEASON)
+    assert collector.collect_match_data(PREMIER_LEAGUE, SEASON)
+    matches = collector.db.get_matches_without_statistics('Premier League', str(SEASON))
+    assert len(matches) == 30
+    
+    # One grouped request covers 20 matches
+    requests = api.requests
+    assert collector.collect_statistics_concurrently(matches, max_requests=1) == 20
+    assert api.requests - requests == 1
+    
+    # The daily quota, as the API reports it, caps per-match requests too
+    matches = collector.db.get_matches_without_statistics('Premier League', str(SEASON))
+    api.daily_limit = api.requests + 4
+    collector.rate_limiter.daily_remaining = 4
+    assert collector.collect_statistics_concurrently(matches, batch_size=3, fixtures_per_request=1) == 4
+    assert api.requests - requests == 5
+    assert api.endpoint_counts['fixtures/statistics'] == 4
+    
+    api.daily_limit = api.requests + 100
+    collector.rate_limiter.daily_remaining = 100
+    matches = collector.db.get_matches_without_statistics('Premier League', str(SEASON))
+    assert collector.collect_statistics_concurrently(matches, batch_size=3, fixtures_per_request=1) == 6
+    assert collector.db.get_matches_without_statistics('Premier League', str(SEASON)) == []
+    
+    # Every row came through the single writer, filed under the right team
+    fixture_ids = [fixture['fixture']['id'] for fixture in api.leagues[PREMIER_LEAGUE].fixtures]
+    assert stored_shots(collector.db) == published_shots(api, fixture_ids)
+    
+    # Worker threads closed their read connections; only this thread's is left
+    collector.db.pool.release()
+    assert collector.db.pool._readers == []
+    collector.close()
+    collector.db.close()
+
+def test_prioritized_statistics_keep_to_the_season_and_the_reserve(api, tmp_path):
+    collector = make_collector(api, tmp_path)
+    assert collector.collect_team_data(PREMIER_LEAGUE, SEASON)
+    assert collector.collect_match_data(PREMIER_LEAGUE, SEASON)
+    
+    # A match of the previous season, dated today so that it would rank first
+    home, away = [row[0] for row in collector.db.pool.reader().execute('SELECT id FROM teams ORDER BY id LIMIT 2')]
+    [old_match] = collector.db.insert_matches_bulk([{
+        'home_team_id': home,
+        'away_team_id': away,
+        'home_score': 0,
+        'away_score': 0,
+        'date': datetime.now(),
+        'competition': 'Premier League',
+        'season': str(SEASON - 1),
+        'api_fixture_id': 1
+    }])
+    
+    requests = api.requests
+    api.daily_limit = api.requests + 4
+    collector.rate_limiter.daily_remaining = 4
+    assert collector.collect_prioritized_statistics(SEASON, reserve=1, fixtures_per_request=1) == 3
+    assert api.requests - requests == 3
+    assert collector.requests_remaining == 1
+    assert len(collector.db.get_matches_without_statistics('Premier League', str(SEASON))) == 27
+    assert collector.db.get_matches_without_statistics('Premier League', str(SEASON - 1)) == [(old_match, 1)]
+    collector.close()
+    collector.db.close()
+
+def table_counts(db):
+    """Return the number of stored matches and statistics rows."""
+    conn = db.pool.reader()
+    return tuple(conn.execute(f'SELECT COUNT(*) FROM {table}').fetchone()[0] for table in ('matches', 'team_stats'))
+
+def test_incremental_season_runs_fetch_only_what_changed(api, tmp_path):
+    # Status, then per league: teams, fixtures and two grouped statistics requests
+    make_collector(api, tmp_path).collect_season_data(SEASON, include_stats=True, incremental=True)
+    assert api.requests == 21
+    assert api.endpoint_counts == {'status': 1, 'teams': 5, 'fixtures': 15}
+    
+    # The provider corrects the score of the last fixture of the season
+    last = api.leagues[PREMIER_LEAGUE].fixtures[-1]
+    last['goals'] = {'home': last['goals']['home'] + 3, 'away': last['goals']['away']}
+    
+    # Status, then one windowed fixture list per league; nothing new needs statistics
+    collector = make_collector(api, tmp_path)
+    collector.collect_season_data(SEASON, include_stats=True, incremental=True)
+    assert api.requests == 27
+    assert api.endpoint_counts == {'status': 2, 'teams': 5, 'fixtures': 20}
+    
+    collector = make_collector(api, tmp_path)
+    assert table_counts(collector.db) == (150, 300)
+    assert collector.db.pool.reader().execute(
+        'SELECT home_score, away_score FROM matches WHERE api_fixture_id = ?', (last['fixture']['id'],)
+    ).fetchone() == (last['goals']['home'], last['goals']['away'])
+    collector.close()
+
+def test_queued_jobs_run_within_the_budget(api, tmp_path):
+    collector = make_collector(api, tmp_path)
+    assert collector.queue_season_jobs(SEASON) == 10
+    
+    # A team and a fixture list job per league, one request each
+    requests = api.requests
+    assert collector.run_jobs(max_requests=10) == 10
+    assert api.requests - requests == 10
+    assert collector.jobs.counts() == {('teams', 'done'): 5, ('fixtures', 'done'): 5, ('statistics', 'pending'): 150}
+    
+    # The fixture lists queued their matches' statistics, 20 per request
+    assert collector.run_jobs() == 150
+    assert api.requests - requests == 18
+    assert table_counts(collector.db) == (150, 300)
+    fixture_ids = list(api.fixtures)
+    assert stored_shots(collector.db) == published_shots(api, fixture_ids)
+    collector.close()
+
+def test_incremental_fixture_lists_only_cover_the_recent_window(tmp_path):
+    with FakeAPIFootball(COMPETITIONS, season=SEASON, teams=6, finished_rounds=4) as api:
+        collector = make_collector(api, tmp_path)
+        fetches = []
+        fetch_data = collector.fetch_data
+        collector.fetch_data = lambda endpoint, params=None: fetches.append(dict(params)) or fetch_data(endpoint, params)
+        
+        assert collector.collect_match_data(PREMIER_LEAGUE, SEASON, incremental=True)
+        assert 'from' not in fetches[-1]
+        fixtures = api.leagues[PREMIER_LEAGUE].fixtures
+        mark = fixtures[11]['fixture']['timestamp']
+        assert collector.db.get_collection_mark(PREMIER_LEAGUE, SEASON) == mark
+        
+        # Round 5 is played, a round 4 fixture moves by a day and another's score is
+        # corrected; so is one from round 1, which is outside the overlap window
+        for fixture in fixtures[12:15]:
+            fixture['fixture']['status']['short'] = 'FT'
+            fixture['goals'] = {'home': 1, 'away': 1}
+        rescheduled, corrected, old = fixtures[9], fixtures[10], fixtures[0]
+        old_score = (old['goals']['home'], old['goals']['away'])
+        rescheduled['fixture']['timestamp'] += 86400
+        corrected['goals'] = {'home': 5, 'away': 0}
+        old['goals'] = {'home': old_score[0] + 1, 'away': old_score[1]}
+        stored_ids = dict(collector.db.pool.reader().execute('SELECT api_fixture_id, id FROM matches'))
+        
+        assert collector.collect_match_data(PREMIER_LEAGUE, SEASON, incremental=True)
+        since = datetime.fromtimestamp(mark, timezone.utc) - INCREMENTAL_OVERLAP
+        assert (fetches[-1]['from'], fetches[-1]['to']) == (
+            since.strftime('%Y-%m-%d'), datetime.now(timezone.utc).strftime('%Y-%m-%d')
+        )
+        
+        stored = {
+            fixture_id: (match_id, date_ts, home_score, away_score)
+            for fixture_id, match_id, date_ts, home_score, away_score in collector.db.pool.reader().execute(
+                'SELECT api_fixture_id, id, date_ts, home_score, away_score FROM matches'
+            )
+        }
+        assert len(stored) == 15
+        fixture_id = rescheduled['fixture']['id']
+        assert stored[fixture_id][:2] == (stored_ids[fixture_id], rescheduled['fixture']['timestamp'])
+        assert stored[corrected['fixture']['id']][2:] == (5, 0)
+        assert stored[old['fixture']['id']][2:] == old_score
+        assert collector.db.get_collection_mark(PREMIER_LEAGUE, SEASON) == fixtures[14]['fixture']['timestamp']
+        collector.close()
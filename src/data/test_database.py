@@ -0,0 +1,204 @@
+"""Tests of bulk ingest, the match upserts behind incremental collection and player ingest."""
+
+from datetime import datetime
+import pytest
+from src.data.database import Database
+
+@pytest.fixture
+def db():
+    db = Database(':memory:')
+    db.insert_teams_bulk([
+        {'name': 'Arsenal', 'league': 'Premier League'},
+        {'name': 'Chelsea', 'league': 'Premier League'}
+    ])
+    yield db
+    db.close()
+
+def match(date, home_score=1, away_score=0, api_fixture_id=None, home_team_id=1, away_team_id=2):
+    return {
+        'home_team_id': home_team_id,
+        'away_team_id': away_team_id,
+        'home_score': home_score,
+        'away_score': away_score,
+        'date': date,
+        'competition': 'Premier League',
+        'season': '2023',
+        'api_fixture_id': api_fixture_id
+    }
+
+def stored_matches(db):
+    return db.pool.reader().execute('''
+        SELECT id, home_team_id, away_team_id, home_score, away_score, date, api_fixture_id
+        FROM matches ORDER BY id
+    ''').fetchall()
+
+def team_versions(db):
+    return db.pool.reader().execute('SELECT team_id, version FROM team_versions ORDER BY team_id').fetchall()
+
+def team_rows(db):
+    return db.pool.reader().execute('SELECT id, name, league, api_team_id FROM teams ORDER BY id').fetchall()
+
+def test_bulk_team_ids_follow_row_order(db):
+    [liverpool] = db.insert_teams_bulk([{'name': 'Liverpool', 'league': 'Premier League'}])
+    
+    # Resolved from the database, not the identity map
+    db.teams.clear()
+    assert db.insert_teams_bulk([
+        {'name': 'Liverpool', 'league': 'Premier League'},
+        {'name': 'Arsenal', 'league': 'Premier League'},
+        {'name': 'Liverpool', 'league': 'Premier League'},
+        {'name': 'Chelsea', 'league': 'Premier League'}
+    ]) == [liverpool, 1, liverpool, 2]
+    assert len(team_rows(db)) == 3
+
+def test_bulk_teams_resolve_by_provider_id(db):
+    db.teams.clear()
+    
+    # A team stored by name gets its provider id, which then wins over any label
+    assert db.insert_teams_bulk([{'name': 'Arsenal', 'league': 'Premier League', 'api_team_id': 42}]) == [1]
+    db.teams.clear()
+    assert db.insert_teams_bulk([{'name': 'Arsenal FC', 'league': '39', 'api_team_id': 42}]) == [1]
+    
+    # Rows of one new team under two labels make one row
+    everton, everton_fc = db.insert_teams_bulk([
+        {'name': 'Everton', 'league': '39', 'api_team_id': 45},
+        {'name': 'Everton FC', 'league': 'Premier League', 'api_team_id': 45}
+    ])
+    assert everton == everton_fc
+    assert team_rows(db) == [
+        (1, 'Arsenal', 'Premier League', 42),
+        (2, 'Chelsea', 'Premier League', None),
+        (everton, 'Everton', '39', 45)
+    ]
+
+def test_bulk_match_ids_resolve_existing_matches(db):
+    first, second = db.insert_matches_bulk([
+        match(datetime(2023, 8, 12, 15), api_fixture_id=1001),
+        match(datetime(2023, 8, 19, 15))
+    ])
+    
+    # Existing matches resolve by fixture id, or by teams and date, and are left as stored
+    ids = db.insert_matches_bulk([
+        match(datetime(2023, 8, 19, 15), 4, 4),
+        match(datetime(2023, 8, 13, 15), api_fixture_id=1001),
+        match(datetime(2023, 8, 26, 15), api_fixture_id=1003),
+        match(datetime(2023, 8, 19, 15))
+    ])
+    third = ids[2]
+    assert ids == [second, first, third, second]
+    assert stored_matches(db) == [
+        (first, 1, 2, 1, 0, '2023-08-12 15:00:00', 1001),
+        (second, 1, 2, 1, 0, '2023-08-19 15:00:00', None),
+        (third, 1, 2, 1, 0, '2023-08-26 15:00:00', 1003)
+    ]
+    assert db.insert_matches_bulk([]) == []
+
+def test_bulk_ids_resolve_past_the_parameter_limit(db):
+    rows = [{'name': f'Team {i}', 'league': 'Test League'} for i in range(1200)]
+    ids = db.insert_teams_bulk(rows)
+    assert len(set(ids)) == 1200
+    
+    db.teams.clear()
+    assert db.insert_teams_bulk(rows[::-1]) == ids[::-1]
+    
+    matches = [match(datetime(2023, 8, 1), home_team_id=home, away_team_id=away)
+               for home, away in zip(ids[::2], ids[1::2])]
+    match_ids = db.insert_matches_bulk(matches)
+    assert len(set(match_ids)) == 600
+    assert db.insert_matches_bulk(matches[::-1]) == match_ids[::-1]
+
+def test_matches_are_keyed_by_fixture_id(db):
+    assert db.upsert_matches_bulk([match(datetime(2023, 8, 12, 15), api_fixture_id=1001)]) == 1
+    versions = team_versions(db)
+    
+    # Unchanged rows are not rewritten
+    assert db.upsert_matches_bulk([match(datetime(2023, 8, 12, 15), api_fixture_id=1001)]) == 0
+    assert team_versions(db) == versions
+    
+    # A corrected score, then a rescheduled fixture, update the same match
+    assert db.upsert_matches_bulk([match(datetime(2023, 8, 12, 15), 2, 2, api_fixture_id=1001)]) == 1
+    assert db.upsert_matches_bulk([match(datetime(2023, 8, 13, 20), 2, 2, api_fixture_id=1001)]) == 1
+    assert stored_matches(db) == [(1, 1, 2, 2, 2, '2023-08-13 20:00:00', 1001)]
+    assert db.get_team_matches_before(1, datetime(2023, 9, 1)) == [
+        (1, int(datetime(2023, 8, 13, 20).timestamp()), 1, 2, 2, 2)
+    ]
+    assert team_versions(db) == [(team_id, version + 2) for team_id, version in versions]
+
+def test_matches_without_fixture_id_are_keyed_by_teams_and_date(db):
+    kickoff = datetime(2023, 8, 12, 15)
+    assert db.upsert_matches_bulk([match(kickoff), match(datetime(2023, 8, 19, 15))]) == 2
+    
+    assert db.upsert_matches_bulk([match(kickoff, 3, 1)]) == 1
+    assert db.upsert_matches_bulk([match(kickoff, 3, 1)]) == 0
+    
+    # A later row with the provider's id fills it in, and a row without one keeps it
+    assert db.upsert_matches_bulk([match(kickoff, 3, 1, api_fixture_id=1001)]) == 1
+    assert db.upsert_matches_bulk([match(kickoff, 3, 1)]) == 0
+    assert stored_matches(db) == [
+        (1, 1, 2, 3, 1, '2023-08-12 15:00:00', 1001),
+        (2, 1, 2, 1, 0, '2023-08-19 15:00:00', None)
+    ]
+
+def test_reversed_fixture_is_a_new_match(db):
+    kickoff = datetime(2023, 8, 12, 15)
+    db.upsert_matches_bulk([match(kickoff, api_fixture_id=1001)])
+    
+    assert db.upsert_matches_bulk([match(kickoff, api_fixture_id=1002, home_team_id=2, away_team_id=1)]) == 1
+    assert [row[-1] for row in stored_matches(db)] == [1001, 1002]
+
+def player(name, team_id, goals=0, minutes=90, **details):
+    """Return a player row for ``insert_match_players``."""
+    return {
+        'name': name,
+        'team_id': team_id,
+        'minutes': minutes,
+        'goals': goals,
+        'assists': 0,
+        'shots': goals + 1,
+        'shots_on_target': goals,
+        'passes': 30,
+        'pass_accuracy': 0.8,
+        **details
+    }
+
+def test_players_are_keyed_by_name_within_a_team(db):
+    assert db.insert_players_bulk([
+        {'name': 'Saka', 'team_id': 1, 'position': 'Midfielder'},
+        {'name': 'Palmer', 'team_id': 2},
+        {'name': 'Saka', 'team_id': 1}
+    ]) == [1, 2, 1]
+    
+    # Details are filled in, never cleared
+    assert db.insert_player('Saka', 1, nationality='England') == 1
+    assert db.insert_player('Saka', 1) == 1
+    assert db.get_squad(1) == [(1, 'Saka', 'Midfielder', 'England')]
+    
+    # The same name in another team is another player
+    other = db.insert_player('Saka', 2)
+    assert other != 1
+    assert db.get_player_id('Saka', 2) == other
+    assert db.get_squad(2) == [(2, 'Palmer', None, None), (other, 'Saka', None, None)]
+
+def test_match_players_are_stored_with_their_statistics(db):
+    first, second = db.insert_matches_bulk([match(datetime(2023, 8, 12, 15)), match(datetime(2023, 8, 19, 15))])
+    saka, palmer = db.insert_match_players(first, [player('Saka', 1, goals=1), player('Palmer', 2)])
+    assert db.insert_match_players(second, [player('Saka', 1, minutes=60)]) == [saka]
+    
+    # A corrected row replaces the earlier one for the same match
+    db.insert_match_players(first, [player('Saka', 1, goals=2)])
+    first_ts, second_ts = (int(datetime(2023, 8, day, 15).timestamp()) for day in (12, 19))
+    assert db.get_player_appearances(saka) == [
+        (second, second_ts, 60, 0, 0, 1, 0),
+        (first, first_ts, 90, 2, 0, 3, 2)
+    ]
+    assert db.get_player_appearances(saka, before_ts=datetime(2023, 8, 19, 15)) == [(first, first_ts, 90, 2, 0, 3, 2)]
+    assert db.get_player_appearances(saka, limit=1) == [(second, second_ts, 60, 0, 0, 1, 0)]
+    
+    # Rows take their team from the player and their date from the match
+    assert db.pool.reader().execute(
+        'SELECT player_id, match_id, team_id, date_ts FROM player_stats ORDER BY player_id, match_id'
+    ).fetchall() == [(saka, first, 1, first_ts), (saka, second, 1, second_ts), (palmer, first, 2, first_ts)]
+    
+    # Statistics of matches that aren't stored are dropped
+    db.insert_player_stats(palmer, 99, 90, 1, 0, 1, 1, 30, 0.8)
+    assert db.get_player_appearances(palmer) == [(first, first_ts, 90, 0, 0, 1, 0)]
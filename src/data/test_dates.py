@@ -0,0 +1,46 @@
+"""Tests of the conversion of match dates to epoch seconds."""
+
+import time
+from datetime import date, datetime, timezone
+import pytest
+from src.data.dates import to_epoch
+
+# 2023-08-11 20:00 in New York (EDT, UTC-4)
+KICKOFF = 1691798400
+
+@pytest.fixture
+def new_york(monkeypatch):
+    """Run in a local time zone away from UTC, with daylight saving."""
+    monkeypatch.setenv('TZ', 'America/New_York')
+    time.tzset()
+    yield
+    monkeypatch.undo()
+    time.tzset()
+
+def test_naive_dates_are_local_time(new_york):
+    assert to_epoch('2023-08-11 20:00:00') == KICKOFF
+    assert to_epoch(' 2023-08-11T20:00:00 ') == KICKOFF
+    assert to_epoch(datetime(2023, 8, 11, 20)) == KICKOFF
+    assert to_epoch(date(2023, 8, 12)) == KICKOFF + 4 * 3600
+    
+    # Winter dates are UTC-5
+    assert to_epoch('2023-12-11 20:00:00') - to_epoch('2023-12-11 19:00:00+00:00') == 6 * 3600
+
+def test_values_stored_by_the_collector_round_trip(new_york):
+    # The collector stores datetime.fromtimestamp() of the provider's epoch
+    for timestamp in (KICKOFF, 1699738200, 1711846800):
+        stored = datetime.fromtimestamp(timestamp)
+        assert to_epoch(stored) == timestamp
+        assert to_epoch(stored.isoformat(' ')) == timestamp
+
+def test_aware_dates_and_epochs_ignore_the_local_zone(new_york):
+    assert to_epoch('2023-08-12 00:00:00+00:00') == KICKOFF
+    assert to_epoch('2023-08-12T01:00:00+01:00') == KICKOFF
+    assert to_epoch(datetime(2023, 8, 12, tzinfo=timezone.utc)) == KICKOFF
+    assert to_epoch(KICKOFF) == KICKOFF
+    assert to_epoch(KICKOFF + 0.9) == KICKOFF
+
+def test_missing_and_unparseable_dates():
+    assert to_epoch(None) is None
+    with pytest.raises(ValueError):
+        to_epoch('TBD')
@@ -0,0 +1,129 @@
+"""Tests of the WebDriver pool with stand-in drivers instead of browsers."""
+
+import threading
+import time
+import pytest
+from selenium.common.exceptions import TimeoutException, WebDriverException
+from src.data.driver_pool import DriverPool
+
+class FakeDriver:
+    """Records what the pool does to it; ``alive = False`` fails health checks."""
+    
+    def __init__(self, number):
+        self.number = number
+        self.alive = True
+        self.quit_called = False
+        self.timeouts = {}
+    
+    def set_page_load_timeout(self, seconds):
+        self.timeouts['page_load'] = seconds
+    
+    def set_script_timeout(self, seconds):
+        self.timeouts['script'] = seconds
+    
+    def execute_script(self, script):
+        if not self.alive:
+            raise WebDriverException('chrome not reachable')
+        return 1
+    
+    def quit(self):
+        self.quit_called = True
+
+class FakeFactory:
+    """Driver factory keeping every driver it made."""
+    
+    def __init__(self):
+        self.drivers = []
+    
+    def __call__(self):
+        driver = FakeDriver(len(self.drivers))
+        self.drivers.append(driver)
+        return driver
+
+@pytest.fixture
+def factory():
+    return FakeFactory()
+
+def test_drivers_get_page_timeouts_and_are_reused(factory):
+    pool = DriverPool(size=2, page_timeout=12, factory=factory)
+    
+    with pool.driver() as first:
+        assert first.timeouts == {'page_load': 12, 'script': 12}
+    with pool.driver() as second:
+        assert second is first
+    assert len(factory.drivers) == 1
+
+def test_drivers_are_recycled_after_max_pages(factory):
+    pool = DriverPool(size=1, max_pages=2, factory=factory)
+    
+    for _ in range(5):
+        with pool.driver():
+            pass
+    assert [driver.quit_called for driver in factory.drivers] == [True, True, False]
+
+def test_unhealthy_drivers_are_replaced(factory):
+    pool = DriverPool(size=1, factory=factory)
+    with pool.driver() as driver:
+        pass
+    driver.alive = False
+    
+    with pool.driver() as replacement:
+        assert replacement is not driver
+    assert driver.quit_called and not replacement.quit_called
+
+def test_page_load_timeouts_retire_the_driver(factory):
+    pool = DriverPool(size=1, factory=factory)
+    
+    with pytest.raises(TimeoutException):
+        with pool.driver():
+            raise TimeoutException('page load timed out')
+    assert factory.drivers[0].quit_called
+    
+    # Other errors are the page's fault, not the browser's
+    with pytest.raises(ValueError):
+        with pool.driver():
+            raise ValueError('no match data')
+    assert not factory.drivers[1].quit_called
+    with pool.driver() as driver:
+        assert driver is factory.drivers[1]
+
+def test_leases_wait_for_a_free_driver(factory):
+    pool = DriverPool(size=1, factory=factory)
+    driver = pool.acquire()
+    
+    with pytest.raises(TimeoutError):
+        pool.acquire(timeout=0.05)
+        
+    releaser = threading.Timer(0.05, pool.release, (driver,))
+    releaser.start()
+    start = time.monotonic()
+    assert pool.acquire(timeout=5) is driver
+    assert time.monotonic() - start < 5
+    releaser.join()
+    assert len(factory.drivers) == 1
+
+def test_failed_starts_free_their_slot():
+    attempts = []
+    
+    def flaky_factory():
+        attempts.append(None)
+        if len(attempts) == 1:
+            raise WebDriverException('chromedriver missing')
+        return FakeDriver(len(attempts))
+        
+    pool = DriverPool(size=1, factory=flaky_factory)
+    with pytest.raises(WebDriverException):
+        pool.acquire(timeout=0)
+    assert pool.acquire(timeout=0).number == 2
+
+def test_close_quits_idle_and_returned_drivers(factory):
+    pool = DriverPool(size=2, factory=factory)
+    idle, leased = pool.acquire(), pool.acquire()
+    pool.release(idle)
+    
+    pool.close()
+    assert idle.quit_called and not leased.quit_called
+    pool.release(leased)
+    assert leased.quit_called
+    with pytest.raises(RuntimeError):
+        pool.acquire()
@@ -0,0 +1,53 @@
+"""Tests of ``FeatureCache`` invalidation through the team versions."""
+
+from src.data.database import Database
+from src.data.feature_cache import FeatureCache
+
+def make_loader(calls):
+    """Return a loader recording its calls and answering with the call count."""
+    def load(team_ids):
+        calls.append(list(team_ids))
+        return {team_id: len(calls) for team_id in team_ids}
+    return load
+
+def test_memory_database_sees_its_own_writes():
+    db = Database(':memory:')
+    with db.pool.writer() as conn:
+        conn.execute("INSERT INTO teams (name, league) VALUES ('Arsenal', 'Premier League'), ('Chelsea', 'Premier League')")
+    cache = FeatureCache(db.pool)
+    calls = []
+    load = make_loader(calls)
+    
+    assert cache.get_many([1, 2], 5, None, load) == {1: 1, 2: 1}
+    assert cache.get_many([1, 2], 5, None, load) == {1: 1, 2: 1}
+    assert calls == [[1, 2]]
+    
+    # The reader is the writer here, so its data_version never moves
+    with db.pool.writer() as conn:
+        conn.execute('''
+            INSERT INTO matches (home_team_id, away_team_id, date, home_score, away_score)
+            VALUES (1, 2, '2024-01-01', 1, 0)
+        ''')
+    assert cache.get_many([1, 2], 5, None, load) == {1: 2, 2: 2}
+    db.close()
+
+def test_other_teams_stay_cached(tmp_path):
+    db = Database(str(tmp_path / 'data.db'))
+    with db.pool.writer() as conn:
+        conn.execute('''
+            INSERT INTO teams (name, league)
+            VALUES ('Arsenal', 'Premier League'), ('Chelsea', 'Premier League'), ('Everton', 'Premier League')
+        ''')
+    cache = FeatureCache(db.pool)
+    calls = []
+    load = make_loader(calls)
+    
+    cache.get_many([1, 2, 3], 5, None, load)
+    with db.pool.writer() as conn:
+        conn.execute('''
+            INSERT INTO matches (home_team_id, away_team_id, date, home_score, away_score)
+            VALUES (1, 2, '2024-01-01', 1, 0)
+        ''')
+    assert cache.get_many([1, 2, 3], 5, None, load) == {1: 2, 2: 2, 3: 1}
+    assert calls == [[1, 2, 3], [1, 2]]
+    db.close()
@@ -0,0 +1,73 @@
+"""Tests of the bounded team identity map and its warm start from the database."""
+
+from src.data.database import Database
+from src.data.identity import TeamIdentityMap
+
+def test_least_recently_used_teams_are_evicted():
+    teams = TeamIdentityMap(maxsize=2)
+    teams.add(1, 'Arsenal', 'Premier League')
+    teams.add(2, 'Chelsea', 'Premier League')
+    
+    # A lookup makes Arsenal the most recently used
+    assert teams.get('Arsenal', 'Premier League') == 1
+    teams.add(3, 'Everton', 'Premier League')
+    assert teams.get('Chelsea', 'Premier League') is None
+    assert teams.get('Arsenal', 'Premier League') == 1
+    assert teams.get('Everton', 'Premier League') == 3
+    assert len(teams) == 2
+    
+    # Everton was read last
+    teams.add(4, 'Fulham', 'Premier League')
+    assert teams.get('Arsenal', 'Premier League') is None
+    assert teams.get('Everton', 'Premier League') == 3
+
+def test_provider_ids_are_bounded_separately():
+    teams = TeamIdentityMap(maxsize=2)
+    teams.add(1, 'Arsenal', 'Premier League', api_team_id=42)
+    teams.add(1, 'Arsenal', '39')
+    teams.add(2, 'Chelsea', 'Premier League')
+    
+    # Arsenal's names were evicted and re-added; its provider id never was
+    assert teams.get('Arsenal', 'Premier League') is None
+    assert teams.get_by_api_id(42) == 1
+    
+    teams.add(3, 'Everton', 'Premier League', api_team_id=45)
+    teams.add(4, 'Fulham', 'Premier League', api_team_id=36)
+    assert teams.get_by_api_id(42) is None
+    assert [teams.get_by_api_id(api_team_id) for api_team_id in (45, 36)] == [3, 4]
+    
+    teams.clear()
+    assert len(teams) == 0
+    assert teams.get_by_api_id(45) is None
+
+def test_warm_keeps_the_last_rows():
+    teams = TeamIdentityMap(maxsize=2)
+    teams.warm([(1, 'Arsenal', 'Premier League', 42), (2, 'Chelsea', 'Premier League'), (3, 'Everton', '39', None)])
+    
+    assert teams.get('Arsenal', 'Premier League') is None
+    assert teams.get_by_api_id(42) == 1
+    assert [teams.get(name, league) for name, league in (('Chelsea', 'Premier League'), ('Everton', '39'))] == [2, 3]
+
+def test_databases_start_with_the_newest_teams(tmp_path):
+    path = str(tmp_path / 'data.db')
+    db = Database(path)
+    arsenal, chelsea = db.insert_teams_bulk([
+        {'name': 'Arsenal', 'league': 'Premier League', 'api_team_id': 42},
+        {'name': 'Chelsea', 'league': 'Premier League'}
+    ])
+    db.close()
+    
+    db = Database(path)
+    assert db.teams.get('Arsenal', 'Premier League') == arsenal
+    assert db.teams.get_by_api_id(42) == arsenal
+    
+    # Cached teams resolve without reading the database
+    with db.pool.writer() as conn:
+        conn.execute('UPDATE teams SET name = name || ?', (' (renamed)',))
+    assert db.get_team_id('Chelsea', 'Premier League') == chelsea
+    assert db.insert_teams_bulk([{'name': 'Arsenal', 'league': '39', 'api_team_id': 42}]) == [arsenal]
+    
+    # Uncached ones are read and cached
+    assert db.get_team_id('Chelsea (renamed)', 'Premier League') == chelsea
+    assert db.teams.get('Chelsea (renamed)', 'Premier League') == chelsea
+    db.close()
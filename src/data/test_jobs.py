@@ -0,0 +1,114 @@
+"""Tests of the leased collection job queue on an in-memory database."""
+
+import pytest
+from src.data import jobs
+from src.data.database import Database
+
+class Clock:
+    """Settable stand-in for ``time.time``."""
+    
+    def __init__(self, now=1000):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+@pytest.fixture
+def queue(clock):
+    db = Database(':memory:')
+    yield jobs.JobQueue(db.pool, max_attempts=3, base_retry_delay=60, clock=clock)
+    db.close()
+
+def fixture_jobs(*league_ids, priority=0):
+    return [{'kind': jobs.FIXTURES, 'league_id': league_id, 'season': 2023, 'priority': priority} for league_id in league_ids]
+
+def test_job_key():
+    assert jobs.job_key(jobs.FIXTURES, 39, 2023) == jobs.job_key(jobs.FIXTURES, 39, '2023') == 'fixtures:39:2023'
+    assert jobs.job_key(jobs.STATISTICS, fixture_id=1035037) == 'statistics:1035037'
+
+def test_jobs_are_queued_once(queue):
+    assert queue.enqueue_many(fixture_jobs(39, 140)) == 2
+    assert queue.enqueue_many(fixture_jobs(39, 140, 78)) == 1
+    assert queue.enqueue_many([]) == 0
+    assert queue.counts() == {(jobs.FIXTURES, jobs.PENDING): 3}
+
+def test_claims_follow_priority_and_hide_leased_jobs(queue):
+    queue.enqueue_many(fixture_jobs(39, 140))
+    queue.enqueue_many(fixture_jobs(78, priority=5))
+    
+    first = queue.claim(jobs.FIXTURES, 'worker-1', limit=2)
+    assert [job['league_id'] for job in first] == [78, 39]
+    assert all(job['lease_owner'] == 'worker-1' and job['attempts'] == 1 for job in first)
+    
+    second = queue.claim(jobs.FIXTURES, 'worker-2', limit=5)
+    assert [job['league_id'] for job in second] == [140]
+    assert queue.claim(jobs.FIXTURES, 'worker-3') == []
+    assert queue.claim(jobs.TEAMS, 'worker-3') == []
+
+def test_expired_leases_are_reclaimed(queue, clock):
+    queue.enqueue_many(fixture_jobs(39))
+    queue.claim(jobs.FIXTURES, 'worker-1', lease_seconds=300)
+    
+    clock.now += 299
+    assert queue.claim(jobs.FIXTURES, 'worker-2') == []
+    
+    # worker-1 died; its lease runs out and the job goes to worker-2
+    clock.now += 1
+    [job] = queue.claim(jobs.FIXTURES, 'worker-2')
+    assert (job['lease_owner'], job['attempts']) == ('worker-2', 2)
+
+def test_failures_back_off_then_give_up(queue, clock):
+    queue.enqueue_many(fixture_jobs(39))
+    
+    [job] = queue.claim(jobs.FIXTURES, 'worker-1')
+    queue.fail([job['id']], 'HTTP 500')
+    assert queue.claim(jobs.FIXTURES, 'worker-1') == []
+    
+    # Retry delays double with every attempt
+    clock.now += 60
+    [job] = queue.claim(jobs.FIXTURES, 'worker-1')
+    queue.fail([job['id']], 'HTTP 500')
+    clock.now += 119
+    assert queue.claim(jobs.FIXTURES, 'worker-1') == []
+    clock.now += 1
+    [job] = queue.claim(jobs.FIXTURES, 'worker-1')
+    assert job['last_error'] == 'HTTP 500'
+    
+    queue.fail([job['id']], 'HTTP 500')
+    clock.now += 10 ** 6
+    assert queue.claim(jobs.FIXTURES, 'worker-1') == []
+    assert queue.counts() == {(jobs.FIXTURES, jobs.FAILED): 1}
+
+def test_fail_with_explicit_retry_delay(queue, clock):
+    queue.enqueue_many(fixture_jobs(39))
+    [job] = queue.claim(jobs.FIXTURES, 'worker-1')
+    queue.fail([job['id']], 'not published yet', retry_delay=3600)
+    
+    clock.now += 3599
+    assert queue.claim(jobs.FIXTURES, 'worker-1') == []
+    clock.now += 1
+    assert len(queue.claim(jobs.FIXTURES, 'worker-1')) == 1
+
+def test_released_jobs_keep_their_attempts(queue):
+    queue.enqueue_many(fixture_jobs(39))
+    [job] = queue.claim(jobs.FIXTURES, 'worker-1')
+    queue.release([job['id']])
+    
+    [job] = queue.claim(jobs.FIXTURES, 'worker-2')
+    assert job['attempts'] == 1
+
+def test_done_jobs_are_requeued_on_request(queue):
+    queue.enqueue_many(fixture_jobs(39, 140))
+    claimed = queue.claim(jobs.FIXTURES, 'worker-1', limit=2)
+    queue.complete([claimed[0]['id']])
+    
+    assert queue.enqueue_many(fixture_jobs(39, 140)) == 0
+    assert queue.enqueue_many(fixture_jobs(39, 140), requeue_done=True) == 1
+    assert queue.counts() == {(jobs.FIXTURES, jobs.PENDING): 1, (jobs.FIXTURES, jobs.RUNNING): 1}
+    
+    [job] = queue.claim(jobs.FIXTURES, 'worker-2')
+    assert (job['league_id'], job['attempts']) == (39, 1)
@@ -0,0 +1,99 @@
+"""Tests of the Fotmob page parsers against saved pages in ``fixtures/``."""
+
+import os
+from datetime import datetime
+from src.data import page_parsers
+from src.data.dates import to_epoch
+
+FIXTURES = os.path.join(os.path.dirname(__file__), 'fixtures')
+
+def read_fixture(name):
+    with open(os.path.join(FIXTURES, name), encoding='utf-8') as f:
+        return f.read()
+
+def test_extract_next_data():
+    data = page_parsers.extract_next_data(read_fixture('fotmob_league_next_data.html'))
+    assert data['props']['pageProps']['id'] == 47
+    assert page_parsers.extract_next_data(read_fixture('fotmob_league_markup.html')) is None
+
+def test_match_list_from_next_data():
+    matches = page_parsers.parse_match_list(read_fixture('fotmob_league_next_data.html'))
+    
+    # The fixture with a broken date is skipped and the unplayed one left out
+    assert [(match['home_team'], match['away_team'], match['home_score'], match['away_score']) for match in matches] == [
+        ('Burnley', 'Manchester City', 0, 3),
+        ('Arsenal', 'Nottingham Forest', 2, 1)
+    ]
+    assert matches[0]['url'] == '/matches/burnley-vs-manchester-city/2t6v3r#4193450'
+    
+    # Kickoffs are UTC on the page and naive local time once parsed
+    assert matches[0]['date'].tzinfo is None
+    assert to_epoch(matches[0]['date']) == 1691780400
+    assert to_epoch(matches[1]['date']) == 1691839800
+
+def test_match_list_from_markup():
+    matches = page_parsers.parse_match_list(read_fixture('fotmob_league_markup.html'))
+    
+    assert matches == [
+        {
+            'home_team': 'Burnley',
+            'away_team': 'Manchester City',
+            'home_score': 0,
+            'away_score': 3,
+            'date': datetime(2023, 8, 11),
+            'url': '/matches/burnley-vs-manchester-city/2t6v3r#4193450'
+        },
+        {
+            'home_team': 'Arsenal',
+            'away_team': 'Nottingham Forest',
+            'home_score': 2,
+            'away_score': 1,
+            'date': datetime(2023, 8, 12),
+            'url': 'https://www.fotmob.com/matches/arsenal-vs-nottingham-forest/2ytmxr#4193451'
+        }
+    ]
+
+def test_match_details_from_next_data():
+    home_stats, away_stats, players = page_parsers.parse_match_details(read_fixture('fotmob_match_next_data.html'))
+    
+    assert home_stats == {'Possession': '78', 'Shots': '15', 'Corners': '8', 'Shots on Target': '6', 'Fouls': '9'}
+    assert away_stats == {'Possession': '22', 'Shots': '6', 'Corners': '2', 'Shots on Target': '2', 'Fouls': '11'}
+    
+    saka, turner = sorted(players, key=lambda player: player['name'])
+    assert saka == {
+        'name': 'Bukayo Saka',
+        'team_name': 'Arsenal',
+        'position': 'RW',
+        'minutes': 90,
+        'goals': 1,
+        'assists': 0,
+        'shots': 4,
+        'shots_on_target': 2,
+        'passes': 38,
+        'pass_accuracy': 0.84
+    }
+    assert turner['team_name'] == 'Nottingham Forest'
+    assert turner['position'] == 'Goalkeeper'
+    assert (turner['shots'], turner['passes'], turner['pass_accuracy']) == (0, 21, 0.6)
+
+def test_match_details_from_markup():
+    home_stats, away_stats, players = page_parsers.parse_match_details(read_fixture('fotmob_match_markup.html'))
+    
+    assert home_stats == {'Possession': '78%', 'Shots': '15', 'Shots on Target': '6', 'Corners': '8', 'Fouls': '9'}
+    assert away_stats == {'Possession': '22%', 'Shots': '6', 'Shots on Target': '2', 'Corners': '2', 'Fouls': '11'}
+    
+    saka, turner = players
+    assert saka == {
+        'name': 'Bukayo Saka',
+        'team_name': 'Arsenal',
+        'position': 'RW',
+        'minutes': 90,
+        'goals': 1,
+        'assists': 0,
+        'shots': 4,
+        'shots_on_target': 2,
+        'passes': 38,
+        'pass_accuracy': 0.84
+    }
+    assert turner['position'] is None
+    assert (turner['shots'], turner['passes'], turner['pass_accuracy']) == (0, 21, 0.6)
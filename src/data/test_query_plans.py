@@ -0,0 +1,189 @@
+"""Tests of the schema migrations and of the hot query plans on an upgraded database."""
+
+import sqlite3
+from datetime import datetime
+import pytest
+from src.data.database import Database
+from src.data.dates import to_epoch
+from src.data.migrations import SCHEMA_VERSION, get_schema_version
+from src.data.query_plans import find_table_scans
+
+# The tables as the first release created them, before any migration
+LEGACY_SCHEMA = '''
+    CREATE TABLE teams (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        name TEXT NOT NULL,
+        league TEXT NOT NULL,
+        country TEXT,
+        UNIQUE(name, league)
+    );
+    
+    CREATE TABLE matches (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        home_team_id INTEGER,
+        away_team_id INTEGER,
+        home_score INTEGER,
+        away_score INTEGER,
+        date TEXT,
+        competition TEXT,
+        season TEXT,
+        api_fixture_id INTEGER,
+        FOREIGN KEY (home_team_id) REFERENCES teams (id),
+        FOREIGN KEY (away_team_id) REFERENCES teams (id),
+        UNIQUE(home_team_id, away_team_id, date)
+    );
+    
+    CREATE TABLE team_stats (
+        id INTEGER PRIMARY KEY AUTOINCREMENT,
+        team_id INTEGER,
+        match_id INTEGER,
+        possession REAL,
+        shots INTEGER,
+        shots_on_target INTEGER,
+        corners INTEGER,
+        fouls INTEGER,
+        FOREIGN KEY (team_id) REFERENCES teams (id),
+        FOREIGN KEY (match_id) REFERENCES matches (id),
+        UNIQUE(team_id, match_id)
+    );
+'''
+
+@pytest.fixture
+def legacy_db(tmp_path):
+    """Create an unmigrated database holding one team's fixtures and return its path."""
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany('INSERT INTO teams (id, name, league) VALUES (?, ?, ?)',
+                     [(1, 'Arsenal', 'Premier League'), (2, 'Chelsea', 'Premier League')])
+    conn.executemany('''
+        INSERT INTO matches (id, home_team_id, away_team_id, home_score, away_score, date, competition, season, api_fixture_id)
+        VALUES (?, 1, 2, 1, 0, ?, 'Premier League', '2023', ?)
+    ''', [(match_id, f'2023-08-{match_id:02d} 15:00:00', 1000 + match_id) for match_id in range(1, 4)])
+    conn.execute('INSERT INTO team_stats (team_id, match_id, possession, shots) VALUES (1, 1, 55.0, 12)')
+    conn.commit()
+    conn.close()
+    return path
+
+def test_legacy_database_is_upgraded_in_place(legacy_db):
+    db = Database(legacy_db)
+    conn = db.pool.reader()
+    
+    assert get_schema_version(conn) == SCHEMA_VERSION
+    assert conn.execute('SELECT id, date_ts FROM matches ORDER BY id').fetchall() == [
+        (match_id, to_epoch(f'2023-08-{match_id:02d} 15:00:00')) for match_id in range(1, 4)
+    ]
+    assert db.get_matches_without_statistics('Premier League', '2023') == [(2, 1002), (3, 1003)]
+    db.close()
+    
+    # Reopening applies nothing
+    db = Database(legacy_db)
+    assert get_schema_version(db.pool.reader()) == SCHEMA_VERSION
+    db.close()
+
+def test_hot_queries_use_indexes_after_an_upgrade(legacy_db):
+    db = Database(legacy_db)
+    conn = db.pool.reader()
+    
+    # The upgrade analyzed a few rows of one fixture, which makes scans look
+    # cheapest; the check must only report missing indexes
+    assert conn.execute('SELECT COUNT(*) FROM sqlite_stat1').fetchone()[0] > 0
+    assert find_table_scans(conn) == {}
+    
+    with db.pool.writer() as writer:
+        writer.execute('DROP INDEX idx_matches_competition_season')
+    assert set(find_table_scans(db.pool.reader())) == {'competition_teams', 'matches_without_statistics'}
+    db.close()
+
+def test_teams_stored_under_a_league_id_and_name_are_merged(tmp_path):
+    # What the first release stored: every club from the teams endpoint under
+    # its league id, again from fixtures under the league name, and statistics
+    # under whichever row the name lookup found first
+    path = str(tmp_path / 'legacy.db')
+    conn = sqlite3.connect(path)
+    conn.executescript(LEGACY_SCHEMA)
+    conn.executemany('INSERT INTO teams (id, name, league, country) VALUES (?, ?, ?, ?)', [
+        (1, 'Arsenal', '39', 'England'),
+        (2, 'Chelsea', '39', 'England'),
+        (3, 'Arsenal', 'Premier League', 'England'),
+        (4, 'Chelsea', 'Premier League', 'England'),
+        (5, 'Everton', 'Premier League', 'England'),
+        # Ambiguous, so left alone
+        (6, 'Liverpool', '39', 'England'),
+        (7, 'Liverpool', 'Premier League', 'England'),
+        (8, 'Liverpool', 'WSL', 'England')
+    ])
+    conn.executemany('''
+        INSERT INTO matches (id, home_team_id, away_team_id, home_score, away_score, date, competition, season, api_fixture_id)
+        VALUES (?, ?, ?, ?, ?, ?, 'Premier League', '2023', ?)
+    ''', [
+        (1, 3, 4, 2, 1, '2023-08-12 15:00:00', 1001),
+        (2, 4, 3, 0, 0, '2023-12-02 15:00:00', 1002),
+        # The same fixture stored again under another date format
+        (3, 4, 3, 0, 0, '2023-12-02T15:00:00', 1002),
+        (4, 5, 7, 1, 1, '2023-09-02 15:00:00', 1003)
+    ])
+    conn.executemany('INSERT INTO team_stats (team_id, match_id, shots) VALUES (?, ?, ?)', [
+        (1, 1, 14), (2, 1, 9), (1, 3, 11), (2, 3, 12), (5, 4, 8), (6, 4, 10)
+    ])
+    conn.commit()
+    conn.close()
+    
+    db = Database(path)
+    conn = db.pool.reader()
+    assert conn.execute('SELECT id, name, league FROM teams ORDER BY id').fetchall() == [
+        (1, 'Arsenal', '39'), (2, 'Chelsea', '39'), (5, 'Everton', 'Premier League'),
+        (6, 'Liverpool', '39'), (7, 'Liverpool', 'Premier League'), (8, 'Liverpool', 'WSL')
+    ]
+    assert conn.execute('''
+        SELECT api_fixture_id, home_team_id, away_team_id FROM matches ORDER BY api_fixture_id
+    ''').fetchall() == [(1001, 1, 2), (1002, 2, 1), (1003, 5, 7)]
+    
+    # Every statistics row now belongs to a team of its match
+    assert conn.execute('''
+        SELECT m.api_fixture_id, ts.team_id, ts.shots
+        FROM team_stats ts JOIN matches m ON m.id = ts.match_id
+        WHERE ts.team_id IN (m.home_team_id, m.away_team_id)
+        ORDER BY m.api_fixture_id, ts.team_id
+    ''').fetchall() == [(1001, 1, 14), (1001, 2, 9), (1002, 1, 11), (1002, 2, 12), (1003, 5, 8)]
+    assert [row[0] for row in db.get_team_matches_before(1, datetime(2024, 1, 1))] == [3, 1]
+    
+    # The teams endpoint, then fixtures, resolve to the kept rows and record their provider ids
+    assert db.insert_teams_bulk([{'name': 'Arsenal', 'league': '39', 'api_team_id': 42}]) == [1]
+    assert db.insert_teams_bulk([{'name': 'Arsenal', 'league': 'Premier League', 'api_team_id': 42}]) == [1]
+    db.close()
+    db = Database(path)
+    assert db.get_team_id_by_api_id(42) == 1
+    db.close()
+
+def test_duplicate_teams_are_merged_with_their_players(tmp_path):
+    path = str(tmp_path / 'data.db')
+    db = Database(path)
+    with db.pool.writer() as conn:
+        conn.executemany('INSERT INTO teams (id, name, league, api_team_id) VALUES (?, ?, ?, ?)', [
+            (1, 'Arsenal', '39', 42), (2, 'Arsenal', 'Premier League', None), (3, 'Chelsea', '39', 49)
+        ])
+        conn.executemany('''
+            INSERT INTO matches (id, home_team_id, away_team_id, home_score, away_score, date, date_ts, api_fixture_id)
+            VALUES (?, ?, 3, 1, 0, ?, ?, ?)
+        ''', [(1, 2, '2023-08-12 15:00:00', 1691852400, 1001), (2, 1, '2023-08-19 15:00:00', 1692457200, 1002)])
+        conn.executemany('INSERT INTO players (id, team_id, name) VALUES (?, ?, ?)',
+                         [(1, 1, 'Saka'), (2, 2, 'Saka'), (3, 2, 'Rice')])
+        conn.executemany('''
+            INSERT INTO player_stats (player_id, match_id, team_id, date_ts, goals) VALUES (?, ?, ?, ?, ?)
+        ''', [(2, 1, 2, 1691852400, 1), (3, 1, 2, 1691852400, 0), (1, 2, 1, 1692457200, 2)])
+        # Back to the version before the merge
+        conn.execute('PRAGMA user_version = 10')
+    db.close()
+    
+    db = Database(path)
+    conn = db.pool.reader()
+    assert get_schema_version(conn) == SCHEMA_VERSION
+    assert conn.execute('SELECT id, api_team_id FROM teams ORDER BY id').fetchall() == [(1, 42), (3, 49)]
+    assert db.get_squad(1) == [(3, 'Rice', None, None), (1, 'Saka', None, None)]
+    assert conn.execute('''
+        SELECT player_id, match_id, team_id, goals FROM player_stats ORDER BY match_id, player_id
+    ''').fetchall() == [(1, 1, 1, 1), (3, 1, 1, 0), (1, 2, 1, 2)]
+    assert conn.execute('SELECT home_team_id FROM matches ORDER BY id').fetchall() == [(1,), (1,)]
+    assert conn.execute('SELECT COUNT(*) FROM team_versions WHERE team_id = 2').fetchone()[0] == 0
+    db.close()
@@ -0,0 +1,111 @@
+"""Tests of the API-Football request pacing, run on a ``FakeClock``."""
+
+import random
+from src.data.ratelimit import FakeClock, RateLimiter, TokenBucket
+
+def test_bucket_allows_a_burst_then_paces():
+    clock = FakeClock()
+    bucket = TokenBucket(rate=1.0, capacity=3, clock=clock)
+    
+    assert [bucket.reserve() for _ in range(3)] == [0.0, 0.0, 0.0]
+    assert bucket.reserve() == 1.0
+    assert bucket.reserve() == 2.0
+    
+    # Refills continuously, never beyond capacity
+    clock.advance(100)
+    assert [bucket.reserve() for _ in range(4)] == [0.0, 0.0, 0.0, 1.0]
+
+def test_requests_are_paced_to_the_minute_limit():
+    clock = FakeClock()
+    limiter = RateLimiter(per_minute=10, daily_limit=100, clock=clock)
+    
+    for _ in range(10):
+        assert limiter.acquire()
+    assert clock.sleeps == []
+    
+    # One token every six seconds once the burst is spent
+    assert limiter.acquire() and limiter.acquire()
+    assert clock.sleeps == [6.0, 6.0]
+    assert clock.now() == 12.0
+
+def test_daily_budget_and_refunds():
+    clock = FakeClock()
+    limiter = RateLimiter(per_minute=10, daily_limit=2, clock=clock)
+    
+    assert limiter.acquire() and limiter.acquire()
+    assert not limiter.acquire()
+    
+    limiter.refund()
+    assert limiter.acquire()
+    assert not limiter.acquire()
+    
+    # Refunds never go past the daily limit
+    for _ in range(5):
+        limiter.refund()
+    assert limiter.daily_remaining == 2
+
+def test_seed_from_status():
+    limiter = RateLimiter(clock=FakeClock())
+    
+    assert limiter.seed_from_status({'response': {'requests': {'current': 30, 'limit_day': 7500}}})
+    assert (limiter.daily_limit, limiter.daily_remaining) == (7500, 7470)
+    
+    assert not limiter.seed_from_status({'response': {}})
+    assert not limiter.seed_from_status(None)
+    assert (limiter.daily_limit, limiter.daily_remaining) == (7500, 7470)
+
+def test_headers_update_the_limits():
+    clock = FakeClock()
+    limiter = RateLimiter(per_minute=10, daily_limit=100, clock=clock)
+    
+    limiter.update_from_headers({
+        'x-ratelimit-requests-limit': '7500',
+        'x-ratelimit-requests-remaining': '42',
+        'X-RateLimit-Limit': '30',
+        'X-RateLimit-Remaining': '0'
+    })
+    assert (limiter.daily_limit, limiter.daily_remaining) == (7500, 42)
+    assert limiter.minute_bucket.capacity == 30
+    
+    # The server says the minute is spent: wait for one token at 30 per minute
+    assert limiter.acquire()
+    assert clock.sleeps == [2.0]
+    assert limiter.daily_remaining == 41
+    
+    # Absent or malformed headers change nothing
+    limiter.update_from_headers({'x-ratelimit-requests-remaining': 'n/a'})
+    assert limiter.daily_remaining == 41
+
+def test_backoff_delay():
+    limiter = RateLimiter(clock=FakeClock(), base_backoff=1.0, max_backoff=8.0, rng=random.Random(0))
+    
+    assert limiter.backoff_delay(3, retry_after='17') == 17.0
+    assert limiter.backoff_delay(3, retry_after='-5') == 0.0
+    
+    # Full jitter within the capped exponential window
+    for attempt in range(10):
+        delays = [limiter.backoff_delay(attempt, retry_after='soon') for _ in range(50)]
+        assert all(0 <= delay <= min(8.0, 2 ** attempt) for delay in delays)
+    assert max(limiter.backoff_delay(9) for _ in range(50)) > 4.0
+
+def test_requests_in_flight_are_not_counted_twice():
+    limiter = RateLimiter(per_minute=100, daily_limit=10, clock=FakeClock())
+    for _ in range(3):
+        assert limiter.acquire()
+    assert limiter.daily_remaining == 7
+    
+    # The server counted one request; two more are still on their way
+    limiter.update_from_headers({'x-ratelimit-requests-remaining': '9'})
+    assert limiter.daily_remaining == 7
+    limiter.update_from_headers({'x-ratelimit-requests-remaining': '8'})
+    assert limiter.daily_remaining == 7
+    
+    # The last one never reached the API
+    limiter.refund()
+    assert limiter.daily_remaining == 8
+    
+    # A response overtaken by later ones reports a stale, higher count
+    assert limiter.acquire() and limiter.acquire()
+    limiter.update_from_headers({'x-ratelimit-requests-remaining': '6'})
+    limiter.update_from_headers({'x-ratelimit-requests-remaining': '7'})
+    assert limiter.daily_remaining == 6
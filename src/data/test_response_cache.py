@@ -0,0 +1,127 @@
+"""Tests of the on-disk API response cache and its expiry rules."""
+
+import os
+import pytest
+from src.data.response_cache import ResponseCache, request_key
+
+class Clock:
+    """Settable stand-in for ``time.time``."""
+    
+    def __init__(self, now=1000.0):
+        self.now = now
+    
+    def __call__(self):
+        return self.now
+
+@pytest.fixture
+def clock():
+    return Clock()
+
+@pytest.fixture
+def cache(tmp_path, clock):
+    return ResponseCache(root=str(tmp_path / 'api_cache'), clock=clock)
+
+def fixture_response(*statuses, statistics=({'team': {'id': 42}, 'statistics': []},)):
+    return {'errors': [], 'response': [
+        {'fixture': {'id': 1000 + i, 'status': {'short': status}}, 'statistics': list(statistics)}
+        for i, status in enumerate(statuses)
+    ]}
+
+def test_request_key_is_canonical():
+    assert request_key('/fixtures', {'league': 39, 'season': 2023}) == request_key('fixtures/', {'season': '2023', 'league': '39'})
+    assert request_key('fixtures', {'league': 39}) != request_key('fixtures', {'league': 40})
+    assert request_key('status') == request_key('status', {})
+
+def test_entries_expire_after_the_endpoint_ttl(cache, clock):
+    data = {'errors': [], 'response': [{'team': {'id': 42}}]}
+    cache.put('teams', {'league': 39}, data)
+    assert cache.get('teams', {'league': 39}) == data
+    assert cache.get('teams', {'league': 40}) is None
+    
+    clock.now += 24 * 3600 - 1
+    assert cache.get('teams', {'league': 39}) == data
+    clock.now += 1
+    assert cache.get('teams', {'league': 39}) is None
+
+def test_configured_ttls_override_the_defaults(tmp_path, clock):
+    cache = ResponseCache(root=str(tmp_path), ttls={'status': 5}, clock=clock)
+    cache.put('status', None, {'response': {'requests': {'current': 1}}})
+    
+    clock.now += 5
+    assert cache.get('status') is None
+
+def test_finished_fixtures_never_expire(cache, clock):
+    cache.put('fixtures', {'id': 1000}, fixture_response('FT'))
+    cache.put('fixtures', {'ids': '1000-1001'}, fixture_response('FT', 'PEN'))
+    cache.put('fixtures', {'ids': '1000-1001-1002'}, fixture_response('FT', 'AET', '2H'))
+    cache.put('fixtures', {'league': 39, 'season': 2023}, fixture_response('FT'))
+    cache.put('fixtures/statistics', {'fixture': 1000}, {'errors': [], 'response': [{'team': {'id': 42}}]})
+    
+    clock.now += 10 ** 8
+    assert cache.get('fixtures', {'id': 1000}) is not None
+    assert cache.get('fixtures', {'ids': '1000-1001'}) is not None
+    assert cache.get('fixtures/statistics', {'fixture': 1000}) is not None
+    
+    # A batch with a live fixture and a whole league's list can still change
+    assert cache.get('fixtures', {'ids': '1000-1001-1002'}) is None
+    assert cache.get('fixtures', {'league': 39, 'season': 2023}) is None
+
+def test_finished_fixtures_without_statistics_expire(cache, clock):
+    # Statistics are published some time after the final whistle
+    cache.put('fixtures', {'ids': '1000-1001'}, fixture_response('FT', 'FT', statistics=()))
+    cache.put('fixtures', {'id': 1000}, fixture_response('FT', statistics=()))
+    
+    clock.now += 3600
+    assert cache.get('fixtures', {'ids': '1000-1001'}) is None
+    assert cache.get('fixtures', {'id': 1000}) is None
+
+def test_empty_responses_expire(cache, clock):
+    cache.put('fixtures/statistics', {'fixture': 1000}, {'errors': [], 'response': []})
+    
+    clock.now += 3600
+    assert cache.get('fixtures/statistics', {'fixture': 1000}) is None
+
+def test_error_responses_are_not_stored(cache):
+    cache.put('fixtures', {'id': 1000}, {'errors': {'rateLimit': 'Too many requests'}, 'response': []})
+    assert cache.get('fixtures', {'id': 1000}) is None
+    assert cache.size() == 0
+
+def test_offline_mode_serves_expired_entries(tmp_path, clock):
+    ResponseCache(root=str(tmp_path), clock=clock).put('teams', {'league': 39}, {'response': [{'team': {'id': 42}}]})
+    clock.now += 10 ** 8
+    
+    assert ResponseCache(root=str(tmp_path), clock=clock).get('teams', {'league': 39}) is None
+    assert ResponseCache(root=str(tmp_path), offline=True, clock=clock).get('teams', {'league': 39}) is not None
+
+def test_unreadable_entries_are_dropped(cache):
+    cache.put('teams', {'league': 39}, {'response': [{'team': {'id': 42}}]})
+    path = cache.path(request_key('teams', {'league': 39}))
+    with open(path, 'wb') as f:
+        f.write(b'not gzip')
+        
+    assert cache.get('teams', {'league': 39}) is None
+    assert not os.path.exists(path)
+
+def test_least_recently_used_entries_are_evicted(cache):
+    paths = {}
+    for league_id in (39, 40, 41):
+        cache.put('teams', {'league': league_id}, {'response': [{'team': {'id': league_id}}]})
+        paths[league_id] = cache.path(request_key('teams', {'league': league_id}))
+        os.utime(paths[league_id], (league_id, league_id))
+    entry_size = max(os.path.getsize(path) for path in paths.values())
+    
+    # Reading league 39 makes league 40 the least recently used
+    assert cache.get('teams', {'league': 39}) is not None
+    cache.max_bytes = int(3.5 * entry_size)
+    cache.put('teams', {'league': 42}, {'response': [{'team': {'id': 42}}]})
+    
+    assert cache.get('teams', {'league': 40}) is None
+    assert all(cache.get('teams', {'league': league_id}) is not None for league_id in (39, 41, 42))
+    assert cache.size() <= cache.max_bytes
+
+def test_clear(cache):
+    cache.put('teams', {'league': 39}, {'response': [{'team': {'id': 42}}]})
+    cache.clear()
+    
+    assert cache.get('teams', {'league': 39}) is None
+    assert cache.size() == 0
@@ -0,0 +1,72 @@
+"""Tests of the value ranking of matches missing statistics."""
+
+import pytest
+from src.data.database import Database
+from src.data.scheduler import StatisticsScheduler
+
+DAY = 86400
+NOW = 1700000000
+
+@pytest.fixture
+def db():
+    """Store four teams' matches, only the newest of which has statistics.
+    
+    With a window of two, teams 1 and 2 have half of their window covered
+    and match 1 lies outside it; teams 3 and 4 have nothing covered.
+    Match 5 has no fixture id, so it can't be fetched.
+    """
+    db = Database(':memory:')
+    with db.pool.writer() as conn:
+        conn.executemany('INSERT INTO teams (id, name, league) VALUES (?, ?, ?)',
+                         [(team_id, f'Team {team_id}', 'Test League') for team_id in range(1, 5)])
+        conn.executemany('''
+            INSERT INTO matches (id, home_team_id, away_team_id, home_score, away_score, date_ts, season, api_fixture_id)
+            VALUES (?, ?, ?, 1, 0, ?, ?, ?)
+        ''', [
+            (1, 1, 2, NOW - 3 * DAY, '2023', 101),
+            (2, 1, 2, NOW - 2 * DAY, '2023', 102),
+            (3, 2, 1, NOW - 1 * DAY, '2023', 103),
+            (4, 3, 4, NOW - 400 * DAY, '2022', 104),
+            (5, 3, 4, NOW - 5 * DAY, '2023', None)
+        ])
+        conn.executemany('INSERT INTO team_stats (team_id, match_id, shots) VALUES (?, 3, 10)', [(1,), (2,)])
+    yield db
+    db.close()
+
+@pytest.fixture
+def scheduler(db):
+    return StatisticsScheduler(db, window=2, half_life_days=30, gap_weight=2.0, clock=lambda: NOW)
+
+def test_matches_are_ranked_by_recency_and_feature_window_gaps(scheduler):
+    ranked = scheduler.rank()
+    
+    # An old match filling two empty windows beats recent ones filling half-covered windows
+    assert [match['match_id'] for match in ranked] == [4, 2, 1]
+    assert [match['value'] for match in ranked] == pytest.approx([
+        0.5 ** (400 / 30) + 2 * 1.0 + 2 * 1.0,
+        0.5 ** (2 / 30) + 2 * 0.5 + 2 * 0.5,
+        0.5 ** (3 / 30)
+    ])
+    assert ranked[0]['season'] == '2022'
+
+def test_upcoming_fixtures_boost_their_teams(scheduler):
+    values = {match['match_id']: match['value'] for match in scheduler.rank(upcoming_team_ids={1})}
+    
+    assert values[2] == pytest.approx(0.5 ** (2 / 30) + 2 * 0.5 * 2 + 2 * 0.5)
+    # Outside the team's window, so not boosted
+    assert values[1] == pytest.approx(0.5 ** (3 / 30))
+
+def test_plans_are_limited_to_a_season(scheduler):
+    assert scheduler.plan(10, season=2023) == [(2, 102), (1, 101)]
+    assert scheduler.plan(10, season='2022') == [(4, 104)]
+    assert scheduler.plan(10, season=2021) == []
+
+def test_plans_fit_the_request_budget(scheduler):
+    assert scheduler.plan(0) == []
+    assert scheduler.plan(-3) == []
+    assert scheduler.plan(1) == [(4, 104)]
+    assert scheduler.plan(2) == [(4, 104), (2, 102)]
+    
+    # Grouped requests carry several fixtures each
+    assert scheduler.plan(1, fixtures_per_request=2) == [(4, 104), (2, 102)]
+    assert scheduler.plan(1, fixtures_per_request=20) == [(4, 104), (2, 102), (1, 101)]
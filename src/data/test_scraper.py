@@ -0,0 +1,68 @@
+"""Tests of the Fotmob scraper's storage path, fed with saved pages instead of the network."""
+
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import pytest
+from src.data.scraper import SoccerDataScraper
+from src.data.test_page_parsers import read_fixture
+
+MATCH_URL = 'https://www.fotmob.com/matches/arsenal-vs-nottingham-forest/2ytmxr#4193451'
+
+@pytest.fixture
+def scraper(tmp_path, monkeypatch):
+    # The scraper keeps data.db and its log in the working directory
+    monkeypatch.chdir(tmp_path)
+    scraper = SoccerDataScraper(browser_fallback=False)
+    pages = {MATCH_URL: read_fixture('fotmob_match_next_data.html')}
+    scraper.fetch_page = pages.get
+    yield scraper
+    scraper.close()
+
+@pytest.fixture
+def match_id(scraper):
+    arsenal, forest = scraper.db.insert_teams_bulk([
+        {'name': 'Arsenal', 'league': 'Premier League'},
+        {'name': 'Nottingham Forest', 'league': 'Premier League'}
+    ])
+    [match_id] = scraper.db.insert_matches_bulk([{
+        'home_team_id': arsenal,
+        'away_team_id': forest,
+        'home_score': 2,
+        'away_score': 1,
+        'date': datetime(2023, 8, 12, 12, 30),
+        'competition': 'Premier League',
+        'season': '2023'
+    }])
+    return match_id
+
+def test_match_details_workers_release_their_readers(scraper, match_id):
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        list(executor.map(scraper.scrape_match_details, [match_id, match_id + 1], [MATCH_URL, None]))
+        
+    reader = scraper.db.pool.reader()
+    assert reader.execute('SELECT COUNT(*) FROM team_stats WHERE match_id = ?', (match_id,)).fetchone()[0] == 2
+    assert reader.execute('SELECT COUNT(*) FROM player_stats WHERE match_id = ?', (match_id,)).fetchone()[0] == 2
+    
+    # Only this thread's reader is left open
+    assert scraper.db.pool._readers == [reader]
+
+def test_players_are_filed_under_the_match_teams(scraper, match_id):
+    # A same-named team elsewhere must not pick up the match's players
+    [womens_arsenal] = scraper.db.insert_teams_bulk([{'name': 'Arsenal', 'league': "Women's Super League"}])
+    row = {'position': None, 'minutes': 90, 'goals': 0, 'assists': 0, 'shots': 0,
+           'shots_on_target': 0, 'passes': 0, 'pass_accuracy': 0.0}
+    scraper.store_player_stats(match_id, [
+        {**row, 'name': 'Saka', 'team_name': 'Arsenal', 'goals': 1},
+        {**row, 'name': 'Wood', 'team_name': 'Nottingham Forest'},
+        {**row, 'name': 'Palmer', 'team_name': 'Chelsea'}
+    ])
+    
+    match_data = scraper.db.get_match_data(match_id)
+    assert [name for _, name, _, _ in scraper.db.get_squad(match_data['home_team_id'])] == ['Saka']
+    assert [name for _, name, _, _ in scraper.db.get_squad(match_data['away_team_id'])] == ['Wood']
+    assert scraper.db.get_squad(womens_arsenal) == []
+    assert scraper.db.pool.reader().execute('SELECT COUNT(*) FROM player_stats').fetchone()[0] == 2
+    
+    # Players of a match that isn't stored are skipped
+    scraper.store_player_stats(match_id + 1, [{**row, 'name': 'Rice', 'team_name': 'Arsenal'}])
+    assert scraper.db.pool.reader().execute('SELECT COUNT(*) FROM players').fetchone()[0] == 2
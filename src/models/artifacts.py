@@ -0,0 +1,91 @@
+"""Versioned on-disk registry of trained model artifacts."""
+
+import json
+import logging
+import os
+import shutil
+import tempfile
+from datetime import datetime
+import joblib
+
+# Bump when the layout of the saved bundle changes
+# 2: score_model is a ScoreModel instead of a scikit-learn regressor
+ARTIFACT_FORMAT_VERSION = 2
+
+MODEL_FILE = 'model.joblib'
+MANIFEST_FILE = 'manifest.json'
+
+class ModelRegistry:
+    """Numbered artifact directories (``v0001``, ``v0002``, ...) under one root.
+    
+    Each directory holds the pickled model bundle and a JSON manifest with
+    the format and feature schema versions it was trained with.
+    """
+    
+    def __init__(self, root='model_artifacts'):
+        """Use ``root`` as the registry directory, creating it on first save."""
+        self.root = root
+    
+    def versions(self):
+        """Return the stored artifact versions in ascending order."""
+        if not os.path.isdir(self.root):
+            return []
+        return sorted(
+            int(name[1:]) for name in os.listdir(self.root)
+            if name.startswith('v') and name[1:].isdigit()
+        )
+    
+    def path(self, version):
+        """Return the directory of an artifact version."""
+        return os.path.join(self.root, f'v{version:04d}')
+    
+    def manifest(self, version):
+        """Return the manifest of an artifact version."""
+        with open(os.path.join(self.path(version), MANIFEST_FILE)) as f:
+            return json.load(f)
+    
+    def save(self, bundle, metadata=None):
+        """Store a bundle as the next version and return that version.
+        
+        The bundle is written uncompressed so its NumPy arrays can later be
+        memory-mapped, and the directory only appears once fully written.
+        """
+        os.makedirs(self.root, exist_ok=True)
+        staging = tempfile.mkdtemp(dir=self.root, prefix='.staging-')
+        try:
+            joblib.dump(bundle, os.path.join(staging, MODEL_FILE))
+            
+            version = (self.versions() or [0])[-1] + 1
+            manifest = {
+                'version': version,
+                'format_version': ARTIFACT_FORMAT_VERSION,
+                'created_at': datetime.now().isoformat(),
+                **(metadata or {})
+            }
+            with open(os.path.join(staging, MANIFEST_FILE), 'w') as f:
+                json.dump(manifest, f, indent=2)
+                
+            os.rename(staging, self.path(version))
+            return version
+            
+        except Exception:
+            shutil.rmtree(staging, ignore_errors=True)
+            raise
+    
+    def latest_compatible(self, feature_schema_version):
+        """Return the newest version trained with the given feature schema, or None."""
+        for version in reversed(self.versions()):
+            try:
+                manifest = self.manifest(version)
+            except (OSError, ValueError) as e:
+                logging.warning(f"Skipping unreadable model artifact v{version}: {str(e)}")
+                continue
+                
+            if (manifest.get('format_version') == ARTIFACT_FORMAT_VERSION
+                    and manifest.get('feature_schema_version') == feature_schema_version):
+                return version
+        return None
+    
+    def load(self, version, mmap=True):
+        """Load the bundle of an artifact version, memory-mapping its arrays."""
+        return joblib.load(os.path.join(self.path(version), MODEL_FILE), mmap_mode='r' if mmap else None)
@@ -0,0 +1,131 @@
+"""Point-in-time team features computed over the whole match history at once."""
+
+import numpy as np
+import pandas as pd
+from src.models.ratings import INITIAL_RATING
+
+# Bump whenever the feature columns or their meaning change, so persisted
+# models trained on an older layout are not used with the new one
+FEATURE_SCHEMA_VERSION = 3
+
+DEFAULT_WINDOW = 5
+
+STAT_COLUMNS = ['possession', 'shots', 'shots_on_target', 'corners', 'fouls', 'won']
+TEAM_FEATURES = ['avg_possession', 'avg_shots', 'avg_shots_on_target', 'avg_corners', 'avg_fouls', 'win_rate']
+TEAM_COLUMNS = [f'home_{name}' for name in TEAM_FEATURES] + [f'away_{name}' for name in TEAM_FEATURES]
+RATING_COLUMNS = ['home_elo', 'away_elo']
+FEATURE_COLUMNS = TEAM_COLUMNS + RATING_COLUMNS
+
+# Sort key of a team's stat row: team ID in the high bits, epoch seconds in the low ones
+_TEAM_SHIFT = 34
+
+def load_team_history(conn):
+    """Load one row per team per match with statistics."""
+    return pd.read_sql_query('''
+        SELECT
+            ts.team_id,
+            m.date_ts,
+            ts.possession,
+            ts.shots,
+            ts.shots_on_target,
+            ts.corners,
+            ts.fouls,
+            CASE
+                WHEN m.home_team_id = ts.team_id AND m.home_score > m.away_score THEN 1
+                WHEN m.away_team_id = ts.team_id AND m.away_score > m.home_score THEN 1
+                ELSE 0
+            END as won
+        FROM team_stats ts
+        JOIN matches m ON ts.match_id = m.id
+        WHERE ts.team_id IS NOT NULL
+        AND m.date_ts IS NOT NULL
+    ''', conn)
+
+def load_matches(conn):
+    """Load every finished match with both teams' pre-match Elo ratings, newest first."""
+    return pd.read_sql_query('''
+        SELECT
+            m.id as match_id,
+            m.home_team_id,
+            m.away_team_id,
+            m.home_score,
+            m.away_score,
+            m.date_ts,
+            mr.home_rating as home_elo,
+            mr.away_rating as away_elo
+        FROM matches m
+        LEFT JOIN match_ratings mr ON mr.match_id = m.id
+        WHERE m.date_ts IS NOT NULL
+        AND m.home_team_id IS NOT NULL
+        AND m.away_team_id IS NOT NULL
+        AND m.home_score IS NOT NULL
+        AND m.away_score IS NOT NULL
+        ORDER BY m.date_ts DESC
+    ''', conn)
+
+class TeamHistory:
+    """Per-team prefix sums of match statistics, sorted by team and date.
+    
+    Averages over any team's last N matches before any time T are then two
+    binary searches and one subtraction, for all queries at once. Missing
+    statistics are left out of the averages, as SQL ``AVG()`` does for the
+    live features.
+    """
+    
+    def __init__(self, history):
+        """Index a frame shaped like ``load_team_history`` output."""
+        team_ids = history['team_id'].to_numpy(np.int64)
+        dates = history['date_ts'].to_numpy(np.int64)
+        order = np.lexsort((dates, team_ids))
+        
+        self.keys = (team_ids[order] << _TEAM_SHIFT) + dates[order]
+        values = history[STAT_COLUMNS].to_numpy(float)[order]
+        present = ~np.isnan(values)
+        self.cumsum = np.vstack([np.zeros((1, len(STAT_COLUMNS))), np.cumsum(np.where(present, values, 0), axis=0)])
+        self.cumcount = np.vstack([np.zeros((1, len(STAT_COLUMNS)), dtype=np.int64), np.cumsum(present, axis=0)])
+    
+    def rolling_means(self, team_ids, as_of, window=DEFAULT_WINDOW):
+        """Average each team's last ``window`` stat rows strictly before ``as_of``.
+        
+        Returns ``(means, counts)`` where ``counts`` is the number of rows
+        averaged; ``means`` is NaN where a team has no earlier rows or a
+        statistic is missing from all of them.
+        """
+        team_ids = np.asarray(team_ids, dtype=np.int64) << _TEAM_SHIFT
+        as_of = np.asarray(as_of, dtype=np.int64)
+        
+        start = np.searchsorted(self.keys, team_ids, side='left')
+        end = np.searchsorted(self.keys, team_ids + as_of, side='left')
+        counts = np.minimum(end - start, window)
+        
+        sums = self.cumsum[end] - self.cumsum[end - counts]
+        present = self.cumcount[end] - self.cumcount[end - counts]
+        with np.errstate(invalid='ignore', divide='ignore'):
+            means = np.where(present > 0, sums / present, np.nan)
+        return means, counts
+
+def build_training_frame(conn, window=DEFAULT_WINDOW):
+    """Build the feature matrix for every match from the matches before it.
+    
+    Returns one row per match with both teams' rolling averages over their
+    last ``window`` earlier matches and their Elo ratings going into it,
+    plus ids, scores and the outcome label. Matches where either team has
+    no earlier statistics, or lacks a statistic in all of them, are
+    dropped. Ratings come from ``match_ratings``, so sync the ratings store
+    first; unrated matches count as evenly rated.
+    """
+    matches = load_matches(conn)
+    history = TeamHistory(load_team_history(conn))
+    
+    home, home_counts = history.rolling_means(matches['home_team_id'], matches['date_ts'], window)
+    away, away_counts = history.rolling_means(matches['away_team_id'], matches['date_ts'], window)
+    
+    features = pd.DataFrame(np.hstack([home, away]), columns=TEAM_COLUMNS, index=matches.index)
+    matches = matches.fillna({column: INITIAL_RATING for column in RATING_COLUMNS})
+    frame = pd.concat([matches, features], axis=1)
+    frame['outcome'] = np.select(
+        [frame['home_score'] > frame['away_score'], frame['home_score'] < frame['away_score']],
+        ['H', 'A'],
+        'D'
+    )
+    return frame[(home_counts > 0) & (away_counts > 0) & features.notna().all(axis=1)].reset_index(drop=True)
@@ -2,17 +2,29 @@ import pandas as pd
 import numpy as np
 from sklearn.model_selection import train_test_split
 from sklearn.preprocessing import StandardScaler
-from sklearn.ensemble import RandomForestClassifier, GradientBoostingRegressor
+from sklearn.ensemble import RandomForestClassifier
 from sklearn.metrics import accuracy_score, mean_squared_error, classification_report
 import logging
 from src.data.database import Database
+from src.data.feature_cache import FeatureCache
+from src.data import queries
+from src.models.features import build_training_frame, load_matches, DEFAULT_WINDOW, FEATURE_COLUMNS, FEATURE_SCHEMA_VERSION, TEAM_FEATURES
+from src.models.artifacts import ModelRegistry
+from src.models.score_model import ScoreModel
+from src.models.ratings import RatingsStore
+from src.models.scorers import ScorerEngine
 
 class MatchPredictor:
-    def __init__(self):
+    def __init__(self, registry=None):
         """Initialize the predictor with necessary models and configurations"""
         self.db = Database()
+        self.registry = registry or ModelRegistry()
+        self.feature_cache = FeatureCache(self.db.pool)
+        self.scorers = ScorerEngine(self.db.pool)
+        self.ratings = RatingsStore(self.db.pool)
+        self.training_rows = 0
         self.outcome_model = RandomForestClassifier(n_estimators=100, random_state=42)
-        self.score_model = GradientBoostingRegressor(n_estimators=100, random_state=42)
+        self.score_model = ScoreModel()
         self.scaler = StandardScaler()
         self.setup_logging()
         
@@ -28,103 +40,88 @@ class MatchPredictor:
         )
         self.logger = logging.getLogger(__name__)
     
-    def get_team_features(self, team_id, last_n_matches=5):
+    def get_team_features(self, team_id, last_n_matches=DEFAULT_WINDOW):
         """Get team features from recent matches"""
-        query = '''
-            SELECT 
-                ts.possession,
-                ts.shots,
-                ts.shots_on_target,
-                ts.corners,
-                ts.fouls,
-                CASE 
-                    WHEN m.home_team_id = ? AND m.home_score > m.away_score THEN 1
-                    WHEN m.away_team_id = ? AND m.away_score > m.home_score THEN 1
-                    ELSE 0
-                END as won
-            FROM team_stats ts
-            JOIN matches m ON ts.match_id = m.id
-            WHERE ts.team_id = ?
-            ORDER BY m.date DESC
-            LIMIT ?
-        '''
-        self.db.cursor.execute(query, (team_id, team_id, team_id, last_n_matches))
-        results = self.db.cursor.fetchall()
-        
-        if not results:
-            return None
+        return self.get_teams_features([team_id], last_n_matches).get(team_id)
+    
+    def get_teams_features(self, team_ids, last_n_matches=DEFAULT_WINDOW):
+        """Get features for many teams from their recent matches in one query
+        
+        Returns a dict keyed by team ID; teams without statistics are absent.
+        Features are served from the feature cache until a write touches
+        the team.
+        """
+        features = self.feature_cache.get_many(
+            team_ids, last_n_matches, None,
+            lambda missing: self._query_teams_features(missing, last_n_matches)
+        )
+        return {team_id: value for team_id, value in features.items() if value is not None}
+    
+    def _query_teams_features(self, team_ids, last_n_matches):
+        """Average each team's recent statistics with one windowed query"""
+        query = queries.TEAM_FEATURES.format(placeholders=', '.join('?' * len(team_ids)))
+        cursor = self.db.pool.reader().execute(query, (*team_ids, last_n_matches))
         
-        # Calculate average stats
-        stats = np.array(results)
         return {
-            'avg_possession': np.mean(stats[:, 0]),
-            'avg_shots': np.mean(stats[:, 1]),
-            'avg_shots_on_target': np.mean(stats[:, 2]),
-            'avg_corners': np.mean(stats[:, 3]),
-            'avg_fouls': np.mean(stats[:, 4]),
-            'win_rate': np.mean(stats[:, 5])
+            row[0]: dict(zip(TEAM_FEATURES, row[1:]))
+            for row in cursor.fetchall()
         }
     
     def prepare_match_features(self, home_team_id, away_team_id):
         """Prepare features for a match prediction"""
-        home_features = self.get_team_features(home_team_id)
-        away_features = self.get_team_features(away_team_id)
+        features = self.prepare_matches_features([(home_team_id, away_team_id)])[0]
+        return None if features is None else features.reshape(1, -1)
+    
+    def prepare_matches_features(self, pairs, team_features=None, ratings=None):
+        """Prepare feature rows for many matches
         
-        if not home_features or not away_features:
-            return None
+        Returns a list aligned with ``pairs`` holding each match's feature
+        vector, or None where either team has no statistics or lacks one
+        in all of its recent matches. ``ratings``
+        maps team IDs to current Elo ratings and is read from the ratings
+        store when not given.
+        """
+        team_ids = [team_id for pair in pairs for team_id in pair]
+        if team_features is None:
+            team_features = self.get_teams_features(team_ids)
+        if ratings is None:
+            ratings = self.ratings.ratings_for(team_ids)
         
-        # Combine features
-        features = [
-            home_features['avg_possession'],
-            home_features['avg_shots'],
-            home_features['avg_shots_on_target'],
-            home_features['avg_corners'],
-            home_features['avg_fouls'],
-            home_features['win_rate'],
-            away_features['avg_possession'],
-            away_features['avg_shots'],
-            away_features['avg_shots_on_target'],
-            away_features['avg_corners'],
-            away_features['avg_fouls'],
-            away_features['win_rate']
-        ]
+        rows = []
+        for home_team_id, away_team_id in pairs:
+            home_features = team_features.get(home_team_id)
+            away_features = team_features.get(away_team_id)
+            
+            if not home_features or not away_features or None in (*home_features.values(), *away_features.values()):
+                rows.append(None)
+                continue
+            
+            # Combine features
+            rows.append(np.array(
+                [home_features[name] for name in TEAM_FEATURES] +
+                [away_features[name] for name in TEAM_FEATURES] +
+                [ratings[home_team_id], ratings[away_team_id]],
+                dtype=float
+            ))
         
-        return np.array(features).reshape(1, -1)
+        return rows
     
     def prepare_training_data(self):
-        """Prepare training data from historical matches"""
-        query = '''
-            SELECT 
-                m.id,
-                m.home_team_id,
-                m.away_team_id,
-                m.home_score,
-                m.away_score,
-                CASE 
-                    WHEN m.home_score > m.away_score THEN 'H'
-                    WHEN m.home_score < m.away_score THEN 'A'
-                    ELSE 'D'
-                END as outcome
-            FROM matches m
-            ORDER BY m.date DESC
-        '''
-        self.db.cursor.execute(query)
-        matches = self.db.cursor.fetchall()
-        
-        X = []  # Features
-        y_outcome = []  # Match outcomes
-        y_score = []  # Match scores
-        
-        for match in matches:
-            match_id, home_id, away_id, home_score, away_score, outcome = match
-            features = self.prepare_match_features(home_id, away_id)
-            
-            if features is not None:
-                X.append(features[0])
-                y_outcome.append(outcome)
-                y_score.append([home_score, away_score])
-        
-        return np.array(X), np.array(y_outcome), np.array(y_score)
+        """Prepare training data from historical matches
+        
+        Each match gets features from both teams' matches strictly before
+        it, computed for the whole history in one vectorized pass. Elo
+        ratings are brought up to date first so every match has the
+        ratings both teams took into it.
+        """
+        self.ratings.sync()
+        frame = build_training_frame(self.db.pool.reader(), window=DEFAULT_WINDOW)
+        
+        X = frame[FEATURE_COLUMNS].to_numpy()  # Features
+        y_outcome = frame['outcome'].to_numpy()  # Match outcomes
+        y_score = frame[['home_score', 'away_score']].to_numpy()  # Match scores
+        
+        return X, y_outcome, y_score
     
     def train(self):
         """Train the prediction models"""
@@ -135,6 +132,7 @@ class MatchPredictor:
             if len(X) == 0:
                 self.logger.error("No training data available")
                 return False
+            self.training_rows = len(X)
             
             # Split and scale data
             X_train, X_test, y_outcome_train, y_outcome_test, y_score_train, y_score_test = self.split_and_scale_data(X, y_outcome, y_score)
@@ -144,10 +142,11 @@ class MatchPredictor:
             outcome_pred = self.outcome_model.predict(X_test)
             outcome_accuracy = accuracy_score(y_outcome_test, outcome_pred)
             
-            # Train score model
-            self.score_model.fit(X_train, y_score_train)
-            score_pred = self.score_model.predict(X_test)
-            score_mse = mean_squared_error(y_score_test, score_pred)
+            # Check the score model on the newest matches, then fit it on all of them
+            matches = load_matches(self.db.pool.reader())
+            actual_scores, expected_scores = self.evaluate_score_model(matches)
+            score_mse = mean_squared_error(actual_scores, expected_scores)
+            self.fit_score_model(matches)
             
             self.logger.info(f"Model training completed:")
             self.logger.info(f"Outcome prediction accuracy: {outcome_accuracy:.2f}")
@@ -161,6 +160,32 @@ class MatchPredictor:
             self.logger.error(f"Error training models: {str(e)}")
             return False
     
+    def fit_score_model(self, matches=None):
+        """Fit the score model on every finished match"""
+        if matches is None:
+            matches = load_matches(self.db.pool.reader())
+        self.score_model.fit(
+            matches['home_team_id'], matches['away_team_id'],
+            matches['home_score'], matches['away_score'],
+            matches['date_ts']
+        )
+    
+    def evaluate_score_model(self, matches=None, test_size=0.2):
+        """Fit a fresh score model on older matches and predict the newest ``test_size`` share
+        
+        Returns ``(actual, expected)`` arrays of home and away goals for the
+        held-out matches.
+        """
+        if matches is None:
+            matches = load_matches(self.db.pool.reader())
+        held_out = max(1, int(len(matches) * test_size))
+        test, train = matches.iloc[:held_out], matches.iloc[held_out:]  # Newest first
+        
+        model = ScoreModel(self.score_model.max_goals, self.score_model.half_life_days, self.score_model.l2)
+        model.fit(train['home_team_id'], train['away_team_id'], train['home_score'], train['away_score'], train['date_ts'])
+        expected = np.column_stack(model.expected_goals(test['home_team_id'], test['away_team_id']))
+        return test[['home_score', 'away_score']].to_numpy(), expected
+    
     def split_and_scale_data(self, X, y_outcome, y_score):
         """Split and scale the training data"""
         # Split data
@@ -177,49 +202,225 @@ class MatchPredictor:
     def predict_match(self, home_team_id, away_team_id):
         """Predict the outcome and score of a match"""
         try:
-            # Prepare features
-            features = self.prepare_match_features(home_team_id, away_team_id)
-            
-            if features is None:
-                return None
+            return self.predict_matches([(home_team_id, away_team_id)])[0]
             
-            # Scale features
-            features_scaled = self.scaler.transform(features)
-            
-            # Make predictions
-            outcome_pred = self.outcome_model.predict(features_scaled)[0]
-            outcome_probs = self.outcome_model.predict_proba(features_scaled)[0]
-            score_pred = self.score_model.predict(features_scaled)[0]
-            
-            # Get team names
-            home_team = self.get_team_name(home_team_id)
-            away_team = self.get_team_name(away_team_id)
-            
-            return {
-                'home_team': home_team,
-                'away_team': away_team,
-                'predicted_outcome': outcome_pred,
+        except Exception as e:
+            self.logger.error(f"Error making prediction: {str(e)}")
+            return None
+    
+    def predict_matches(self, pairs):
+        """Predict the outcome and score of many matches at once
+        
+        Features come from one query, each model runs once over the whole
+        feature matrix and team names are resolved in one query. Returns a
+        list aligned with ``pairs``; entries are None for matches without
+        enough data or with a missing team ID.
+        """
+        pairs = [
+            (int(home_team_id), int(away_team_id)) if home_team_id is not None and away_team_id is not None else None
+            for home_team_id, away_team_id in pairs
+        ]
+        valid = [i for i, pair in enumerate(pairs) if pair is not None]
+        team_ids = [team_id for i in valid for team_id in pairs[i]]
+        
+        # Prepare features
+        ratings = self.ratings.ratings_for(team_ids)
+        features = [None] * len(pairs)
+        valid_features = self.prepare_matches_features([pairs[i] for i in valid], self.get_teams_features(team_ids), ratings)
+        for i, row in zip(valid, valid_features):
+            features[i] = row
+        rows = [i for i, row in enumerate(features) if row is not None]
+        predictions = [None] * len(pairs)
+        if not rows:
+            return predictions
+        
+        # Scale features
+        features_scaled = self.scaler.transform(np.vstack([features[i] for i in rows]))
+        
+        # Make predictions
+        outcome_probs = self.outcome_model.predict_proba(features_scaled)
+        home_ids = [pairs[i][0] for i in rows]
+        away_ids = [pairs[i][1] for i in rows]
+        scores = self.score_model.most_likely_scores(self.score_model.score_matrix(home_ids, away_ids))
+        classes = list(self.outcome_model.classes_)
+        
+        # Get team names
+        team_names = self.get_team_names(team_ids)
+        
+        for row, i in enumerate(rows):
+            home_team_id, away_team_id = pairs[i]
+            probs = outcome_probs[row]
+            # Outcomes missing from the training data get no probability
+            by_class = dict(zip(classes, probs))
+            predictions[i] = {
+                'home_team': team_names.get(home_team_id),
+                'away_team': team_names.get(away_team_id),
+                'predicted_outcome': classes[int(np.argmax(probs))],
                 'outcome_probabilities': {
-                    'home_win': outcome_probs[0],
-                    'draw': outcome_probs[1],
-                    'away_win': outcome_probs[2]
+                    'home_win': float(by_class.get('H', 0.0)),
+                    'draw': float(by_class.get('D', 0.0)),
+                    'away_win': float(by_class.get('A', 0.0))
                 },
                 'predicted_score': {
-                    'home': round(score_pred[0]),
-                    'away': round(score_pred[1])
+                    'home': int(scores[row][0]),
+                    'away': int(scores[row][1])
+                },
+                'ratings': {
+                    'home': ratings[home_team_id],
+                    'away': ratings[away_team_id]
                 }
             }
+        
+        return predictions
+    
+    def predict_score(self, home_team_id, away_team_id):
+        """Predict the scoreline distribution of a match"""
+        try:
+            return self.predict_scores([(home_team_id, away_team_id)])[0]
+            
+        except Exception as e:
+            self.logger.error(f"Error predicting score: {str(e)}")
+            return None
+    
+    def predict_scores(self, pairs):
+        """Predict the scoreline distributions of many matches in one batched call
+        
+        Each prediction holds both sides' expected goals, the likeliest
+        score, the outcome probabilities derived from the score matrix and
+        the matrix itself, where ``score_probabilities[h][a]`` is the chance
+        of an ``h``-``a`` result. Entries are None for matches with a team
+        the score model has no results for.
+        """
+        pairs = [(int(home_team_id), int(away_team_id)) for home_team_id, away_team_id in pairs]
+        predictions = [None] * len(pairs)
+        if not pairs:
+            return predictions
+        home_ids = np.array([pair[0] for pair in pairs])
+        away_ids = np.array([pair[1] for pair in pairs])
+        
+        known = self.score_model.knows(home_ids) & self.score_model.knows(away_ids)
+        rows = np.flatnonzero(known)
+        if not len(rows):
+            return predictions
+        
+        matrix = self.score_model.score_matrix(home_ids[rows], away_ids[rows])
+        home_goals, away_goals = self.score_model.expected_goals(home_ids[rows], away_ids[rows])
+        outcomes = self.score_model.outcome_probabilities(matrix)
+        scores = self.score_model.most_likely_scores(matrix)
+        team_names = self.get_team_names([team_id for pair in pairs for team_id in pair])
+        
+        for row, i in enumerate(rows):
+            home_team_id, away_team_id = pairs[i]
+            predictions[i] = {
+                'home_team': team_names.get(home_team_id),
+                'away_team': team_names.get(away_team_id),
+                'expected_goals': {
+                    'home': float(home_goals[row]),
+                    'away': float(away_goals[row])
+                },
+                'predicted_score': {
+                    'home': int(scores[row][0]),
+                    'away': int(scores[row][1])
+                },
+                'outcome_probabilities': {
+                    'home_win': float(outcomes[row][0]),
+                    'draw': float(outcomes[row][1]),
+                    'away_win': float(outcomes[row][2])
+                },
+                'score_probabilities': matrix[row].tolist()
+            }
+        
+        return predictions
+    
+    def predict_scorers(self, home_team_id, away_team_id, limit=10):
+        """Predict each player's chance to score at any time in a match
+        
+        Both squads are scored from the precomputed scorer table without
+        per-player queries, sharing out the goals the score model expects
+        each side to score. Returns the ``limit`` likeliest scorers of each
+        side, or None when neither team has player statistics.
+        """
+        try:
+            home_team_id, away_team_id = int(home_team_id), int(away_team_id)
+            home_goals = away_goals = None
+            if self.score_model.knows([home_team_id, away_team_id]).all():
+                home_goals, away_goals = (float(goals[0]) for goals in self.score_model.expected_goals([home_team_id], [away_team_id]))
+            home_scorers, away_scorers = self.scorers.predict(home_team_id, away_team_id, home_goals, away_goals, limit)
+            if not home_scorers and not away_scorers:
+                return None
+            
+            team_names = self.get_team_names([home_team_id, away_team_id])
+            return {
+                'home_team': team_names.get(home_team_id),
+                'away_team': team_names.get(away_team_id),
+                'home_scorers': home_scorers,
+                'away_scorers': away_scorers
+            }
             
         except Exception as e:
-            self.logger.error(f"Error making prediction: {str(e)}")
+            self.logger.error(f"Error predicting scorers: {str(e)}")
             return None
     
+    def save(self):
+        """Persist the fitted models as a new artifact version and return it"""
+        version = self.registry.save(
+            {
+                'outcome_model': self.outcome_model,
+                'score_model': self.score_model,
+                'scaler': self.scaler
+            },
+            {
+                'feature_schema_version': FEATURE_SCHEMA_VERSION,
+                'feature_columns': FEATURE_COLUMNS,
+                'training_rows': self.training_rows
+            }
+        )
+        self.logger.info(f"Saved model artifact v{version} to {self.registry.root}")
+        return version
+    
+    def load(self, version=None):
+        """Load the newest artifact compatible with the current features
+        
+        Returns False when no compatible artifact exists, so callers can
+        fall back to training.
+        """
+        try:
+            if version is None:
+                version = self.registry.latest_compatible(FEATURE_SCHEMA_VERSION)
+            if version is None:
+                self.logger.info("No compatible model artifact found")
+                return False
+            
+            bundle = self.registry.load(version)
+            self.outcome_model = bundle['outcome_model']
+            self.score_model = bundle['score_model']
+            self.scaler = bundle['scaler']
+            self.training_rows = self.registry.manifest(version).get('training_rows', 0)
+            
+            self.logger.info(f"Loaded model artifact v{version} from {self.registry.root}")
+            return True
+            
+        except Exception as e:
+            self.logger.error(f"Error loading model artifact: {str(e)}")
+            return False
+    
     def get_team_name(self, team_id):
         """Get team name from ID"""
-        self.db.cursor.execute('SELECT name FROM teams WHERE id = ?', (team_id,))
-        result = self.db.cursor.fetchone()
+        cursor = self.db.pool.reader().execute('SELECT name FROM teams WHERE id = ?', (team_id,))
+        result = cursor.fetchone()
         return result[0] if result else None
     
+    def get_team_names(self, team_ids):
+        """Get names for many team IDs in one query"""
+        team_ids = list(dict.fromkeys(team_ids))
+        if not team_ids:
+            return {}
+        cursor = self.db.pool.reader().execute(
+            f"SELECT id, name FROM teams WHERE id IN ({', '.join('?' * len(team_ids))})",
+            team_ids
+        )
+        return dict(cursor.fetchall())
+    
     def close(self):
         """Clean up resources"""
         self.db.close() 
\ No newline at end of file
@@ -0,0 +1,279 @@
+"""Elo team ratings maintained incrementally over the match stream."""
+
+import json
+import logging
+import sqlite3
+import threading
+from collections import Counter
+
+INITIAL_RATING = 1500.0
+
+# Rating points a match moves at most, before goal-difference scaling
+K_FACTOR = 20.0
+
+# Rating points the home side is worth on top of its rating
+HOME_ADVANTAGE = 65.0
+
+# Share of draws between evenly matched sides
+DRAW_RATE = 0.26
+
+def goal_difference_multiplier(goal_difference):
+    """Scale wins by margin like the World Football Elo ratings: 1, 1.5, then (11 + N) / 8."""
+    margin = abs(goal_difference)
+    if margin <= 1:
+        return 1.0
+    if margin == 2:
+        return 1.5
+    return (11 + margin) / 8
+
+def expected_score(rating_difference):
+    """Return the expected score (win 1, draw 0.5) of a side ``rating_difference`` points stronger."""
+    return 1 / (1 + 10 ** (-rating_difference / 400))
+
+class EloRatings:
+    """In-memory Elo ratings; each match is one O(1) update of two teams."""
+    
+    def __init__(self, k=K_FACTOR, home_advantage=HOME_ADVANTAGE, initial=INITIAL_RATING, ratings=None):
+        """Start every unseen team at ``initial``."""
+        self.k = k
+        self.home_advantage = home_advantage
+        self.initial = initial
+        self.ratings = dict(ratings or {})
+    
+    @property
+    def params(self):
+        """The settings ratings depend on; stored ratings are only valid for the same ones."""
+        return {'k': self.k, 'home_advantage': self.home_advantage, 'initial': self.initial}
+    
+    def rating(self, team_id):
+        return self.ratings.get(team_id, self.initial)
+    
+    def update(self, home_team_id, away_team_id, home_score, away_score):
+        """Apply a result and return both teams' ratings from before it."""
+        home_rating = self.rating(home_team_id)
+        away_rating = self.rating(away_team_id)
+        
+        expected = expected_score(home_rating + self.home_advantage - away_rating)
+        actual = 1.0 if home_score > away_score else 0.5 if home_score == away_score else 0.0
+        change = self.k * goal_difference_multiplier(home_score - away_score) * (actual - expected)
+        
+        self.ratings[home_team_id] = home_rating + change
+        self.ratings[away_team_id] = away_rating - change
+        return home_rating, away_rating
+    
+    def probabilities(self, home_rating, away_rating, draw_rate=DRAW_RATE):
+        """Return ``(home_win, draw, away_win)`` probabilities for a fixture.
+        
+        Draws take ``draw_rate`` between equal sides, shrinking as the
+        expected score moves away from 0.5; the rest of the expected score
+        is split into wins so it is preserved.
+        """
+        expected = expected_score(home_rating + self.home_advantage - away_rating)
+        draw = draw_rate * (1 - abs(2 * expected - 1))
+        return expected - draw / 2, draw, 1 - expected - draw / 2
+
+class RatingsStore:
+    """Elo ratings persisted in the database and brought up to date incrementally.
+    
+    ``team_ratings`` holds each team's current rating, ``match_ratings``
+    both teams' ratings going into every rated match (point-in-time
+    features) and ``ratings_state`` the ID of the newest match applied.
+    ``sync`` applies only matches inserted since, in date order, at O(1)
+    per match; when nothing changed it costs one lookup of the largest
+    match ID. When rated matches are updated or deleted, or a match
+    arrives dated before ones already rated, ratings are rewound to just
+    before the earliest affected date and replayed from there, so they
+    always follow date order. ``rebuild`` replays the whole history, and
+    runs by itself when the Elo settings change.
+    """
+    
+    def __init__(self, pool, engine=None):
+        """Keep the ratings of the database behind ``pool``."""
+        self.pool = pool
+        self.engine = engine or EloRatings()
+        self._last_match_id = None
+        self._revision = None
+        self._lock = threading.Lock()
+    
+    def _matches(self, conn, after_id=0, since_ts=None):
+        """Return rateable matches after ``after_id``, or from ``since_ts`` on, in date order."""
+        condition, value = ('id > ?', after_id) if since_ts is None else ('date_ts >= ?', since_ts)
+        return conn.execute(f'''
+            SELECT id, date_ts, home_team_id, away_team_id, home_score, away_score
+            FROM matches
+            WHERE {condition}
+            AND date_ts IS NOT NULL
+            AND home_team_id IS NOT NULL
+            AND away_team_id IS NOT NULL
+            AND home_score IS NOT NULL
+            AND away_score IS NOT NULL
+            ORDER BY date_ts, id
+        ''', (value,)).fetchall()
+    
+    def _apply(self, conn, matches, last_match_id):
+        """Rate ``matches`` in order and store the touched teams and the new mark."""
+        match_rows = []
+        played = Counter()
+        for match_id, date_ts, home_team_id, away_team_id, home_score, away_score in matches:
+            home_rating, away_rating = self.engine.update(home_team_id, away_team_id, home_score, away_score)
+            match_rows.append((match_id, home_team_id, away_team_id, date_ts, home_rating, away_rating))
+            played.update((home_team_id, away_team_id))
+        last_match_id = max([last_match_id] + [match[0] for match in matches])
+        
+        conn.executemany('''
+            INSERT OR REPLACE INTO match_ratings (match_id, home_team_id, away_team_id, date_ts, home_rating, away_rating)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', match_rows)
+        conn.executemany('''
+            INSERT INTO team_ratings (team_id, rating, matches)
+            VALUES (?, ?, ?)
+            ON CONFLICT (team_id) DO UPDATE SET
+                rating = excluded.rating,
+                matches = matches + excluded.matches
+        ''', [(team_id, self.engine.rating(team_id), count) for team_id, count in played.items()])
+        conn.execute('''
+            INSERT INTO ratings_state (id, last_match_id, params, updated_at, dirty_ts, revision)
+            VALUES (1, ?, ?, strftime('%s', 'now'), NULL, 1)
+            ON CONFLICT (id) DO UPDATE SET
+                last_match_id = excluded.last_match_id,
+                params = excluded.params,
+                updated_at = excluded.updated_at,
+                dirty_ts = NULL,
+                revision = revision + 1
+        ''', (last_match_id, json.dumps(self.engine.params, sort_keys=True)))
+        self._revision = conn.execute('SELECT revision FROM ratings_state WHERE id = 1').fetchone()[0]
+        return last_match_id
+    
+    def _rewind(self, conn, since_ts):
+        """Restore every team's rating from before ``since_ts`` and forget the matches rated since."""
+        rated = conn.execute('''
+            SELECT home_team_id, away_team_id, home_rating, away_rating
+            FROM match_ratings
+            WHERE date_ts >= ?
+            ORDER BY date_ts DESC, match_id DESC
+        ''', (since_ts,)).fetchall()
+        
+        # Walking back in time, each team ends at its rating going into its first match since
+        unplayed = Counter()
+        for home_team_id, away_team_id, home_rating, away_rating in rated:
+            self.engine.ratings[home_team_id] = home_rating
+            self.engine.ratings[away_team_id] = away_rating
+            unplayed.update((home_team_id, away_team_id))
+            
+        conn.execute('DELETE FROM match_ratings WHERE date_ts >= ?', (since_ts,))
+        conn.executemany(
+            'UPDATE team_ratings SET rating = ?, matches = matches - ? WHERE team_id = ?',
+            [(self.engine.rating(team_id), count, team_id) for team_id, count in unplayed.items()]
+        )
+        logging.info(f"Rewound Elo ratings of {len(rated)} matches from {since_ts}")
+    
+    def _reset(self, conn):
+        self.engine.ratings = {}
+        conn.execute('DELETE FROM match_ratings')
+        conn.execute('DELETE FROM team_ratings')
+    
+    def rebuild(self):
+        """Replay every match in date order, replacing the stored ratings."""
+        try:
+            with self._lock, self.pool.writer() as conn:
+                self._reset(conn)
+                self._last_match_id = self._apply(conn, self._matches(conn), 0)
+                logging.info(f"Rebuilt Elo ratings up to match {self._last_match_id}")
+                
+        except sqlite3.Error as e:
+            logging.error(f"Database error rebuilding ratings: {str(e)}")
+            raise
+    
+    def sync(self):
+        """Apply matches inserted or changed since the last sync and return how many were rated."""
+        try:
+            newest, dirty_ts, revision = self.pool.reader().execute('''
+                SELECT
+                    (SELECT MAX(id) FROM matches),
+                    (SELECT dirty_ts FROM ratings_state WHERE id = 1),
+                    (SELECT revision FROM ratings_state WHERE id = 1)
+            ''').fetchone()
+            if (self._last_match_id is not None and (newest or 0) <= self._last_match_id
+                    and dirty_ts is None and revision == self._revision):
+                return 0
+                
+            with self._lock, self.pool.writer() as conn:
+                state = conn.execute(
+                    'SELECT last_match_id, params, dirty_ts, revision FROM ratings_state WHERE id = 1'
+                ).fetchone()
+                if state is None or json.loads(state[1]) != self.engine.params:
+                    # No ratings yet, or ones computed with other settings
+                    self._reset(conn)
+                    after, since_ts = 0, None
+                else:
+                    after, _, since_ts, revision = state
+                    # Another process may have rated matches since we last looked
+                    if revision != self._revision:
+                        self.engine.ratings = dict(conn.execute('SELECT team_id, rating FROM team_ratings').fetchall())
+                        self._revision = revision
+                        
+                matches = self._matches(conn, after)
+                if matches and after:
+                    # New matches dated before rated ones are replayed in date order with them
+                    rated_ts = conn.execute('SELECT MAX(date_ts) FROM match_ratings').fetchone()[0]
+                    earliest = matches[0][1]
+                    if since_ts is not None or (rated_ts is not None and earliest < rated_ts):
+                        since_ts = earliest if since_ts is None else min(since_ts, earliest)
+                        
+                if since_ts is not None:
+                    self._rewind(conn, since_ts)
+                    matches = self._matches(conn, since_ts=since_ts)
+                elif not matches and after:
+                    # Caught up with ratings another process stored; nothing to write
+                    self._last_match_id = after
+                    return 0
+                self._last_match_id = self._apply(conn, matches, after)
+                return len(matches)
+                
+        except sqlite3.Error as e:
+            logging.error(f"Database error updating ratings: {str(e)}")
+            raise
+    
+    def ratings_for(self, team_ids):
+        """Return ``{team_id: rating}`` with current ratings, unseen teams at the initial rating."""
+        self.sync()
+        with self._lock:
+            return {team_id: self.engine.rating(team_id) for team_id in team_ids}
+
+class RatingsPredictor:
+    """Standalone outcome predictor answering from the current Elo ratings alone.
+    
+    Needs no trained model or team statistics: one sync, then arithmetic
+    per fixture.
+    """
+    
+    def __init__(self, db, draw_rate=DRAW_RATE, store=None):
+        """Predict from ratings kept in ``db``, or from an existing ``store`` of them."""
+        self.store = store or RatingsStore(db.pool)
+        self.draw_rate = draw_rate
+    
+    def predict_matches(self, pairs):
+        """Return outcome probabilities and ratings for each ``(home_team_id, away_team_id)``."""
+        pairs = [(int(home_team_id), int(away_team_id)) for home_team_id, away_team_id in pairs]
+        ratings = self.store.ratings_for([team_id for pair in pairs for team_id in pair])
+        
+        predictions = []
+        for home_team_id, away_team_id in pairs:
+            home_win, draw, away_win = self.store.engine.probabilities(
+                ratings[home_team_id], ratings[away_team_id], self.draw_rate
+            )
+            predictions.append({
+                'home_rating': ratings[home_team_id],
+                'away_rating': ratings[away_team_id],
+                'predicted_outcome': max(zip((home_win, draw, away_win), 'HDA'))[1],
+                'outcome_probabilities': {
+                    'home_win': home_win,
+                    'draw': draw,
+                    'away_win': away_win
+                }
+            })
+        return predictions
+    
+    def predict_match(self, home_team_id, away_team_id):
+        """Predict one match from the current ratings."""
+        return self.predict_matches([(home_team_id, away_team_id)])[0]
@@ -0,0 +1,189 @@
+"""Anytime goal-scorer probabilities from array-backed per-player scoring rates."""
+
+import threading
+import numpy as np
+import pandas as pd
+
+# Appearances a player's scoring and shooting rates are taken over
+RATE_WINDOW = 20
+
+# Team matches a player's expected minutes are taken over
+MINUTES_WINDOW = 5
+
+# Minutes of league-average scoring every player's rate starts from
+PRIOR_MINUTES = 270
+
+# Weight of shot share against goal rate when sharing out a team's goals
+SHOT_SHARE_WEIGHT = 0.5
+
+def load_player_history(conn):
+    """Load one row per player appearance, with the player's name and position."""
+    return pd.read_sql_query('''
+        SELECT
+            ps.player_id,
+            ps.team_id,
+            ps.match_id,
+            ps.date_ts,
+            ps.minutes,
+            ps.goals,
+            ps.shots,
+            p.name,
+            p.position
+        FROM player_stats ps
+        JOIN players p ON p.id = ps.player_id
+        WHERE ps.date_ts IS NOT NULL
+    ''', conn)
+
+def _recent(frame, key, window):
+    """Flag each row among the ``window`` newest rows of its ``key`` group."""
+    return frame.groupby(key)['date_ts'].rank(method='first', ascending=False) <= window
+
+class ScorerTable:
+    """Per-player scoring rates as parallel arrays, grouped by team.
+    
+    Built once from the appearance history: each player gets a shrunk goals
+    per 90, a share of their team's shots and the share of recent team
+    minutes they played. A squad is a contiguous slice of the arrays, so
+    scoring it is a handful of vectorized operations with no queries.
+    """
+    
+    def __init__(self, history, rate_window=RATE_WINDOW, minutes_window=MINUTES_WINDOW, prior_minutes=PRIOR_MINUTES):
+        """Index a frame shaped like ``load_player_history`` output."""
+        history = history.fillna({'minutes': 0, 'goals': 0, 'shots': 0})
+        
+        # Team shots per match, so each appearance knows the shots it competed for
+        team_shots = history.groupby(['team_id', 'match_id'])['shots'].transform('sum')
+        history = history.assign(team_shots=team_shots)
+        
+        # Scoring and shooting rates over each player's latest appearances
+        rated = history[_recent(history, 'player_id', rate_window)]
+        players = rated.groupby('player_id').agg(
+            team_id=('team_id', 'last'),
+            name=('name', 'last'),
+            position=('position', 'last'),
+            minutes=('minutes', 'sum'),
+            goals=('goals', 'sum'),
+            shots=('shots', 'sum'),
+            team_shots=('team_shots', 'sum')
+        )
+        
+        # Minutes over each team's latest matches; players who left get none
+        team_matches = history[['team_id', 'match_id', 'date_ts']].drop_duplicates()
+        team_matches = team_matches[_recent(team_matches, 'team_id', minutes_window)]
+        recent = history.merge(team_matches[['team_id', 'match_id']], on=['team_id', 'match_id'])
+        recent_minutes = recent.groupby(['player_id', 'team_id'])['minutes'].sum()
+        matches_played = team_matches.groupby('team_id').size()
+        players['recent_minutes'] = recent_minutes.reindex(
+            pd.MultiIndex.from_arrays([players.index, players['team_id']]), fill_value=0
+        ).to_numpy()
+        players = players[players['recent_minutes'] > 0].sort_values(['team_id', 'recent_minutes'], ascending=[True, False])
+        
+        total_minutes = players['minutes'].sum()
+        league_rate = 90 * players['goals'].sum() / total_minutes if total_minutes else 0.0
+        
+        self.player_ids = players.index.to_numpy(np.int64)
+        self.team_ids = players['team_id'].to_numpy(np.int64)
+        self.names = players['name'].to_numpy(object)
+        self.positions = players['position'].to_numpy(object)
+        self.goals_per_90 = (
+            (players['goals'].to_numpy(float) + league_rate * prior_minutes / 90)
+            / ((players['minutes'].to_numpy(float) + prior_minutes) / 90)
+        )
+        with np.errstate(invalid='ignore', divide='ignore'):
+            self.shot_share = np.nan_to_num(players['shots'].to_numpy(float) / players['team_shots'].to_numpy(float))
+        self.minutes_share = np.clip(
+            players['recent_minutes'].to_numpy(float)
+            / (90 * matches_played.reindex(self.team_ids).to_numpy(float)),
+            0, 1
+        )
+        
+        # Squads as [start, end) offsets into the arrays
+        teams, starts = np.unique(self.team_ids, return_index=True)
+        ends = np.append(starts[1:], len(self.team_ids))
+        self.squads = {int(team_id): (int(start), int(end)) for team_id, start, end in zip(teams, starts, ends)}
+    
+    def expected_goals(self, team_id, team_goals=None, shot_share_weight=SHOT_SHARE_WEIGHT):
+        """Return ``(slice, goals)``: the squad's offsets and each player's expected goals.
+        
+        Without ``team_goals`` the team is expected to score what its
+        players' rates add up to; with it, those goals are shared out by a
+        blend of goal rate and shot share, both weighted by expected minutes.
+        """
+        start, end = self.squads.get(int(team_id), (0, 0))
+        squad = slice(start, end)
+        minutes = self.minutes_share[squad]
+        by_rate = self.goals_per_90[squad] * minutes
+        if end == start:
+            return squad, by_rate
+            
+        if team_goals is None:
+            team_goals = by_rate.sum()
+        by_shots = self.shot_share[squad] * minutes
+        rate_weights = by_rate / by_rate.sum() if by_rate.sum() > 0 else minutes / minutes.sum()
+        shot_weights = by_shots / by_shots.sum() if by_shots.sum() > 0 else rate_weights
+        return squad, team_goals * (shot_share_weight * shot_weights + (1 - shot_share_weight) * rate_weights)
+    
+    def probabilities(self, team_id, team_goals=None, limit=None):
+        """Return the squad's anytime-scorer probabilities as dicts, most likely first."""
+        squad, goals = self.expected_goals(team_id, team_goals)
+        probabilities = -np.expm1(-goals)  # Poisson P(at least one goal)
+        order = np.argsort(-probabilities, kind='stable')[:limit]
+        
+        player_ids = self.player_ids[squad]
+        names = self.names[squad]
+        positions = self.positions[squad]
+        return [
+            {
+                'player_id': int(player_ids[i]),
+                'name': names[i],
+                'position': positions[i],
+                'expected_goals': float(goals[i]),
+                'probability': float(probabilities[i])
+            }
+            for i in order
+        ]
+
+class ScorerEngine:
+    """Serve scorer probabilities from a ``ScorerTable``, rebuilt when player data changes.
+    
+    Like ``FeatureCache`` it only looks at the tables after ``PRAGMA
+    data_version`` shows another connection committed, and then only
+    rebuilds if the trigger-maintained ``table_versions`` of
+    ``player_stats`` or ``players`` moved (see migration 10).
+    """
+    
+    def __init__(self, pool, **table_options):
+        """Build tables from the appearances read through ``pool``."""
+        self.pool = pool
+        self.table_options = table_options
+        self._table = None
+        self._stamp = None
+        self._lock = threading.Lock()
+        self._local = threading.local()
+    
+    def table(self):
+        """Return a table reflecting the committed player statistics."""
+        conn = self.pool.reader()
+        data_version = (conn, conn.execute('PRAGMA data_version').fetchone()[0])
+        if (self._table is not None and not self.pool.shared_reader
+                and getattr(self._local, 'data_version', None) == data_version):
+            return self._table
+            
+        stamp = conn.execute('''
+            SELECT name, version FROM table_versions WHERE name IN ('player_stats', 'players') ORDER BY name
+        ''').fetchall()
+        with self._lock:
+            if self._table is None or stamp != self._stamp:
+                self._table = ScorerTable(load_player_history(conn), **self.table_options)
+                self._stamp = stamp
+            table = self._table
+        self._local.data_version = data_version
+        return table
+    
+    def predict(self, home_team_id, away_team_id, home_goals=None, away_goals=None, limit=None):
+        """Return both squads' anytime-scorer probabilities, optionally given each side's expected goals."""
+        table = self.table()
+        return (
+            table.probabilities(home_team_id, home_goals, limit),
+            table.probabilities(away_team_id, away_goals, limit)
+        )
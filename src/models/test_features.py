@@ -0,0 +1,92 @@
+"""Tests of the vectorized point-in-time training features against a per-match computation."""
+
+import math
+import random
+import pytest
+from src.data.database import Database
+from src.models.features import STAT_COLUMNS, TEAM_FEATURES, build_training_frame
+from src.models.ratings import INITIAL_RATING
+
+DAY = 86400
+START = 1690000000
+WINDOW = 3
+
+@pytest.fixture
+def history():
+    """Fill an in-memory database with a seeded season and return it with its raw rows.
+    
+    Some statistics are missing, some matches have none at all, and team
+    4 never has its corners recorded.
+    """
+    rng = random.Random(0)
+    db = Database(':memory:')
+    matches, stats = [], []
+    for match_id in range(1, 41):
+        home, away = rng.sample(range(1, 5), 2)
+        matches.append((match_id, home, away, rng.randint(0, 3), rng.randint(0, 3), START + match_id * DAY))
+        if rng.random() < 0.2:
+            continue
+        for team_id in (home, away):
+            values = [rng.uniform(0.3, 0.7), rng.randint(3, 20), rng.randint(0, 8), rng.randint(0, 10), rng.randint(5, 15)]
+            values = [None if rng.random() < 0.15 else value for value in values]
+            if team_id == 4:
+                values[3] = None
+            stats.append((team_id, match_id, *values))
+            
+    with db.pool.writer() as conn:
+        conn.executemany('INSERT INTO teams (id, name, league) VALUES (?, ?, ?)',
+                         [(team_id, f'Team {team_id}', 'Test League') for team_id in range(1, 5)])
+        conn.executemany('''
+            INSERT INTO matches (id, home_team_id, away_team_id, home_score, away_score, date_ts, date)
+            VALUES (?, ?, ?, ?, ?, ?, datetime(?, 'unixepoch'))
+        ''', [(*match, match[-1]) for match in matches])
+        conn.executemany('''
+            INSERT INTO team_stats (team_id, match_id, possession, shots, shots_on_target, corners, fouls)
+            VALUES (?, ?, ?, ?, ?, ?, ?)
+        ''', stats)
+    yield db, matches, stats
+    db.close()
+
+def brute_force_features(matches, stats, match, team_id):
+    """Average a team's last ``WINDOW`` stat rows before a match, skipping missing values."""
+    by_id = {row[0]: row for row in matches}
+    rows = []
+    for stat in stats:
+        if stat[0] != team_id or by_id[stat[1]][5] >= match[5]:
+            continue
+        _, home, away, home_score, away_score, date_ts = by_id[stat[1]]
+        won = int(home_score > away_score if team_id == home else away_score > home_score)
+        rows.append((date_ts, [*stat[2:], won]))
+    rows = [values for _, values in sorted(rows)[-WINDOW:]]
+    if not rows:
+        return None
+        
+    means = []
+    for column in range(len(STAT_COLUMNS)):
+        present = [values[column] for values in rows if values[column] is not None]
+        means.append(sum(present) / len(present) if present else math.nan)
+    return means
+
+def test_training_frame_matches_a_per_match_computation(history):
+    db, matches, stats = history
+    frame = build_training_frame(db.pool.reader(), window=WINDOW).set_index('match_id')
+    
+    expected = {}
+    for match in matches:
+        home = brute_force_features(matches, stats, match, match[1])
+        away = brute_force_features(matches, stats, match, match[2])
+        if home is None or away is None or any(math.isnan(value) for value in home + away):
+            continue
+        expected[match[0]] = home + away
+        
+    assert sorted(frame.index) == sorted(expected)
+    assert 10 < len(expected) < len(matches)
+    columns = [f'home_{name}' for name in TEAM_FEATURES] + [f'away_{name}' for name in TEAM_FEATURES]
+    outcomes = {match[0]: 'H' if match[3] > match[4] else 'A' if match[3] < match[4] else 'D' for match in matches}
+    for match_id, values in expected.items():
+        assert frame.loc[match_id, columns].tolist() == pytest.approx(values)
+        assert frame.loc[match_id, 'outcome'] == outcomes[match_id]
+        
+    # Team 4 never has corners, so its matches have no complete features
+    assert not frame[['home_team_id', 'away_team_id']].isin([4]).any().any()
+    assert (frame[['home_elo', 'away_elo']] == INITIAL_RATING).all().all()
@@ -0,0 +1,58 @@
+"""Tests of batch match predictions against a small trained history."""
+
+import random
+import pytest
+from src.models.artifacts import ModelRegistry
+from src.models.predictor import MatchPredictor
+
+DAY = 86400
+START = 1690000000
+
+@pytest.fixture
+def predictor(tmp_path, monkeypatch):
+    """Train on a seeded history without draws; team 4 has results but no statistics."""
+    # The predictor keeps data.db and its log in the working directory
+    monkeypatch.chdir(tmp_path)
+    predictor = MatchPredictor(registry=ModelRegistry(str(tmp_path / 'artifacts')))
+    rng = random.Random(0)
+    with predictor.db.pool.writer() as conn:
+        conn.executemany('INSERT INTO teams (id, name, league) VALUES (?, ?, ?)',
+                         [(team_id, f'Team {team_id}', 'Test League') for team_id in range(1, 5)])
+        for match_id in range(1, 81):
+            home, away = rng.sample(range(1, 5), 2)
+            home_score = rng.randint(0, 3)
+            away_score = rng.choice([score for score in range(4) if score != home_score])
+            conn.execute('''
+                INSERT INTO matches (id, home_team_id, away_team_id, home_score, away_score, date, date_ts)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', (match_id, home, away, home_score, away_score, str(match_id), START + match_id * DAY))
+            conn.executemany('''
+                INSERT INTO team_stats (team_id, match_id, possession, shots, shots_on_target, corners, fouls)
+                VALUES (?, ?, ?, ?, ?, ?, ?)
+            ''', [
+                (team_id, match_id, rng.uniform(30, 70), rng.randint(5, 20), rng.randint(1, 8), rng.randint(0, 10), rng.randint(5, 15))
+                for team_id in (home, away) if team_id != 4
+            ])
+    assert predictor.train()
+    assert list(predictor.outcome_model.classes_) == ['A', 'H']
+    yield predictor
+    predictor.db.close()
+
+def test_batches_skip_unknown_teams_and_missing_classes(predictor):
+    predictions = predictor.predict_matches([(1, 2), (None, 2), (1, 4), ('3', '1'), (2, None)])
+    
+    assert [prediction is None for prediction in predictions] == [False, True, True, False, True]
+    for prediction, (home, away) in zip(predictions[::3], [(1, 2), (3, 1)]):
+        assert (prediction['home_team'], prediction['away_team']) == (f'Team {home}', f'Team {away}')
+        probabilities = prediction['outcome_probabilities']
+        assert probabilities['draw'] == 0.0
+        assert probabilities['home_win'] + probabilities['away_win'] == pytest.approx(1.0)
+        assert prediction['predicted_outcome'] in ('H', 'A')
+        
+    # Each entry matches its single-match prediction
+    assert predictions[0] == predictor.predict_match(1, 2)
+    assert predictor.predict_match(None, 2) is None
+
+def test_batches_without_known_teams_predict_nothing(predictor):
+    assert predictor.predict_matches([]) == []
+    assert predictor.predict_matches([(None, None), (4, 1)]) == [None, None]
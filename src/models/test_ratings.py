@@ -0,0 +1,103 @@
+"""Tests of the incrementally synced Elo ratings against a full replay of the history."""
+
+import random
+import pytest
+from src.data.database import Database
+from src.models.ratings import EloRatings, RatingsStore
+
+DAY = 86400
+START = 1690000000
+
+@pytest.fixture
+def db(tmp_path):
+    """Store a seeded season of 30 matches between six teams."""
+    rng = random.Random(0)
+    db = Database(str(tmp_path / 'data.db'))
+    with db.pool.writer() as conn:
+        conn.executemany('INSERT INTO teams (id, name, league) VALUES (?, ?, ?)',
+                         [(team_id, f'Team {team_id}', 'Test League') for team_id in range(1, 7)])
+        conn.executemany('''
+            INSERT INTO matches (id, home_team_id, away_team_id, home_score, away_score, date_ts)
+            VALUES (?, ?, ?, ?, ?, ?)
+        ''', [
+            (match_id, *rng.sample(range(1, 7), 2), rng.randint(0, 4), rng.randint(0, 4), START + match_id * DAY)
+            for match_id in range(1, 31)
+        ])
+    yield db
+    db.close()
+
+def replay(db):
+    """Rate every match from scratch in date order, like ``RatingsStore.rebuild``."""
+    engine = EloRatings()
+    played = {}
+    match_ratings = {}
+    for match_id, home_team_id, away_team_id, home_score, away_score in db.pool.reader().execute('''
+        SELECT id, home_team_id, away_team_id, home_score, away_score
+        FROM matches ORDER BY date_ts, id
+    '''):
+        match_ratings[match_id] = pytest.approx(engine.update(home_team_id, away_team_id, home_score, away_score))
+        for team_id in (home_team_id, away_team_id):
+            played[team_id] = played.get(team_id, 0) + 1
+    team_ratings = {team_id: (pytest.approx(engine.rating(team_id)), count) for team_id, count in played.items()}
+    return team_ratings, match_ratings
+
+def stored(db):
+    conn = db.pool.reader()
+    team_ratings = {team_id: (rating, count) for team_id, rating, count in conn.execute(
+        'SELECT team_id, rating, matches FROM team_ratings'
+    )}
+    match_ratings = {match_id: (home, away) for match_id, home, away in conn.execute(
+        'SELECT match_id, home_rating, away_rating FROM match_ratings'
+    )}
+    return team_ratings, match_ratings
+
+def assert_in_sync(store, db):
+    team_ratings, match_ratings = replay(db)
+    assert stored(db) == (team_ratings, match_ratings)
+    assert store.ratings_for(list(team_ratings)) == {team_id: rating for team_id, (rating, _) in team_ratings.items()}
+
+def test_edited_history_is_rewound_and_replayed(db):
+    store = RatingsStore(db.pool)
+    assert store.sync() == 30
+    assert_in_sync(store, db)
+    assert store.sync() == 0
+    
+    # A corrected score replays the corrected match and everything after it
+    with db.pool.writer() as conn:
+        conn.execute('UPDATE matches SET home_score = home_score + 3 WHERE id = 10')
+    assert store.sync() == 21
+    assert_in_sync(store, db)
+    
+    # So do a rescheduled match and a deleted one, from the earlier of their dates
+    with db.pool.writer() as conn:
+        conn.execute('UPDATE matches SET date_ts = ? WHERE id = 25', (START + 4 * DAY + 1,))
+        conn.execute('DELETE FROM matches WHERE id = 20')
+    assert store.sync() == 25
+    assert_in_sync(store, db)
+    
+    # And a late arrival dated before rated matches
+    with db.pool.writer() as conn:
+        conn.execute('''
+            INSERT INTO matches (id, home_team_id, away_team_id, home_score, away_score, date_ts)
+            VALUES (31, 1, 2, 3, 0, ?)
+        ''', (START + 15 * DAY + 1,))
+    assert store.sync() == 14
+    assert_in_sync(store, db)
+    
+    # Edits that leave the rated columns alone change nothing
+    with db.pool.writer() as conn:
+        conn.execute("UPDATE matches SET competition = 'Test League' WHERE id = 3")
+    assert store.sync() == 0
+
+def test_other_processes_pick_up_the_rewound_ratings(db):
+    store, other = RatingsStore(db.pool), RatingsStore(db.pool)
+    assert store.sync() == 30
+    assert other.sync() == 0
+    
+    with db.pool.writer() as conn:
+        conn.execute('UPDATE matches SET away_score = away_score + 2 WHERE id = 3')
+    assert store.sync() == 28
+    
+    # The other store reloads the ratings instead of applying the edit again
+    assert other.sync() == 0
+    assert_in_sync(other, db)
@@ -0,0 +1,71 @@
+"""Tests of the Dixon-Coles score model on simulated seasons."""
+
+import numpy as np
+import pytest
+from src.models.score_model import ScoreModel
+
+ATTACK = np.array([0.4, 0.2, 0.0, 0.0, -0.2, -0.4])
+DEFENCE = np.array([-0.3, -0.1, 0.0, 0.1, 0.1, 0.2])
+INTERCEPT = 0.1
+HOME_ADVANTAGE = 0.25
+
+def simulated_matches(rounds=200, seed=0):
+    """Return home and away team IDs and goals of ``rounds`` double round-robins."""
+    rng = np.random.default_rng(seed)
+    teams = np.arange(len(ATTACK))
+    home, away = (pairs.ravel() for pairs in np.meshgrid(teams, teams))
+    home, away = home[home != away], away[home != away]
+    home, away = np.tile(home, rounds), np.tile(away, rounds)
+    home_goals = rng.poisson(np.exp(INTERCEPT + HOME_ADVANTAGE + ATTACK[home] + DEFENCE[away]))
+    away_goals = rng.poisson(np.exp(INTERCEPT + ATTACK[away] + DEFENCE[home]))
+    return home + 100, away + 100, home_goals, away_goals
+
+@pytest.fixture(scope='module')
+def model():
+    return ScoreModel(half_life_days=None, l2=0.01).fit(*simulated_matches())
+
+def test_fit_recovers_team_strengths(model):
+    assert model.fitted
+    assert list(model.team_ids) == list(range(100, 106))
+    assert np.allclose(model.attack, ATTACK, atol=0.1)
+    assert np.allclose(model.defence, DEFENCE, atol=0.1)
+    assert model.home_advantage == pytest.approx(HOME_ADVANTAGE, abs=0.05)
+    assert abs(model.rho) < 0.1
+
+def test_score_matrix_is_a_distribution(model):
+    matrix = model.score_matrix([100, 105, 102], [105, 100, 103])
+    assert matrix.shape == (3, model.max_goals + 1, model.max_goals + 1)
+    assert (matrix >= 0).all()
+    assert np.allclose(matrix.sum(axis=(1, 2)), 1)
+    
+    outcomes = ScoreModel.outcome_probabilities(matrix)
+    assert np.allclose(outcomes.sum(axis=1), 1)
+    
+    # The strongest side at home is the clear favourite, and wins less often away
+    assert outcomes[0, 0] > 0.6
+    assert outcomes[1, 2] < outcomes[0, 0]
+
+def test_unknown_teams_are_average(model):
+    assert list(model.knows([100, 999])) == [True, False]
+    
+    home_mean, away_mean = model.expected_goals([999], [998])
+    assert home_mean[0] == pytest.approx(np.exp(model.intercept + model.home_advantage))
+    assert away_mean[0] == pytest.approx(np.exp(model.intercept))
+
+def test_unfitted_model_predicts_average_teams():
+    model = ScoreModel(max_goals=6)
+    matrix = model.score_matrix([1], [2])
+    assert matrix.shape == (1, 7, 7)
+    assert np.allclose(matrix.sum(), 1)
+
+def test_recent_matches_weigh_more():
+    model = ScoreModel(half_life_days=180)
+    day = 86400
+    assert np.allclose(model._weights([0, 180 * day, 360 * day]), [0.25, 0.5, 1])
+    assert ScoreModel(half_life_days=None)._weights([0, day]) is None
+
+def test_most_likely_scores():
+    matrix = np.zeros((2, 4, 4))
+    matrix[0, 2, 1] = 1
+    matrix[1, 0, 3] = 1
+    assert ScoreModel.most_likely_scores(matrix).tolist() == [[2, 1], [0, 3]]
@@ -0,0 +1,87 @@
+"""Tests of the scorer table cache against edits to the player data."""
+
+from datetime import datetime
+import pytest
+from src.data.database import Database
+from src.models.scorers import ScorerEngine
+
+def appearance(name, team_id, goals, shots):
+    """Return a full 90-minute player row for ``insert_match_players``."""
+    return {
+        'name': name,
+        'team_id': team_id,
+        'minutes': 90,
+        'goals': goals,
+        'assists': 0,
+        'shots': shots,
+        'shots_on_target': shots,
+        'passes': None,
+        'pass_accuracy': None
+    }
+
+@pytest.fixture(params=['file', 'memory'])
+def db(request, tmp_path):
+    """Store three matches of two teams' players, on disk or in memory (where the reader is the writer)."""
+    db = Database(str(tmp_path / 'data.db') if request.param == 'file' else ':memory:')
+    home, away = db.insert_teams_bulk([
+        {'name': 'Arsenal', 'league': 'Premier League'},
+        {'name': 'Chelsea', 'league': 'Premier League'}
+    ])
+    match_ids = db.insert_matches_bulk([
+        {
+            'home_team_id': home,
+            'away_team_id': away,
+            'home_score': 1,
+            'away_score': 1,
+            'date': datetime(2023, 8, day),
+            'competition': 'Premier League',
+            'season': '2023'
+        }
+        for day in (12, 19, 26)
+    ])
+    for match_id, saka_goals in zip(match_ids, (1, 0, 2)):
+        db.insert_match_players(match_id, [
+            appearance('Saka', home, goals=saka_goals, shots=3),
+            appearance('Havertz', home, goals=0, shots=1),
+            appearance('Palmer', away, goals=1, shots=4)
+        ])
+    yield db
+    db.close()
+
+def scorers(engine, team_id=1):
+    return {player['name']: player['probability'] for player in engine.table().probabilities(team_id)}
+
+def test_unchanged_data_reuses_the_table(db):
+    engine = ScorerEngine(db.pool)
+    table = engine.table()
+    assert engine.table() is table
+    
+    # Writes to other tables leave it alone
+    db.insert_team('Liverpool', 'Premier League')
+    assert engine.table() is table
+
+def test_player_edits_rebuild_the_table(db):
+    engine = ScorerEngine(db.pool)
+    before = scorers(engine)
+    assert before['Saka'] > before['Havertz']
+    
+    # A new goal
+    with db.pool.writer() as conn:
+        conn.execute("UPDATE player_stats SET goals = 2 WHERE player_id = (SELECT id FROM players WHERE name = 'Havertz')")
+    after = scorers(engine)
+    assert after['Havertz'] > before['Havertz']
+    
+    # Goals moved between two of Saka's matches leave every rate unchanged, yet rebuild
+    table = engine.table()
+    with db.pool.writer() as conn:
+        conn.execute('''
+            UPDATE player_stats SET goals = 3 - goals
+            WHERE player_id = (SELECT id FROM players WHERE name = 'Saka') AND goals > 0
+        ''')
+    assert engine.table() is not table
+    assert scorers(engine) == pytest.approx(after)
+    
+    # A renamed player
+    with db.pool.writer() as conn:
+        conn.execute("UPDATE players SET name = 'Bukayo Saka' WHERE name = 'Saka'")
+    assert set(scorers(engine)) == {'Bukayo Saka', 'Havertz'}
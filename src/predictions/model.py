@@ -1,86 +1,60 @@
-import sqlite3
 import numpy as np
 from typing import Tuple, Dict, List, Optional
+from src.data.database import Database
+from src.data.feature_cache import FeatureCache
+from src.data.queries import TEAM_RECENT_RESULTS, TEAM_RECENT_METRICS
+from src.models.ratings import RatingsStore
+
+# Share of the final probabilities taken from the Elo ratings
+ELO_WEIGHT = 0.5
 
 class MatchPredictor:
     def __init__(self, db_path: str = 'data.db'):
         """Initialize the predictor with database connection."""
         self.db_path = db_path
+        self.db = Database(db_path)
+        self.feature_cache = FeatureCache(self.db.pool)
+        self.ratings = RatingsStore(self.db.pool)
         
     def _get_team_stats(self, team_id: int, last_n_matches: int = 5) -> Dict:
-        """Get team statistics from recent matches."""
-        with sqlite3.connect(self.db_path) as conn:
-            # Get overall team performance
-            query = """
-                WITH team_matches AS (
-                    SELECT 
-                        m.id,
-                        CASE 
-                            WHEN m.home_team_id = ? THEN m.home_score
-                            ELSE m.away_score
-                        END as team_score,
-                        CASE 
-                            WHEN m.home_team_id = ? THEN m.away_score
-                            ELSE m.home_score
-                        END as opponent_score,
-                        CASE 
-                            WHEN m.home_team_id = ? THEN 1
-                            ELSE 0
-                        END as is_home
-                    FROM matches m
-                    WHERE m.home_team_id = ? OR m.away_team_id = ?
-                    ORDER BY m.id DESC
-                    LIMIT ?
-                )
-                SELECT 
-                    COUNT(*) as games_played,
-                    SUM(CASE WHEN team_score > opponent_score THEN 1 ELSE 0 END) as wins,
-                    SUM(CASE WHEN team_score = opponent_score THEN 1 ELSE 0 END) as draws,
-                    SUM(CASE WHEN team_score < opponent_score THEN 1 ELSE 0 END) as losses,
-                    AVG(CAST(team_score AS FLOAT)) as avg_goals_scored,
-                    AVG(CAST(opponent_score AS FLOAT)) as avg_goals_conceded
-                FROM team_matches
-            """
-            cursor = conn.cursor()
-            cursor.execute(query, (team_id, team_id, team_id, team_id, team_id, last_n_matches))
-            result = cursor.fetchone()
-            
-            # Get average performance metrics
-            metrics_query = """
-                SELECT 
-                    AVG(CAST(possession AS FLOAT)) as avg_possession,
-                    AVG(CAST(shots AS FLOAT)) as avg_shots,
-                    AVG(CAST(shots_on_target AS FLOAT)) as avg_shots_on_target,
-                    AVG(CAST(corners AS FLOAT)) as avg_corners
-                FROM team_stats ts
-                JOIN matches m ON m.id = ts.match_id
-                WHERE ts.team_id = ?
-                ORDER BY m.id DESC
-                LIMIT ?
-            """
-            cursor.execute(metrics_query, (team_id, last_n_matches))
-            metrics_result = cursor.fetchone()
-            
-            # Handle case where we don't have enough data
-            games_played = result[0] if result[0] is not None else 0
-            wins = result[1] if result[1] is not None else 0
-            draws = result[2] if result[2] is not None else 0
-            losses = result[3] if result[3] is not None else 0
-            
-            return {
-                'games_played': games_played,
-                'wins': wins,
-                'draws': draws,
-                'losses': losses,
-                'avg_goals_scored': result[4] if result[4] is not None else 0,
-                'avg_goals_conceded': result[5] if result[5] is not None else 0,
-                'win_rate': wins / games_played if games_played > 0 else 0.33,  # Use league average if no data
-                'avg_possession': metrics_result[0] if metrics_result[0] is not None else 50,
-                'avg_shots': metrics_result[1] if metrics_result[1] is not None else 12,
-                'avg_shots_on_target': metrics_result[2] if metrics_result[2] is not None else 4,
-                'avg_corners': metrics_result[3] if metrics_result[3] is not None else 5
-            }
-
+        """Get team statistics from recent matches, cached until the team's data changes."""
+        return self.feature_cache.get(
+            team_id, last_n_matches, None,
+            lambda team_id: self._query_team_stats(team_id, last_n_matches)
+        )
+    
+    def _query_team_stats(self, team_id: int, last_n_matches: int) -> Dict:
+        """Query team statistics from recent matches."""
+        conn = self.db.pool.reader()
+        # Get overall team performance
+        cursor = conn.cursor()
+        cursor.execute(TEAM_RECENT_RESULTS, (team_id, team_id, team_id, team_id, team_id, last_n_matches))
+        result = cursor.fetchone()
+        
+        # Get average performance metrics
+        cursor.execute(TEAM_RECENT_METRICS, (team_id, last_n_matches))
+        metrics_result = cursor.fetchone()
+        
+        # Handle case where we don't have enough data
+        games_played = result[0] if result[0] is not None else 0
+        wins = result[1] if result[1] is not None else 0
+        draws = result[2] if result[2] is not None else 0
+        losses = result[3] if result[3] is not None else 0
+        
+        return {
+            'games_played': games_played,
+            'wins': wins,
+            'draws': draws,
+            'losses': losses,
+            'avg_goals_scored': result[4] if result[4] is not None else 0,
+            'avg_goals_conceded': result[5] if result[5] is not None else 0,
+            'win_rate': wins / games_played if games_played > 0 else 0.33,  # Use league average if no data
+            'avg_possession': metrics_result[0] if metrics_result[0] is not None else 50,
+            'avg_shots': metrics_result[1] if metrics_result[1] is not None else 12,
+            'avg_shots_on_target': metrics_result[2] if metrics_result[2] is not None else 4,
+            'avg_corners': metrics_result[3] if metrics_result[3] is not None else 5
+        }
+    
     def predict_match(self, home_team_id: int, away_team_id: int) -> Dict:
         """Predict the outcome of a match between two teams."""
         # Get team statistics
@@ -120,6 +94,14 @@ class MatchPredictor:
         away_win_prob /= total
         draw_prob /= total
         
+        # Blend in the Elo ratings, which weigh every result against the opponent's strength
+        ratings = self.ratings.ratings_for([home_team_id, away_team_id])
+        home_rating, away_rating = ratings[home_team_id], ratings[away_team_id]
+        elo_home, elo_draw, elo_away = self.ratings.engine.probabilities(home_rating, away_rating)
+        home_win_prob = (1 - ELO_WEIGHT) * home_win_prob + ELO_WEIGHT * elo_home
+        draw_prob = (1 - ELO_WEIGHT) * draw_prob + ELO_WEIGHT * elo_draw
+        away_win_prob = (1 - ELO_WEIGHT) * away_win_prob + ELO_WEIGHT * elo_away
+        
         # Add confidence penalty if we don't have enough data
         confidence_penalty = min(home_stats['games_played'], away_stats['games_played']) / 5  # 5 games is full confidence
         confidence_penalty = min(1.0, confidence_penalty)
@@ -130,16 +112,19 @@ class MatchPredictor:
             'draw_probability': round(draw_prob * 100, 2),
             'prediction': 'Home Win' if home_win_prob > max(away_win_prob, draw_prob) else 'Away Win' if away_win_prob > max(home_win_prob, draw_prob) else 'Draw',
             'confidence': round(max(home_win_prob, away_win_prob, draw_prob) * 100 * confidence_penalty, 2),
+            'ratings': {
+                'home': round(home_rating, 1),
+                'away': round(away_rating, 1)
+            },
             'data_quality': {
                 'home_games': home_stats['games_played'],
                 'away_games': away_stats['games_played']
             }
         }
-
+    
     def get_team_name(self, team_id: int) -> str:
         """Get team name from ID."""
-        with sqlite3.connect(self.db_path) as conn:
-            cursor = conn.cursor()
-            cursor.execute("SELECT name FROM teams WHERE id = ?", (team_id,))
-            result = cursor.fetchone()
-            return result[0] if result else "Unknown Team" 
\ No newline at end of file
+        cursor = self.db.pool.reader().cursor()
+        cursor.execute("SELECT name FROM teams WHERE id = ?", (team_id,))
+        result = cursor.fetchone()
+        return result[0] if result else "Unknown Team" 
\ No newline at end of file
@@ -0,0 +1,244 @@
+"""Monte Carlo simulation of the rest of a league season.
+
+Every remaining fixture's scoreline distribution comes from one batched
+call to the Dixon-Coles score model. Seasons are then simulated as NumPy
+array operations: one row per team and one column per simulated season,
+filled fixture by fixture with sampled scorelines, and ranked in a single
+sort. Batches of seasons can be spread over processes.
+"""
+
+import logging
+from concurrent.futures import ProcessPoolExecutor
+import numpy as np
+from src.data.database import Database
+from src.models.features import load_matches
+from src.models.score_model import ScoreModel
+
+DEFAULT_SIMULATIONS = 100000
+
+# Seasons simulated at once; bounds memory to a few MB per team
+BATCH_SIZE = 20000
+
+# Slices of [0, 1) in each fixture's scoreline lookup table
+GUIDE_SIZE = 1024
+
+# Bit layout of table_keys
+POINTS_SHIFT = 20
+GOAL_DIFFERENCE_SHIFT = 10
+GOAL_DIFFERENCE_OFFSET = 512
+
+def load_season(conn, competition, season):
+    """Return ``(home_team_id, away_team_id, home_score, away_score)`` rows of a season's finished matches."""
+    return conn.execute('''
+        SELECT home_team_id, away_team_id, home_score, away_score
+        FROM matches
+        WHERE competition = ?
+        AND season = ?
+        AND home_team_id IS NOT NULL
+        AND away_team_id IS NOT NULL
+        AND home_score IS NOT NULL
+        AND away_score IS NOT NULL
+    ''', (competition, str(season))).fetchall()
+
+def remaining_fixtures(team_ids, played):
+    """Return the ``(home, away)`` pairs of a double round-robin not yet in ``played``."""
+    played = set(played)
+    return [
+        (home_team_id, away_team_id)
+        for home_team_id in team_ids
+        for away_team_id in team_ids
+        if home_team_id != away_team_id and (home_team_id, away_team_id) not in played
+    ]
+
+def table_keys(points, goal_difference, goals_for):
+    """Pack standings into one integer per team that orders like the league table.
+    
+    Points, then goal difference, then goals scored each get their own
+    bits, which holds while goal differences stay within +-511 and teams
+    score fewer than 1024 goals.
+    """
+    points, goal_difference, goals_for = (np.asarray(values, dtype=np.int64) for values in (points, goal_difference, goals_for))
+    return (points << POINTS_SHIFT) + ((goal_difference + GOAL_DIFFERENCE_OFFSET) << GOAL_DIFFERENCE_SHIFT) + goals_for
+
+def simulate_positions(cdf, home, away, keys, simulations, seed=None, batch_size=BATCH_SIZE):
+    """Simulate seasons and return a ``(teams, teams)`` array of finishing-position counts.
+    
+    ``cdf`` holds each fixture's cumulative scoreline probabilities with
+    the home goals as the major index, ``home`` and ``away`` are the
+    fixtures' team positions and ``keys`` the current ``table_keys``.
+    Teams level on points, goal difference and goals scored are separated
+    by drawing lots. Entry ``[t, p]`` counts the seasons team ``t``
+    finished in position ``p``, 0 being first.
+    """
+    teams = len(keys)
+    side = int(round(np.sqrt(cdf.shape[1]))) if len(cdf) else 1
+    home_goals = np.repeat(np.arange(side), side)
+    away_goals = np.tile(np.arange(side), side)
+    difference = home_goals - away_goals
+    home_keys = (np.where(difference > 0, 3, difference == 0) << POINTS_SHIFT) + (difference << GOAL_DIFFERENCE_SHIFT) + home_goals
+    away_keys = (np.where(difference < 0, 3, difference == 0) << POINTS_SHIFT) - (difference << GOAL_DIFFERENCE_SHIFT) + away_goals
+    
+    # Guide tables: the first scoreline each 1/GUIDE_SIZE slice of [0, 1)
+    # can land on, so sampling is a lookup plus a step for the few draws
+    # past it instead of a binary search per draw
+    cdf = cdf.copy()
+    cdf[:, -1] = np.inf
+    guides = np.stack([np.searchsorted(row, np.arange(GUIDE_SIZE) / GUIDE_SIZE, side='right') for row in cdf]) if len(cdf) else None
+    
+    rng = np.random.default_rng(seed)
+    counts = np.zeros(teams * teams, dtype=np.int64)
+    for start in range(0, simulations, batch_size):
+        size = min(batch_size, simulations - start)
+        table = np.repeat(np.asarray(keys, dtype=np.int64)[:, None], size, axis=1)
+        
+        for i in range(len(cdf)):
+            draws = rng.random(size)
+            scores = guides[i][(draws * GUIDE_SIZE).astype(np.intp)]
+            behind = np.flatnonzero(cdf[i][scores] <= draws)
+            while len(behind):
+                scores[behind] += 1
+                behind = behind[cdf[i][scores[behind]] <= draws[behind]]
+            table[home[i]] += home_keys[scores]
+            table[away[i]] += away_keys[scores]
+            
+        # Rows of team positions, best first; lexsort takes the primary key last
+        order = np.lexsort((rng.random((teams, size)), table), axis=0)[::-1]
+        counts += np.bincount((order * teams + np.arange(teams)[:, None]).ravel(), minlength=teams * teams)
+    return counts.reshape(teams, teams)
+
+class SeasonSimulator:
+    """Finishing-position probabilities for every team of a league season.
+    
+    Standings are read from the season's finished matches and the
+    remaining fixtures are the double round-robin legs not yet played,
+    unless given. The score model is fitted on every finished match on
+    first use unless a fitted one is passed in.
+    """
+    
+    def __init__(self, db=None, score_model=None, workers=1):
+        """Simulate from ``db``; ``workers`` above 1 spreads seasons over that many processes."""
+        self.db = db or Database()
+        self.score_model = score_model or ScoreModel()
+        self.workers = workers
+        self.logger = logging.getLogger(__name__)
+    
+    def fit(self):
+        """Fit the score model on every finished match"""
+        matches = load_matches(self.db.pool.reader())
+        self.score_model.fit(
+            matches['home_team_id'], matches['away_team_id'],
+            matches['home_score'], matches['away_score'],
+            matches['date_ts']
+        )
+        return self
+    
+    def _standings(self, team_ids, results):
+        """Return points, goal difference and goals scored arrays aligned with ``team_ids``."""
+        position = {team_id: i for i, team_id in enumerate(team_ids)}
+        table = np.zeros((3, len(team_ids)), dtype=np.int32)
+        for home_team_id, away_team_id, home_score, away_score in results:
+            home, away = position[home_team_id], position[away_team_id]
+            table[0, home] += 3 if home_score > away_score else home_score == away_score
+            table[0, away] += 3 if away_score > home_score else home_score == away_score
+            table[1, home] += home_score - away_score
+            table[1, away] += away_score - home_score
+            table[2, home] += home_score
+            table[2, away] += away_score
+        return table
+    
+    def _simulate(self, cdf, home, away, table, simulations, seed):
+        keys = table_keys(*table)
+        workers = max(1, min(self.workers or 1, simulations))
+        if workers == 1:
+            return simulate_positions(cdf, home, away, keys, simulations, seed)
+            
+        # Independent random streams and near-equal shares of the seasons per process
+        seeds = np.random.SeedSequence(seed).spawn(workers)
+        shares = [simulations // workers + (i < simulations % workers) for i in range(workers)]
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(simulate_positions, cdf, home, away, keys, share, worker_seed)
+                for share, worker_seed in zip(shares, seeds)
+            ]
+            return sum(future.result() for future in futures)
+    
+    def simulate(self, competition, season, simulations=DEFAULT_SIMULATIONS, fixtures=None, seed=None, top=4, relegated=3):
+        """Simulate the rest of a season
+        
+        Returns a dict with the number of simulations and remaining
+        fixtures, and one entry per team, ordered by expected finishing
+        position, holding the current standings, expected points, the
+        probability of each finishing position and of finishing first, in
+        the top ``top`` and in the bottom ``relegated``. ``fixtures``
+        lists the remaining ``(home_team_id, away_team_id)`` pairs when
+        the season is not a double round-robin.
+        """
+        results = load_season(self.db.pool.reader(), competition, season)
+        team_ids = sorted({team_id for result in results for team_id in result[:2]} |
+                          {int(team_id) for pair in (fixtures or []) for team_id in pair})
+        if not team_ids:
+            self.logger.warning(f"No matches found for {competition} {season}")
+            return None
+            
+        if fixtures is None:
+            fixtures = remaining_fixtures(team_ids, [result[:2] for result in results])
+        fixtures = [(int(home_team_id), int(away_team_id)) for home_team_id, away_team_id in fixtures]
+        if fixtures and not self.score_model.fitted:
+            self.fit()
+            
+        # Every remaining fixture's scoreline distribution in one batch
+        position = {team_id: i for i, team_id in enumerate(team_ids)}
+        home = np.array([position[pair[0]] for pair in fixtures], dtype=np.int64)
+        away = np.array([position[pair[1]] for pair in fixtures], dtype=np.int64)
+        side = self.score_model.max_goals + 1
+        if fixtures:
+            matrix = self.score_model.score_matrix([pair[0] for pair in fixtures], [pair[1] for pair in fixtures])
+            cdf = np.cumsum(matrix.reshape(len(fixtures), -1), axis=1)
+            outcomes = ScoreModel.outcome_probabilities(matrix)
+        else:
+            cdf = np.empty((0, side * side))
+            outcomes = np.empty((0, 3))
+            
+        table = self._standings(team_ids, results)
+        expected_points = table[0].astype(float)
+        np.add.at(expected_points, home, 3 * outcomes[:, 0] + outcomes[:, 1])
+        np.add.at(expected_points, away, 3 * outcomes[:, 2] + outcomes[:, 1])
+        
+        counts = self._simulate(cdf, home, away, table, simulations, seed)
+        distribution = counts / simulations
+        expected_position = distribution @ np.arange(1, len(team_ids) + 1)
+        
+        names = self._team_names(team_ids)
+        standings = []
+        for i in np.argsort(expected_position, kind='stable'):
+            standings.append({
+                'team_id': team_ids[i],
+                'team': names.get(team_ids[i]),
+                'points': int(table[0, i]),
+                'goal_difference': int(table[1, i]),
+                'expected_points': float(expected_points[i]),
+                'expected_position': float(expected_position[i]),
+                'positions': distribution[i].tolist(),
+                'title': float(distribution[i, 0]),
+                'top': float(distribution[i, :top].sum()),
+                'relegation': float(distribution[i, len(team_ids) - relegated:].sum()) if relegated else 0.0
+            })
+            
+        return {
+            'competition': competition,
+            'season': str(season),
+            'simulations': simulations,
+            'remaining_fixtures': len(fixtures),
+            'standings': standings
+        }
+    
+    def _team_names(self, team_ids):
+        cursor = self.db.pool.reader().execute(
+            f"SELECT id, name FROM teams WHERE id IN ({', '.join('?' * len(team_ids))})",
+            team_ids
+        )
+        return dict(cursor.fetchall())
+    
+    def close(self):
+        """Clean up resources"""
+        self.db.close()
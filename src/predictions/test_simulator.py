@@ -0,0 +1,101 @@
+"""Tests of the season simulator's table ordering, sampling and standings."""
+
+import numpy as np
+import pytest
+from src.data.database import Database
+from src.models.score_model import ScoreModel
+from src.predictions import simulator
+
+def certain_results(*scores, side=3):
+    """Return a cdf array making each fixture end with the given ``(home, away)`` score."""
+    cdf = np.zeros((len(scores), side * side))
+    for i, (home_goals, away_goals) in enumerate(scores):
+        cdf[i, home_goals * side + away_goals:] = 1
+    return cdf
+
+def test_remaining_fixtures():
+    assert simulator.remaining_fixtures([1, 2, 3], [(1, 2), (3, 1)]) == [(1, 3), (2, 1), (2, 3), (3, 2)]
+    assert simulator.remaining_fixtures([1, 2], [(1, 2), (2, 1)]) == []
+
+def test_table_keys_order_like_the_league_table():
+    keys = simulator.table_keys(
+        points=[10, 10, 10, 9, 10],
+        goal_difference=[3, 3, 5, -20, -2],
+        goals_for=[8, 9, 1, 40, 0]
+    )
+    assert list(np.argsort(-keys, kind='stable')) == [2, 1, 0, 4, 3]
+
+def test_no_fixtures_keeps_the_current_order():
+    keys = simulator.table_keys([3, 9, 6], [0, 0, 0], [0, 0, 0])
+    counts = simulator.simulate_positions(np.empty((0, 9)), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), keys, 100)
+    assert counts.tolist() == [[0, 0, 100], [100, 0, 0], [0, 100, 0]]
+
+def test_certain_results_are_added_to_the_table():
+    # Team 0 leads by two points but loses both of its remaining games
+    keys = simulator.table_keys([5, 3, 3], [2, 0, 0], [4, 2, 2])
+    cdf = certain_results((2, 0), (0, 1))
+    counts = simulator.simulate_positions(cdf, np.array([1, 0]), np.array([0, 2]), keys, 50, seed=0, batch_size=20)
+    assert counts.tolist() == [[0, 0, 50], [50, 0, 0], [0, 50, 0]]
+
+def test_level_teams_draw_lots():
+    keys = simulator.table_keys([4, 4], [1, 1], [3, 3])
+    counts = simulator.simulate_positions(np.empty((0, 9)), np.empty(0, dtype=np.int64), np.empty(0, dtype=np.int64), keys, 4000, seed=1)
+    assert counts.sum(axis=0).tolist() == [4000, 4000]
+    assert counts[0, 0] == pytest.approx(2000, abs=200)
+
+def test_sampling_follows_the_scoreline_probabilities():
+    # One fixture: 1-0 (home win), 1-1 (draw) or 0-2 (away win)
+    probabilities = np.zeros(9)
+    probabilities[[3, 4, 2]] = [0.5, 0.3, 0.2]
+    keys = simulator.table_keys([0, 0], [0, 0], [0, 0])
+    counts = simulator.simulate_positions(np.cumsum(probabilities)[None], np.array([0]), np.array([1]), keys, 20000, seed=2)
+    
+    # The home side finishes first after a win, and after a draw half the time
+    assert counts[0, 0] / 20000 == pytest.approx(0.5 + 0.3 / 2, abs=0.02)
+    assert (counts.sum(axis=0) == 20000).all() and (counts.sum(axis=1) == 20000).all()
+
+def test_seeded_runs_repeat():
+    keys = simulator.table_keys([0, 0, 0], [0, 0, 0], [0, 0, 0])
+    cdf = np.tile(np.linspace(0.1, 1, 9), (2, 1))
+    first = simulator.simulate_positions(cdf, np.array([0, 1]), np.array([1, 2]), keys, 1000, seed=3, batch_size=300)
+    second = simulator.simulate_positions(cdf, np.array([0, 1]), np.array([1, 2]), keys, 1000, seed=3, batch_size=300)
+    assert (first == second).all()
+
+@pytest.fixture
+def db():
+    db = Database(':memory:')
+    with db.pool.writer() as conn:
+        conn.executemany('INSERT INTO teams (id, name, league) VALUES (?, ?, ?)', [
+            (1, 'Arsenal', 'Premier League'), (2, 'Chelsea', 'Premier League'),
+            (3, 'Everton', 'Premier League'), (4, 'Fulham', 'Premier League')
+        ])
+        conn.executemany('''
+            INSERT INTO matches (home_team_id, away_team_id, date, home_score, away_score, competition, season)
+            VALUES (?, ?, ?, ?, ?, 'Premier League', '2023')
+        ''', [
+            (1, 2, '2023-08-12', 3, 0), (3, 4, '2023-08-12', 1, 1),
+            (2, 3, '2023-08-19', 2, 1), (4, 1, '2023-08-19', 0, 2)
+        ])
+    yield db
+    db.close()
+
+def test_simulate_season(db):
+    score_model = ScoreModel(half_life_days=None).fit([1, 3, 2, 4], [2, 4, 3, 1], [3, 1, 2, 0], [0, 1, 1, 2])
+    result = simulator.SeasonSimulator(db, score_model=score_model).simulate('Premier League', 2023, simulations=2000, seed=0)
+    
+    assert (result['simulations'], result['remaining_fixtures']) == (2000, 8)
+    standings = {team['team']: team for team in result['standings']}
+    assert [(team['points'], team['goal_difference']) for team in map(standings.get, ['Arsenal', 'Chelsea', 'Everton', 'Fulham'])] == [
+        (6, 5), (3, -2), (1, -1), (1, -2)
+    ]
+    assert result['standings'][0]['team'] == 'Arsenal'
+    
+    for team in result['standings']:
+        assert sum(team['positions']) == pytest.approx(1)
+        assert team['title'] == team['positions'][0]
+        assert team['expected_points'] >= team['points']
+    assert sum(team['title'] for team in result['standings']) == pytest.approx(1)
+    assert sum(team['relegation'] for team in result['standings']) == pytest.approx(3)
+
+def test_simulate_unknown_season(db):
+    assert simulator.SeasonSimulator(db, score_model=ScoreModel()).simulate('Serie A', 2023) is None
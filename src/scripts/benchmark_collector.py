@@ -0,0 +1,79 @@
+"""Benchmark a full season collection against the local API-Football stand-in."""
+
+import logging
+import os
+import sqlite3
+import sys
+import tempfile
+import time
+from src.data.collector import APIFootballCollector
+from src.data.config import COMPETITIONS
+from src.data.fake_api import FakeAPIFootball
+from src.data.ratelimit import RateLimiter
+
+# Database methods whose time counts as DB write time
+WRITE_METHODS = [
+    'insert_teams_bulk', 'insert_matches_bulk', 'upsert_matches_bulk',
+    'insert_team_stats_bulk', 'set_collection_mark'
+]
+
+def time_writes(db):
+    """Wrap the database's write methods and return the dict their time adds up in."""
+    totals = {'seconds': 0.0}
+    
+    def timed(method):
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+            try:
+                return method(*args, **kwargs)
+            finally:
+                totals['seconds'] += time.perf_counter() - start
+        return wrapper
+        
+    for name in WRITE_METHODS:
+        setattr(db, name, timed(getattr(db, name)))
+    return totals
+
+def main(latency='0.02', error_rate='0.02'):
+    """Collect one season with statistics from the stand-in and report throughput."""
+    logging.basicConfig(
+        level=logging.WARNING,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+    logger.setLevel(logging.INFO)
+    
+    with tempfile.TemporaryDirectory() as tmp, FakeAPIFootball(
+        COMPETITIONS, latency=float(latency), jitter=float(latency), error_rate=float(error_rate),
+        per_minute=6000, daily_limit=100000
+    ) as api:
+        db_path = os.path.join(tmp, 'benchmark.db')
+        collector = APIFootballCollector(
+            rate_limiter=RateLimiter(per_minute=api.per_minute, daily_limit=api.daily_limit, base_backoff=0.1),
+            cache=False,
+            api_base_url=api.base_url,
+            db_path=db_path
+        )
+        logging.getLogger('src.data.collector').setLevel(logging.WARNING)
+        writes = time_writes(collector.db)
+        
+        start = time.perf_counter()
+        collector.collect_season_data(season=2023, include_stats=True)
+        elapsed = time.perf_counter() - start
+        
+        conn = sqlite3.connect(db_path)
+        fixtures = conn.execute('SELECT COUNT(*) FROM matches').fetchone()[0]
+        with_stats = conn.execute('SELECT COUNT(DISTINCT match_id) FROM team_stats').fetchone()[0]
+        conn.close()
+        
+        requests_made = api.requests
+        logger.info(f"Collected {fixtures} fixtures ({with_stats} with statistics) in {elapsed:.2f}s")
+        logger.info(f"Fixtures per second: {fixtures / elapsed:.1f}")
+        logger.info(f"Requests: {requests_made} ({requests_made / max(fixtures, 1):.3f} per fixture), "
+                    f"by endpoint: {api.endpoint_counts}")
+        logger.info(f"DB write time: {writes['seconds']:.3f}s ({100 * writes['seconds'] / elapsed:.1f}% of wall time)")
+        
+    return 0 if fixtures and with_stats == fixtures else 1
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
@@ -0,0 +1,29 @@
+"""Fail when a hot query's plan regresses to a full table scan."""
+
+import logging
+import sys
+from src.data.database import Database
+from src.data.query_plans import HOT_QUERIES, find_table_scans
+
+def main(db_path='data.db'):
+    """Check every hot query against the (migrated) database schema."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+    
+    db = Database(db_path)
+    try:
+        regressions = find_table_scans(db.pool.reader())
+    finally:
+        db.close()
+        
+    for name, details in regressions.items():
+        logger.error(f"Query '{name}' scans a table: {'; '.join(details)}")
+        
+    logger.info(f"Checked {len(HOT_QUERIES)} queries, {len(regressions)} regressed")
+    return 1 if regressions else 0
+
+if __name__ == "__main__":
+    sys.exit(main(*sys.argv[1:]))
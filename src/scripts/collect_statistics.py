@@ -1,4 +1,4 @@
-"""Script to collect match statistics for the 2023 season."""
+"""Script to collect match statistics for the 2023 season, most valuable matches first."""
 
 import logging
 import json
@@ -25,17 +25,10 @@ def main():
         
         logger.info(f"Collector initialized successfully. {collector.requests_remaining} requests remaining")
         
-        # Continue with Premier League first since we already started it
-        leagues = ["Premier League", "La Liga", "Serie A", "Bundesliga", "Ligue 1"]
-        
-        for league in leagues:
-            if collector.requests_remaining <= 1:  # Leave 1 request buffer for safety
-                logger.warning(f"Daily request limit approaching. Stopping before {league}")
-                break
-                
-            logger.info(f"Collecting statistics for {league}")
-            collector.collect_season_statistics(league, "2023")
-            logger.info(f"After {league}: {collector.requests_remaining} requests remaining")
+        # Spend today's requests on the most valuable matches across all leagues,
+        # leaving 1 request buffer for safety
+        stored = collector.collect_prioritized_statistics(2023, reserve=1)
+        logger.info(f"Stored statistics for {stored} matches. {collector.requests_remaining} requests remaining")
             
     except Exception as e:
         logger.error(f"Error during statistics collection: {str(e)}")
@@ -31,6 +31,9 @@ def main():
         print(f"  Home Win: {prediction['home_win_probability']}%")
         print(f"  Draw: {prediction['draw_probability']}%")
         print(f"  Away Win: {prediction['away_win_probability']}%")
+        print(f"Elo Ratings:")
+        print(f"  Home: {prediction['ratings']['home']}")
+        print(f"  Away: {prediction['ratings']['away']}")
         print(f"Data Quality:")
         print(f"  Home Team Games: {prediction['data_quality']['home_games']}")
         print(f"  Away Team Games: {prediction['data_quality']['away_games']}")
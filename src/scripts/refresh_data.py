@@ -0,0 +1,31 @@
+"""Refresh the database with matches finished since the last collection."""
+
+import logging
+from src.data.collector import APIFootballCollector
+
+def main():
+    """Main function to run an incremental data refresh."""
+    # Set up logging
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+    
+    try:
+        logger.info("Starting incremental refresh for 2023 season")
+        
+        # Initialize collector
+        collector = APIFootballCollector()
+        logger.info("Collector initialized successfully")
+        
+        # Fetch new fixtures and the statistics they are missing
+        collector.collect_season_data(season=2023, include_stats=True, incremental=True)
+        
+    except Exception as e:
+        logger.error(f"Error during data refresh: {str(e)}")
+    finally:
+        logger.info("Data refresh completed")
+
+if __name__ == "__main__":
+    main()
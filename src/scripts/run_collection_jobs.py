@@ -0,0 +1,32 @@
+"""Resume data collection from the durable job queue."""
+
+import logging
+import sys
+from src.data.collector import APIFootballCollector
+
+def main(season='2023'):
+    """Queue the season's jobs (once) and work through whatever is pending."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+    
+    collector = APIFootballCollector()
+    try:
+        queued = collector.queue_season_jobs(season)
+        logger.info(f"Queued {queued} new jobs for season {season}")
+        
+        completed = collector.run_jobs()
+        logger.info(f"Completed {completed} jobs, {collector.requests_remaining} requests remaining")
+        
+        for (kind, state), count in sorted(collector.jobs.counts().items()):
+            logger.info(f"{kind} jobs {state}: {count}")
+            
+    except Exception as e:
+        logger.error(f"Error running collection jobs: {str(e)}")
+    finally:
+        collector.close()
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
@@ -0,0 +1,39 @@
+"""Simulate the rest of a league season and print finishing probabilities."""
+
+import logging
+import os
+import sys
+import time
+from src.predictions.simulator import SeasonSimulator, DEFAULT_SIMULATIONS
+
+def main(competition='Premier League', season='2023', simulations=DEFAULT_SIMULATIONS, workers=None):
+    """Print title, top-4 and relegation odds of every team in the competition."""
+    logging.basicConfig(
+        level=logging.INFO,
+        format='%(asctime)s - %(levelname)s - %(message)s'
+    )
+    logger = logging.getLogger(__name__)
+    
+    simulator = SeasonSimulator(workers=int(workers) if workers else os.cpu_count())
+    try:
+        start = time.perf_counter()
+        result = simulator.simulate(competition, season, simulations=int(simulations))
+        if result is None:
+            return
+        logger.info(f"Simulated {result['simulations']} seasons over {result['remaining_fixtures']} "
+                    f"remaining fixtures in {time.perf_counter() - start:.2f}s")
+                    
+        print(f"\n{competition} {season}\n")
+        print(f"{'Team':<30} {'Pts':>4} {'xPts':>6} {'Title':>7} {'Top 4':>7} {'Rel.':>7}")
+        print("-" * 66)
+        for team in result['standings']:
+            print(f"{team['team'] or team['team_id']:<30} {team['points']:>4} {team['expected_points']:>6.1f} "
+                  f"{team['title']:>7.1%} {team['top']:>7.1%} {team['relegation']:>7.1%}")
+                  
+    except Exception as e:
+        logger.error(f"Error simulating season: {str(e)}")
+    finally:
+        simulator.close()
+
+if __name__ == "__main__":
+    main(*sys.argv[1:])
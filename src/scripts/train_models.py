@@ -106,6 +106,10 @@ def main():
             logger.error("Model training failed")
             return
         
+        # Persist the models so the web app can load them instead of retraining
+        version = predictor.save()
+        logger.info(f"Saved model artifact v{version}")
+        
         # Create output directory for evaluation results
         timestamp = datetime.now().strftime('%Y%m%d_%H%M%S')
         output_dir = f'evaluation_results_{timestamp}'
@@ -117,7 +121,9 @@ def main():
         
         # Make predictions on test set
         outcome_pred = predictor.outcome_model.predict(X_test)
-        score_pred = predictor.score_model.predict(X_test)
+        
+        # Score model: expected goals for the newest matches from a fit on the older ones
+        y_score_test, score_pred = predictor.evaluate_score_model()
         
         # Plot confusion matrix
         plot_confusion_matrix(y_outcome_test, outcome_pred, 
@@ -6,12 +6,14 @@ from selenium import webdriver
 from selenium.webdriver.common.by import By
 from selenium.webdriver.support.ui import WebDriverWait
 from selenium.webdriver.support import expected_conditions as EC
+from src.data.page_parsers import extract_next_data
 
 class DataProcessor:
     def __init__(self):
         """Initialize the data processor"""
         self.base_url = "https://www.fotmob.com"  # Example data source
         self.cached_data = {}
+        self.session = requests.Session()  # Keep-alive connections across pages
         
     def get_match_features(self, home_team, away_team):
         """Get feature vector for a match"""
@@ -48,16 +50,6 @@ class DataProcessor:
         # For now, return placeholder data
         return self.cached_data.get(f"{team}_players", [])
     
-    def get_player_features(self, player, team, is_home):
-        """Get feature vector for a player"""
-        # This would typically include:
-        # - Recent scoring record
-        # - Minutes played
-        # - Position
-        # - Historical performance against opponent
-        # For now, return placeholder data
-        return np.zeros(10)  # Placeholder
-    
     def prepare_outcome_data(self, data):
         """Prepare data for match outcome prediction"""
         X = []  # Features
@@ -82,23 +74,6 @@ class DataProcessor:
         
         return np.array(X), np.array(y)
     
-    def prepare_scorer_data(self, data):
-        """Prepare data for scorer prediction"""
-        X = []  # Features
-        y = []  # Labels (1: scored, 0: didn't score)
-        
-        for match in data:
-            for player in match['players']:
-                features = self.get_player_features(
-                    player['name'],
-                    player['team'],
-                    player['team'] == match['home_team']
-                )
-                X.append(features)
-                y.append(1 if player['scored'] else 0)
-        
-        return np.array(X), np.array(y)
-    
     def _get_team_form(self, team, matches=5):
         """Get team's recent form"""
         # This would typically scrape recent match results
@@ -130,7 +105,7 @@ class DataProcessor:
     def scrape_match_data(self, url):
         """Scrape match data from provided URL"""
         try:
-            response = requests.get(url)
+            response = self.session.get(url, timeout=10)
             soup = BeautifulSoup(response.content, 'html.parser')
             # Implement scraping logic here
             return {}  # Placeholder
@@ -139,21 +114,33 @@ class DataProcessor:
             return None
     
     def scrape_dynamic_data(self, url):
-        """Scrape data from dynamic websites using Selenium"""
+        """Return a page's ``__NEXT_DATA__`` state, using Selenium only when the HTML lacks it
+        
+        Returns None when neither the fetched nor the rendered page has it.
+        """
+        # Server-rendered pages embed their state as JSON; no browser needed
+        try:
+            response = self.session.get(url, timeout=10)
+            response.raise_for_status()
+            data = extract_next_data(response.text)
+            if data is not None:
+                return data
+        except requests.RequestException as e:
+            print(f"Error fetching {url}, using a browser: {str(e)}")
+            
         try:
             options = webdriver.ChromeOptions()
             options.add_argument('--headless')
             driver = webdriver.Chrome(options=options)
             
-            driver.get(url)
-            WebDriverWait(driver, 10).until(
-                EC.presence_of_element_located((By.CLASS_NAME, 'some-class'))
-            )
-            
-            # Implement scraping logic here
-            
-            driver.quit()
-            return {}  # Placeholder
+            try:
+                driver.get(url)
+                WebDriverWait(driver, 10).until(
+                    EC.presence_of_element_located((By.ID, '__NEXT_DATA__'))
+                )
+                return extract_next_data(driver.page_source)
+            finally:
+                driver.quit()
         except Exception as e:
             print(f"Error scraping dynamic data: {str(e)}")
-            return None 
\ No newline at end of file
+            return None
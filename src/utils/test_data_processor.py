@@ -0,0 +1,77 @@
+"""Tests of DataProcessor's page state scraping, with stand-ins for the network and the browser."""
+
+import pytest
+import requests
+from selenium.common.exceptions import NoSuchElementException
+from selenium.webdriver.common.by import By
+from src.data.test_page_parsers import read_fixture
+from src.utils import data_processor
+from src.utils.data_processor import DataProcessor
+
+URL = 'https://www.fotmob.com/leagues/47/matches/premier-league'
+
+class FakeResponse:
+    def __init__(self, text):
+        self.text = text
+    
+    def raise_for_status(self):
+        pass
+
+class FakeChrome:
+    """Renders ``page`` and records what was asked of it."""
+    
+    page = ''
+    instances = []
+    
+    def __init__(self, options=None):
+        self.visited = []
+        self.lookups = []
+        self.quit_called = False
+        FakeChrome.instances.append(self)
+    
+    def get(self, url):
+        self.visited.append(url)
+    
+    def find_element(self, by, value):
+        self.lookups.append((by, value))
+        if f'id="{value}"' not in self.page_source:
+            raise NoSuchElementException(value)
+        return object()
+    
+    @property
+    def page_source(self):
+        return FakeChrome.page
+    
+    def quit(self):
+        self.quit_called = True
+
+@pytest.fixture
+def processor(monkeypatch):
+    FakeChrome.instances = []
+    monkeypatch.setattr(data_processor.webdriver, 'Chrome', FakeChrome)
+    return DataProcessor()
+
+def test_server_rendered_state_needs_no_browser(processor, monkeypatch):
+    monkeypatch.setattr(processor.session, 'get', lambda url, timeout: FakeResponse(read_fixture('fotmob_league_next_data.html')))
+    
+    assert processor.scrape_dynamic_data(URL)['props']['pageProps']['id'] == 47
+    assert FakeChrome.instances == []
+
+def test_browser_renders_pages_without_state(processor, monkeypatch):
+    monkeypatch.setattr(processor.session, 'get', lambda url, timeout: FakeResponse(read_fixture('fotmob_league_markup.html')))
+    FakeChrome.page = read_fixture('fotmob_league_next_data.html')
+    
+    assert processor.scrape_dynamic_data(URL)['props']['pageProps']['id'] == 47
+    [driver] = FakeChrome.instances
+    assert driver.visited == [URL]
+    assert driver.lookups == [(By.ID, '__NEXT_DATA__')]
+    assert driver.quit_called
+
+def test_failed_fetches_fall_back_to_the_browser(processor, monkeypatch):
+    def unreachable(url, timeout):
+        raise requests.ConnectionError('offline')
+    monkeypatch.setattr(processor.session, 'get', unreachable)
+    FakeChrome.page = read_fixture('fotmob_league_next_data.html')
+    
+    assert processor.scrape_dynamic_data(URL)['props']['pageProps']['id'] == 47
+    assert FakeChrome.instances[0].quit_called
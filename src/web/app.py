@@ -3,6 +3,9 @@ import os
 import sqlite3
 from datetime import datetime, timedelta
 from src.models.predictor import MatchPredictor
+from src.models.ratings import RatingsPredictor
+from src.data.pool import ConnectionPool
+from src.data.queries import COMPETITION_TEAMS, TEAM_AVERAGE_STATS
 
 template_dir = os.path.abspath(os.path.dirname(__file__)) + '/templates'
 static_dir = os.path.abspath(os.path.dirname(__file__)) + '/static'
@@ -12,12 +15,25 @@ app = Flask(__name__,
 
 # Initialize the predictor
 predictor = MatchPredictor()
-predictor.train()  # Train the model when app starts
+if not predictor.load():
+    # No saved models yet: train once and persist them for the next start
+    if predictor.train():
+        predictor.save()
+
+# Answers from the Elo ratings alone, sharing the predictor's ratings store
+ratings_predictor = RatingsPredictor(predictor.db, store=predictor.ratings)
+
+# Read connections are opened on first use in a request and closed when it ends
+db_pool = ConnectionPool('data.db', row_factory=sqlite3.Row)
 
 def get_db_connection():
-    conn = sqlite3.connect('data.db')
-    conn.row_factory = sqlite3.Row
-    return conn
+    return db_pool.reader()
+
+@app.teardown_appcontext
+def release_db_connections(exception=None):
+    """Close the request thread's read connections; the server starts a thread per request"""
+    db_pool.release()
+    predictor.db.pool.release()
 
 @app.route('/')
 def index():
@@ -25,17 +41,8 @@ def index():
     # Get teams from database
     conn = get_db_connection()
     cursor = conn.cursor()
-    cursor.execute("""
-        SELECT DISTINCT t.id as team_id, t.name as team_name 
-        FROM teams t
-        JOIN team_stats ts ON t.id = ts.team_id
-        JOIN matches m ON ts.match_id = m.id 
-        WHERE m.competition = 'Premier League' 
-        AND m.season = '2023'
-        ORDER BY t.name
-    """)
+    cursor.execute(COMPETITION_TEAMS)
     teams = cursor.fetchall()
-    conn.close()
     return render_template('index.html', teams=[(team['team_id'], team['team_name']) for team in teams])
 
 @app.route('/predict', methods=['POST'])
@@ -60,6 +67,54 @@ def predict():
     except Exception as e:
         return jsonify({'error': str(e)}), 500
 
+@app.route('/predict/batch', methods=['POST'])
+def predict_batch():
+    """Make predictions for many matches at once"""
+    try:
+        data = request.get_json()
+        pairs = [
+            (int(match['home_team_id']), int(match['away_team_id']))
+            for match in data['matches']
+        ]
+        
+        if any(home_team_id == away_team_id for home_team_id, away_team_id in pairs):
+            return jsonify({'error': 'Home and away teams must be different'}), 400
+        
+        # One feature query and one pass of each model for the whole batch
+        predictions = predictor.predict_matches(pairs)
+        
+        return jsonify({
+            'predictions': [
+                prediction if prediction is not None else {'error': 'Not enough data to make prediction'}
+                for prediction in predictions
+            ]
+        })
+        
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid request: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
+@app.route('/predict/ratings', methods=['POST'])
+def predict_ratings():
+    """Predict outcomes from the current Elo ratings alone"""
+    try:
+        data = request.get_json()
+        pairs = [
+            (int(match['home_team_id']), int(match['away_team_id']))
+            for match in data['matches']
+        ]
+        
+        if any(home_team_id == away_team_id for home_team_id, away_team_id in pairs):
+            return jsonify({'error': 'Home and away teams must be different'}), 400
+            
+        return jsonify({'predictions': ratings_predictor.predict_matches(pairs)})
+        
+    except (KeyError, TypeError, ValueError) as e:
+        return jsonify({'error': f'Invalid request: {str(e)}'}), 400
+    except Exception as e:
+        return jsonify({'error': str(e)}), 500
+
 @app.route('/team-stats/<int:team_id>')
 def team_stats(team_id):
     """Get recent statistics for a team"""
@@ -72,16 +127,7 @@ def team_stats(team_id):
         team_name = cursor.fetchone()['name']
         
         # Get average stats
-        cursor.execute("""
-            SELECT 
-                AVG(possession) as possession,
-                AVG(shots) as shots,
-                AVG(shots_on_target) as shots_on_target,
-                AVG(corners) as corners,
-                AVG(fouls) as fouls
-            FROM team_stats
-            WHERE team_id = ?
-        """, (team_id,))
+        cursor.execute(TEAM_AVERAGE_STATS, (team_id,))
         avg_stats = cursor.fetchone()
         
         # Get recent matches
@@ -103,13 +149,11 @@ def team_stats(team_id):
             JOIN teams t1 ON (m.home_team_id = t1.id OR m.away_team_id = t1.id)
             JOIN teams t2 ON (m.home_team_id = t2.id OR m.away_team_id = t2.id)
             WHERE t1.id = ? AND t2.id != ?
-            ORDER BY m.date DESC
+            ORDER BY m.date_ts DESC
             LIMIT 5
         """, (team_id, team_id))
         recent_matches = cursor.fetchall()
         
-        conn.close()
-        
         return jsonify({
             'team_name': team_name,
             'recent_matches': [{